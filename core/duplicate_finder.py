@@ -1,17 +1,30 @@
 """
 Duplicate finder module for identifying duplicate images based on perceptual hashes.
 """
+import os
+import threading
+import warnings
 from collections import defaultdict
-from typing import Dict, List, Set, Callable, Optional
+from typing import Dict, Iterable, List, Set, Callable, Optional, Union
 
 from core.hasher import group_by_hash
+from core.hamming import group_by_distance
+from core.prefilter import group_identical_files
 
 # Note: We now use the optimized parallel group_by_hash function from the hasher module
 
-def identify_duplicates(hash_groups: Dict[str, List[str]], progress_callback: Optional[Callable] = None) -> Dict[str, List[str]]:
+# Maximum number of differing hash bits for two images to count as duplicates.
+# 0 (the default) only groups identical hashes; set IMAGECOMPARE_HASH_THRESHOLD
+# (e.g. to 5) to also group near-duplicates such as re-encoded or resized copies.
+HASH_DISTANCE_THRESHOLD = int(os.environ.get("IMAGECOMPARE_HASH_THRESHOLD", "0"))
+
+def identify_duplicates(hash_groups: Dict[int, List[str]], progress_callback: Optional[Callable] = None) -> Dict[int, List[str]]:
     """
     Filter hash groups to keep only those with more than one image (duplicates).
     
+    Deprecated: group_by_hash now only returns duplicate groups, so this
+    filter is no longer needed. Kept for backwards compatibility.
+    
     Args:
         hash_groups: Dictionary mapping hash values to lists of image paths
         progress_callback: Optional callback function for progress tracking
@@ -19,40 +32,63 @@ def identify_duplicates(hash_groups: Dict[str, List[str]], progress_callback: Op
     Returns:
         Dictionary containing only groups with more than one image
     """
-    duplicate_groups = {}
-    
-    # For counting progress
-    total = len(hash_groups)
-    current = 0
-    
-    for hash_value, paths in hash_groups.items():
-        # Only include groups with more than one image
-        current += 1
-        if len(paths) > 1:
-            duplicate_groups[hash_value] = paths
-            
-        # Call progress callback if provided
-        if progress_callback and callable(progress_callback):
-            progress_callback(current, total)
+    warnings.warn("identify_duplicates is deprecated; group_by_hash already returns only duplicate groups",
+                  DeprecationWarning, stacklevel=2)
+    
+    # Only include groups with more than one image
+    duplicate_groups = {hash_value: paths for hash_value, paths in hash_groups.items() if len(paths) > 1}
+    
+    # Call progress callback if provided (the filter is a single pass, so report completion once)
+    if progress_callback and callable(progress_callback):
+        total = len(hash_groups)
+        progress_callback(total, total)
     
     return duplicate_groups
 
-def find_duplicates(image_paths: List[str], progress_callback: Optional[Callable] = None) -> Dict[str, List[str]]:
+def find_duplicates(image_paths: Iterable[Union[str, os.DirEntry]],
+                    progress_callback: Optional[Callable] = None,
+                    cancel_event: Optional[threading.Event] = None,
+                    threshold: Optional[int] = None) -> Dict[int, List[str]]:
     """
     Find duplicate images in a single operation using parallel processing.
     
     Args:
-        image_paths: List of paths to image files
+        image_paths: Paths to image files, or directory entries from os.scandir
+            (their cached stat results are reused by the size prefilter)
         progress_callback: Optional callback function for progress tracking
+        cancel_event: Optional event that cancels the operation when set
+        threshold: Maximum number of differing hash bits between duplicates
+            (defaults to HASH_DISTANCE_THRESHOLD; 0 means identical hashes only)
         
     Returns:
         Dictionary containing only groups with more than one image (duplicates)
+        
+    Raises:
+        InterruptedError: If cancel_event was set before the operation completed
     """
-    # Step 1: Group images by hash (using parallel processing)
-    hash_groups = group_by_hash(image_paths, progress_callback)
+    def check_cancelled():
+        if cancel_event is not None and cancel_event.is_set():
+            raise InterruptedError("Operation cancelled by user")
+    
+    def callback(processed_count, total_count):
+        # Hashing reports progress after every chunk, which is where cancellation is noticed
+        check_cancelled()
+        if progress_callback:
+            progress_callback(processed_count, total_count)
+    
+    # Step 1: Collapse byte-identical files so each distinct file is hashed once.
+    # The stat results are kept so the hash cache can check them without stat'ing again.
+    stats = {}
+    identical_groups = group_identical_files(image_paths, stats)
+    check_cancelled()
+    
+    # Step 2: Group the representatives by hash (using parallel processing),
+    # expanding each back into its identical copies and keeping only duplicates
+    if threshold is None:
+        threshold = HASH_DISTANCE_THRESHOLD
     
-    # Step 2: Filter to keep only duplicate groups
-    # We don't pass the progress callback here since the heavy lifting is in hash calculation
-    duplicate_groups = identify_duplicates(hash_groups)
+    if threshold > 0:
+        # Near-duplicates: cluster hashes within the threshold (vectorized pairwise distances)
+        return group_by_distance(list(identical_groups), threshold, callback, identical_groups, stats)
     
-    return duplicate_groups
\ No newline at end of file
+    return group_by_hash(list(identical_groups), callback, identical_groups, stats)
\ No newline at end of file
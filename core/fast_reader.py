@@ -0,0 +1,96 @@
+"""
+Fast reader module for reading small image files in a single pass.
+"""
+import os
+import io
+from pathlib import Path
+from typing import List, Optional, Union
+
+from PIL import Image
+
+# Files smaller than this are read in one go; larger files are opened directly (16 MB)
+SMALL_FILE_SIZE = 16 * 1024 * 1024
+
+def advise_sequential(fd: int):
+    """
+    Hint the kernel that a file will be read sequentially and in full.
+
+    Starts readahead of the whole file so the I/O overlaps with decoding.
+    Does nothing on platforms without posix_fadvise.
+
+    Args:
+        fd: File descriptor of the open file
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+
+    try:
+        # The advice values are not flags, so each needs its own call
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+
+def prefetch(file_paths: List[Union[str, Path]]):
+    """
+    Start readahead for files that are about to be read.
+
+    Args:
+        file_paths: Paths to the files
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+
+    for path in file_paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            advise_sequential(fd)
+        finally:
+            os.close(fd)
+
+def read_small_file(file_path: Union[str, Path]) -> Optional[bytes]:
+    """
+    Read a whole file in a single read, if it is small.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        File contents, or None if the file is SMALL_FILE_SIZE or larger
+
+    Raises:
+        OSError: If the file can't be opened or read
+    """
+    with open(file_path, 'rb', buffering=0) as f:
+        size = os.fstat(f.fileno()).st_size
+        if size >= SMALL_FILE_SIZE:
+            return None
+
+        # readall() sizes its buffer from the file size, so this is one read syscall
+        return f.readall()
+
+def open_image(file_path: Union[str, Path]) -> Image.Image:
+    """
+    Open an image, reading small files in a single pass.
+
+    Large files are left to PIL, which reads them incrementally.
+
+    Args:
+        file_path: Path to the image file
+
+    Returns:
+        PIL Image (lazily decoded)
+
+    Raises:
+        OSError: If the file can't be opened or read
+        PIL.UnidentifiedImageError: If the file is not a valid image
+    """
+    data = read_small_file(file_path)
+    if data is None:
+        return Image.open(file_path)
+
+    # BytesIO shares the bytes object instead of copying it
+    return Image.open(io.BytesIO(data))
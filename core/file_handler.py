@@ -2,22 +2,28 @@
 File handler module for file operations like moving to trash and memory-efficient image loading.
 """
 import os
-import mmap
-import io
+import logging
 import warnings
 from pathlib import Path
-from typing import List, Union, Optional, BinaryIO, Tuple
+from typing import List, Union, Optional, BinaryIO, Tuple, Callable, Iterator
+from functools import partial
+from concurrent.futures import Executor
 
 import numpy as np
 from PIL import Image, ImageFile
 import send2trash
 
+from core import thumb_cache
+from core.fast_reader import advise_sequential
+
 # Enable loading of truncated images
 ImageFile.LOAD_TRUNCATED_IMAGES = True
 
 # Filter out common PIL EXIF warnings that don't affect functionality
 warnings.filterwarnings("ignore", message="Corrupt EXIF data", category=UserWarning)
 
+logger = logging.getLogger(__name__)
+
 # Set a reasonable chunk size for processing (8 MB)
 DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024  # 8 MB
 
@@ -52,13 +58,16 @@ def move_to_trash(file_paths: List[Union[str, Path]]) -> List[str]:
             
         except Exception as e:
             # Log any errors but continue with other files
-            print(f"Error moving {file_path} to trash: {str(e)}")
+            logger.warning("Error moving %s to trash: %s", file_path, e)
     
     return successfully_trashed
 
-class MemoryMappedImage:
+class StreamedImage:
     """
-    Memory-mapped image handler for efficient loading and processing of large images.
+    Image handler for efficient loading and processing of large images.
+    
+    Images are decoded straight from the open file object, so PIL reads
+    from the kernel page cache without an intermediate copy of the file.
     """
     
     def __init__(self, file_path: Union[str, Path]):
@@ -70,8 +79,6 @@ class MemoryMappedImage:
         """
         self.file_path = Path(file_path)
         self.file_obj = None
-        self.mm = None
-        self.pil_image = None
         self.size = None
         
     def __enter__(self):
@@ -88,38 +95,39 @@ class MemoryMappedImage:
         self.close()
         
     def open(self):
-        """Open the file and memory-map it."""
+        """Open the file and read the image size from its header."""
         if not self.file_path.exists():
             raise FileNotFoundError(f"Image file not found: {self.file_path}")
             
         # Open the file in binary mode
         self.file_obj = open(self.file_path, 'rb')
         
+        # Start readahead of the whole file before PIL starts decoding
+        advise_sequential(self.file_obj.fileno())
+        
         try:
-            # Create memory map (read-only)
-            self.mm = mmap.mmap(self.file_obj.fileno(), 0, access=mmap.ACCESS_READ)
-            
-            # Create a PIL Image from the memory map
-            self.pil_image = Image.open(io.BytesIO(self.mm))
-            
-            # Store the image size
-            self.size = self.pil_image.size
+            # Read the image size from the header (no pixel data is decoded)
+            with self._open_image() as img:
+                self.size = img.size
             
             return self
         except Exception as e:
             self.close()
             raise e
     
+    def _open_image(self) -> Image.Image:
+        """
+        Open a fresh, not yet decoded PIL Image over the file object.
+        Only the header is parsed until the pixels are actually needed.
+        
+        Returns:
+            Lazily loaded PIL Image
+        """
+        self.file_obj.seek(0)
+        return Image.open(self.file_obj)
+    
     def close(self):
         """Close all open resources."""
-        if self.pil_image:
-            self.pil_image.close()
-            self.pil_image = None
-            
-        if self.mm:
-            self.mm.close()
-            self.mm = None
-            
         if self.file_obj:
             self.file_obj.close()
             self.file_obj = None
@@ -134,12 +142,17 @@ class MemoryMappedImage:
         Returns:
             PIL Image thumbnail
         """
-        if not self.pil_image:
+        if self.file_obj is None:
             raise RuntimeError("Image not opened. Call open() first.")
-            
-        # Create a thumbnail (this loads only necessary data)
-        thumbnail = self.pil_image.copy()
+        
+        # Work on a fresh handle so the image is never fully decoded first;
+        # thumbnail() drafts JPEGs to a reduced scale before resizing in place
+        thumbnail = self._open_image()
         thumbnail.thumbnail(size)
+        
+        # Decode now (thumbnail() skips images already within the size) so the
+        # result no longer reads from the file once it is closed
+        thumbnail.load()
         return thumbnail
         
     def get_size(self) -> Tuple[int, int]:
@@ -149,7 +162,7 @@ class MemoryMappedImage:
         Returns:
             Tuple of (width, height)
         """
-        if not self.pil_image:
+        if self.file_obj is None:
             raise RuntimeError("Image not opened. Call open() first.")
             
         return self.size
@@ -162,10 +175,12 @@ class MemoryMappedImage:
         Returns:
             PIL Image
         """
-        if not self.pil_image:
+        if self.file_obj is None:
             raise RuntimeError("Image not opened. Call open() first.")
-            
-        return self.pil_image.copy()
+        
+        image = self._open_image()
+        image.load()
+        return image
 
 def get_image_dimensions(file_path: Union[str, Path]) -> Tuple[int, int]:
     """
@@ -177,13 +192,16 @@ def get_image_dimensions(file_path: Union[str, Path]) -> Tuple[int, int]:
     Returns:
         Tuple of (width, height)
     """
-    with MemoryMappedImage(file_path) as img:
+    with StreamedImage(file_path) as img:
         return img.get_size()
 
 def load_image_thumbnail(file_path: Union[str, Path], size: Tuple[int, int]) -> Image.Image:
     """
     Load a thumbnail of an image efficiently.
     
+    Thumbnails are served from the on-disk thumbnail cache when possible
+    and generated (then cached) otherwise.
+    
     Args:
         file_path: Path to the image file
         size: Desired thumbnail size (width, height)
@@ -191,34 +209,69 @@ def load_image_thumbnail(file_path: Union[str, Path], size: Tuple[int, int]) ->
     Returns:
         PIL Image thumbnail
     """
-    with MemoryMappedImage(file_path) as img:
+    return thumb_cache.get_or_make(file_path, size, _make_thumbnail)
+
+def _make_thumbnail(file_path: Union[str, Path], size: Tuple[int, int]) -> Image.Image:
+    """Generate a thumbnail directly from the image file."""
+    with StreamedImage(file_path) as img:
         return img.get_thumbnail(size)
 
+def iter_batches(image_paths: List[str], batch_size: int) -> Iterator[List[str]]:
+    """
+    Split a list of image paths into consecutive batches.
+    
+    Args:
+        image_paths: List of paths to images
+        batch_size: Number of images per batch
+        
+    Yields:
+        Lists of at most batch_size paths
+    """
+    for i in range(0, len(image_paths), batch_size):
+        yield image_paths[i:i+batch_size]
+
+def _process_batch(process_func: Callable, batch: List[str]) -> List:
+    """Apply a per-image function to every image of a batch."""
+    return [process_func(path) for path in batch]
+
 def batch_process_images(image_paths: List[str], batch_size: int = 50,
-                        process_func=None, callback=None):
+                         process_func: Optional[Callable] = None, callback=None, *,
+                         process_func_batch: Optional[Callable[[List[str]], List]] = None,
+                         executor: Optional[Executor] = None) -> List:
     """
     Process images in batches to limit memory usage.
     
+    Batches are processed in the calling thread unless an executor is
+    given; each batch is then handed to the executor as a single task, so
+    the dispatch overhead is paid per batch instead of per image.
+    
     Args:
         image_paths: List of paths to images
         batch_size: Number of images per batch
         process_func: Function to process each image
         callback: Callback function(processed_count, total_count)
+        process_func_batch: Function(batch) returning a list of results for the
+            batch (used instead of process_func)
+        executor: Optional executor to run the batches on
+        
+    Returns:
+        List of results in the same order as image_paths
     """
+    if process_func_batch is None:
+        if process_func is None:
+            return []
+        process_func_batch = partial(_process_batch, process_func)
+    
     total_count = len(image_paths)
-    processed_count = 0
+    results = []
     
-    # Process in batches
-    for i in range(0, total_count, batch_size):
-        batch = image_paths[i:i+batch_size]
+    # Results come back in submission order, one list per batch
+    map_batches = executor.map if executor is not None else map
+    for batch_results in map_batches(process_func_batch, iter_batches(image_paths, batch_size)):
+        results.extend(batch_results)
         
-        # Process each image in the batch
-        for path in batch:
-            if process_func:
-                process_func(path)
-            
-            processed_count += 1
-            
-            # Update progress
-            if callback:
-                callback(processed_count, total_count)
\ No newline at end of file
+        # Update progress
+        if callback:
+            callback(len(results), total_count)
+    
+    return results
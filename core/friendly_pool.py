@@ -0,0 +1,226 @@
+"""
+Friendly pool module providing a long-lived thread pool that backs off when other processes need the CPU.
+"""
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future
+from typing import Callable, Optional, Set
+
+# How often the control thread re-evaluates the number of active workers (seconds)
+DEFAULT_CONTROL_INTERVAL = 0.01
+
+class FriendlyPool(Executor):
+    """
+    Thread pool with a fixed set of parked worker threads of which only a
+    subset is active at a time.
+
+    For CPU-bound pools, a control thread samples the CPU time used by
+    this process and by the whole system while tasks are queued. The number
+    of active workers follows this process's share of the busy CPU time, so
+    the pool runs at full width when the machine is otherwise idle and backs
+    off when other processes are competing for the CPU. I/O-bound pools
+    barely use any CPU, so they always run at full width (up to the worker
+    cap).
+    """
+
+    def __init__(self, max_workers: int, control_interval: float = DEFAULT_CONTROL_INTERVAL,
+                 name: str = "FriendlyPool", cpu_bound: bool = True):
+        """
+        Initialize the pool (threads are started on the first submit).
+
+        Args:
+            max_workers: Number of worker threads
+            control_interval: Seconds between two samples of the CPU usage
+            name: Prefix for the thread names
+            cpu_bound: Whether to back off when other processes need the CPU
+        """
+        self.max_workers = max(1, int(max_workers))
+        self.control_interval = control_interval
+        self.name = name
+        self.cpu_bound = cpu_bound
+
+        self.active_limit = self.max_workers  # Workers allowed to run tasks right now
+        self.worker_cap = self.max_workers  # Upper bound on active_limit set by the owner
+        self.running = 0  # Workers currently running a task
+
+        self._tasks = deque()
+        lock = threading.Lock()
+        self._cv = threading.Condition(lock)  # Waited on by the workers
+        self._control_cv = threading.Condition(lock)  # Waited on by the control thread
+        self._threads = []
+        self._shutdown = False
+
+        # Imported here rather than at module level to keep application startup cheap
+        import psutil
+        self._psutil = psutil
+        self._process = psutil.Process()
+
+    def submit(self, fn: Callable, /, *args, **kwargs) -> Future:
+        """
+        Schedule a callable to be run by the pool.
+
+        Args:
+            fn: Callable to run
+            *args: Positional arguments for the callable
+            **kwargs: Keyword arguments for the callable
+
+        Returns:
+            Future for the result of the call
+        """
+        future = Future()
+
+        with self._cv:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+
+            if not self._threads:
+                self._start_threads()
+
+            self._tasks.append((future, fn, args, kwargs))
+            # One new task needs one worker
+            self._cv.notify()
+            if len(self._tasks) == 1:
+                self._control_cv.notify()
+
+        return future
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False):
+        """
+        Stop the pool once the queued tasks are done.
+
+        Args:
+            wait: Whether to wait for the worker threads to exit
+            cancel_futures: Whether to cancel the tasks that haven't started yet
+        """
+        with self._cv:
+            self._shutdown = True
+            if cancel_futures:
+                while self._tasks:
+                    self._tasks.popleft()[0].cancel()
+            self._cv.notify_all()
+            self._control_cv.notify_all()
+
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def set_worker_cap(self, cap: int):
+        """
+        Limit the number of active workers, whatever the CPU load.
+
+        Args:
+            cap: Maximum number of workers allowed to run tasks (max_workers lifts the limit)
+        """
+        with self._cv:
+            self.worker_cap = max(1, min(self.max_workers, int(cap)))
+            if self.active_limit > self.worker_cap or not self.cpu_bound:
+                # Without a control thread nothing else raises the limit again
+                self.active_limit = self.worker_cap
+            self._cv.notify_all()
+
+    def worker_native_ids(self) -> Set[int]:
+        """Get the native thread ids of the worker threads (empty until the first submit)."""
+        with self._cv:
+            return {thread.native_id for thread in self._threads[:self.max_workers]}
+
+    def _start_threads(self):
+        """Start the worker threads and the control thread (called with the lock held)."""
+        for i in range(self.max_workers):
+            thread = threading.Thread(target=self._worker, name=f"{self.name}-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        if self.cpu_bound:
+            control = threading.Thread(target=self._control, name=f"{self.name}-control", daemon=True)
+            control.start()
+            self._threads.append(control)
+
+    def _worker(self):
+        """Run queued tasks, parking while the pool is throttled or idle."""
+        while True:
+            with self._cv:
+                while not self._shutdown and (not self._tasks or self.running >= self.active_limit):
+                    self._cv.wait()
+
+                if not self._tasks:
+                    # Shut down and nothing left to run
+                    return
+
+                future, fn, args, kwargs = self._tasks.popleft()
+                self.running += 1
+
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(fn(*args, **kwargs))
+                    except BaseException as e:
+                        future.set_exception(e)
+            finally:
+                # No wakeup needed: this worker re-checks the queue itself
+                with self._cv:
+                    self.running -= 1
+
+    def _control(self):
+        """Adjust the number of active workers to this process's share of the busy CPU time."""
+        previous = self._sample_cpu_times()
+
+        while True:
+            with self._cv:
+                # Park while there is no work to schedule
+                while not self._shutdown and not self._tasks:
+                    self._control_cv.wait()
+                    previous = self._sample_cpu_times()
+                if self._shutdown:
+                    return
+
+            time.sleep(self.control_interval)
+
+            current = self._sample_cpu_times()
+            if current is None or previous is None:
+                previous = current
+                continue
+
+            limit = self._desired_workers(previous, current)
+            previous = current
+
+            with self._cv:
+                limit = min(limit, self.worker_cap)
+                if limit != self.active_limit:
+                    self.active_limit = limit
+                    self._cv.notify_all()
+
+    def _sample_cpu_times(self) -> Optional[tuple]:
+        """Get (process CPU time, system busy CPU time) in seconds, or None if unavailable."""
+        try:
+            own = self._process.cpu_times()
+            system = self._psutil.cpu_times()
+        except Exception:
+            return None
+
+        busy = sum(system) - system.idle - getattr(system, "iowait", 0.0)
+        return own.user + own.system, busy
+
+    def _desired_workers(self, previous: tuple, current: tuple) -> int:
+        """
+        Calculate how many workers should be active.
+
+        Args:
+            previous: Earlier (process, system busy) CPU time sample
+            current: Latest (process, system busy) CPU time sample
+
+        Returns:
+            Number of workers to keep active
+        """
+        own_delta = current[0] - previous[0]
+        busy_delta = current[1] - previous[1]
+
+        # Nothing measurable happened (e.g. the pool is waiting on I/O): run at full width
+        if busy_delta <= 0:
+            return self.max_workers
+
+        share = min(1.0, max(0.0, own_delta / busy_delta))
+
+        # Allow one extra worker so the pool can grow back once other load goes away
+        return max(1, min(self.max_workers, math.ceil(share * self.max_workers) + 1))
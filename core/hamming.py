@@ -0,0 +1,139 @@
+"""
+Hamming module for finding near-duplicate images by comparing perceptual hashes.
+"""
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+from core.hasher import batch_calculate_hashes
+
+# Default maximum number of differing bits for two images to count as near-duplicates
+DEFAULT_THRESHOLD = 6
+
+# Number of hash pairs compared per vectorized step (bounds temporary memory to ~32 MB)
+BLOCK_ELEMENTS = 4 * 1024 * 1024
+
+# Bit counts of every byte value, for NumPy versions without np.bitwise_count
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+def popcount(values: np.ndarray) -> np.ndarray:
+    """
+    Count the set bits of every element of a uint64 array.
+
+    Args:
+        values: Array of uint64 values
+
+    Returns:
+        Array of the same shape with the bit count of each element
+    """
+    if hasattr(np, "bitwise_count"):
+        # Lowered to the hardware POPCNT instruction where available
+        return np.bitwise_count(values)
+
+    # Fall back to a lookup table over the 8 bytes of each value
+    byte_view = np.ascontiguousarray(values).view(np.uint8).reshape(values.shape + (8,))
+    return _POPCOUNT_TABLE[byte_view].sum(axis=-1, dtype=np.uint8)
+
+def _pair_arrays(hashes: np.ndarray, threshold: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find all pairs of hashes within a Hamming distance of each other, as index arrays.
+
+    Args:
+        hashes: Contiguous uint64 array of perceptual hashes
+        threshold: Maximum number of differing bits
+
+    Returns:
+        Tuple of (rows, cols) index arrays with rows < cols
+    """
+    count = len(hashes)
+    row_blocks = []
+    col_blocks = []
+
+    # Compare a block of rows against every later hash at once
+    block_rows = max(1, BLOCK_ELEMENTS // max(count, 1))
+
+    for start in range(0, count, block_rows):
+        stop = min(start + block_rows, count)
+        distances = popcount(np.bitwise_xor(hashes[start:stop, None], hashes[None, start:]))
+
+        rows, cols = np.nonzero(distances <= threshold)
+
+        # Keep only the upper triangle (j > i) to skip self and mirrored pairs
+        rows = rows + start
+        cols = cols + start
+        upper = cols > rows
+        row_blocks.append(rows[upper])
+        col_blocks.append(cols[upper])
+
+    if not row_blocks:
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty
+
+    return np.concatenate(row_blocks), np.concatenate(col_blocks)
+
+def cluster_hashes(hashes: np.ndarray, threshold: int = DEFAULT_THRESHOLD) -> np.ndarray:
+    """
+    Label hashes so that hashes within the threshold of each other share a label.
+
+    Near-duplicate pairs are joined transitively (connected components of
+    the graph of close pairs).
+
+    Args:
+        hashes: Contiguous uint64 array of perceptual hashes
+        threshold: Maximum number of differing bits
+
+    Returns:
+        Array with the cluster label of each hash
+    """
+    count = len(hashes)
+    rows, cols = _pair_arrays(hashes, threshold)
+
+    graph = coo_matrix((np.ones(len(rows), dtype=np.int8), (rows, cols)), shape=(count, count))
+    _, labels = connected_components(graph, directed=False)
+    return labels
+
+def group_by_distance(image_paths: List[str], threshold: int = DEFAULT_THRESHOLD, callback=None,
+                      identical_groups: Optional[Dict[str, List[str]]] = None,
+                      stats: Optional[Dict[str, os.stat_result]] = None) -> Dict[int, List[str]]:
+    """
+    Group images whose perceptual hashes differ by at most a few bits.
+
+    Every image in a group is within the threshold of at least one other
+    image in the group. Only groups with more than one image are returned.
+
+    Args:
+        image_paths: List of paths to image files
+        threshold: Maximum number of differing bits
+        callback: Optional callback function(processed_count, total_count) for hashing progress
+        identical_groups: Optional dictionary mapping each path to all paths
+            with identical contents; each path is expanded into its copies
+        stats: Optional dictionary of stat results already taken for the paths
+
+    Returns:
+        Dictionary mapping the hash of each group's first image to the paths in the group
+    """
+    # Calculate hashes, skipping images that couldn't be hashed
+    path_to_hash = batch_calculate_hashes(image_paths, callback, stats)
+    paths = [path for path, hash_value in path_to_hash.items() if hash_value is not None]
+    hashes = np.fromiter((path_to_hash[path] for path in paths), dtype=np.uint64, count=len(paths))
+
+    # Join near-duplicate pairs into groups
+    members = {}
+    for index, label in enumerate(cluster_hashes(hashes, threshold).tolist()):
+        members.setdefault(label, []).append(index)
+
+    groups = {}
+    for indices in members.values():
+        group = []
+        for index in indices:
+            path = paths[index]
+            group.extend(identical_groups[path] if identical_groups else [path])
+
+        # Only keep groups with more than one image (identical copies count)
+        if len(group) > 1:
+            groups[int(hashes[indices[0]])] = group
+
+    return groups
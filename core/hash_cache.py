@@ -0,0 +1,281 @@
+"""
+Hash cache module for persisting perceptual hashes between scans.
+"""
+import os
+import time
+import pickle
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Location of the cache file (follows the XDG base directory convention)
+CACHE_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+    "imagecompare", "hashes.pickle"
+)
+
+# Format version of the cache file; files with another version are ignored
+CACHE_VERSION = 2
+
+# Maximum number of entries kept; the least recently used are evicted first
+MAX_ENTRIES = 200_000
+
+# Entries not used for this long are dropped when the cache is saved (30 days)
+MAX_ENTRY_AGE = 30 * 24 * 60 * 60
+
+class HashCache:
+    """
+    Disk-backed cache of perceptual hashes keyed by file path.
+
+    Each entry stores the file's modification time and size next to the
+    hash, so a file is only re-hashed when it has changed. Checking an entry
+    costs a single stat instead of a decode, resize and DCT. The image's
+    dimensions, read while hashing, are kept as well for display.
+    """
+
+    def __init__(self, path: str = CACHE_PATH, algorithm: str = "phash"):
+        """
+        Initialize the cache (the file is read on first use).
+
+        Args:
+            path: Path to the cache file
+            algorithm: Name of the hash algorithm; entries computed with
+                another algorithm are never returned
+        """
+        self.path = path
+        self.algorithm = algorithm
+        self.entries = None  # path -> (mtime_ns, size, hash, last_used, (width, height))
+        self.dirty = False
+        self.lock = threading.Lock()
+
+    def get_or_compute(self, image_paths: List[str],
+                       compute: Callable[[List[str], Optional[Callable], Dict[str, Tuple[int, int]]],
+                                         Dict[str, Optional[int]]],
+                       callback=None,
+                       stats: Optional[Dict[str, os.stat_result]] = None) -> Dict[str, Optional[int]]:
+        """
+        Get the hashes of images, computing only those not cached.
+
+        Args:
+            image_paths: List of paths to image files
+            compute: Function(paths, callback, dimensions) that hashes the cache misses,
+                filling dimensions with the (width, height) of each image
+            callback: Optional callback function(processed_count, total_count) for progress tracking
+            stats: Optional dictionary of stat results taken earlier in the
+                pipeline; files missing from it are stat'ed here
+
+        Returns:
+            Dictionary mapping image paths to their hash values (None for failed images)
+        """
+        total_count = len(image_paths)
+        now = time.time()
+
+        with self.lock:
+            self._ensure_loaded()
+
+            # Step 1: Look up every file, checking that it hasn't changed
+            results = {}
+            misses = []
+            miss_stats = {}
+            for path in image_paths:
+                st = stats.get(path) if stats else None
+                if st is None:
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        misses.append(path)
+                        continue
+
+                entry = self.entries.get(path)
+                if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+                    results[path] = entry[2]
+                    self.entries[path] = (entry[0], entry[1], entry[2], now, entry[4])
+                else:
+                    misses.append(path)
+                    miss_stats[path] = st
+
+        hit_count = len(results)
+        if hit_count:
+            self.dirty = True
+            logger.info("Hash cache: %d of %d images unchanged", hit_count, total_count)
+            if callback and callable(callback):
+                callback(hit_count, total_count)
+
+        if not misses:
+            return results
+
+        # Step 2: Hash the misses, reporting progress for the whole set
+        def miss_callback(processed_count, _miss_count):
+            if callback and callable(callback):
+                callback(hit_count + processed_count, total_count)
+
+        dimensions = {}
+        computed = compute(misses, miss_callback, dimensions)
+        results.update(computed)
+
+        # Step 3: Remember the new hashes (failures are retried next time)
+        with self.lock:
+            for path, hash_value in computed.items():
+                st = miss_stats.get(path)
+                if hash_value is not None and st is not None:
+                    self.entries[path] = (st.st_mtime_ns, st.st_size, hash_value, now, dimensions.get(path))
+                    self.dirty = True
+
+        return results
+
+    def file_info(self, path: str) -> Optional[Tuple[int, Optional[Tuple[int, int]]]]:
+        """
+        Get the size and dimensions a file had when its hash was cached.
+
+        Only entries already in memory are looked at; the cache file is not
+        read for this.
+
+        Args:
+            path: Path to the image file
+
+        Returns:
+            Tuple of (size in bytes, (width, height)), or None if the file isn't cached
+        """
+        with self.lock:
+            entry = self.entries.get(path) if self.entries is not None else None
+        return (entry[1], entry[4]) if entry is not None else None
+
+    def save(self):
+        """Write the cache to disk, merging entries saved meanwhile by other instances."""
+        with self.lock:
+            if not self.dirty or self.entries is None:
+                return
+
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with self._file_lock():
+                    # Keep entries other instances saved since we loaded (ours win)
+                    merged = self._read()
+                    merged.update(self.entries)
+                    self.entries = self._prune(merged)
+                    self._write(self.entries)
+                self.dirty = False
+            except Exception as e:
+                logger.warning("Error writing hash cache: %s", e)
+
+    def clear(self):
+        """Remove all entries from the cache and from disk."""
+        with self.lock:
+            self.entries = {}
+            self.dirty = False
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    def _ensure_loaded(self):
+        """Read the cache file on first use (called with the lock held)."""
+        if self.entries is None:
+            self.entries = self._read()
+
+    def _read(self) -> dict:
+        """Read the entries from disk, returning an empty dict if the file is missing or invalid."""
+        try:
+            with open(self.path, 'rb') as f:
+                data = pickle.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning("Ignoring unreadable hash cache %s: %s", self.path, e)
+            return {}
+
+        if (not isinstance(data, dict) or data.get("version") != CACHE_VERSION
+                or data.get("algorithm") != self.algorithm):
+            return {}
+        return data.get("entries", {})
+
+    def _write(self, entries: dict):
+        """Write the entries to disk atomically."""
+        data = {"version": CACHE_VERSION, "algorithm": self.algorithm, "entries": entries}
+
+        # Write to a temporary file first so readers never see a partial cache
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+    def _prune(self, entries: dict) -> dict:
+        """Drop expired entries and evict the least recently used ones beyond MAX_ENTRIES."""
+        cutoff = time.time() - MAX_ENTRY_AGE
+        entries = {path: entry for path, entry in entries.items() if entry[3] >= cutoff}
+
+        if len(entries) > MAX_ENTRIES:
+            newest = sorted(entries.items(), key=lambda item: item[1][3], reverse=True)[:MAX_ENTRIES]
+            entries = dict(newest)
+
+        return entries
+
+    @contextmanager
+    def _file_lock(self):
+        """Hold an exclusive lock on the sidecar lock file (no-op where flock is unavailable)."""
+        if fcntl is None:
+            yield
+            return
+
+        with open(self.path + ".lock", 'a') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+# Shared instances, one per hash algorithm
+_instances = {}
+_instances_lock = threading.Lock()
+
+def get_hash_cache(algorithm: str = "phash") -> HashCache:
+    """
+    Get the shared hash cache for an algorithm.
+
+    Args:
+        algorithm: Name of the hash algorithm
+
+    Returns:
+        HashCache instance
+    """
+    with _instances_lock:
+        cache = _instances.get(algorithm)
+        if cache is None:
+            cache = _instances[algorithm] = HashCache(algorithm=algorithm)
+        return cache
+
+def cached_file_info(path: str) -> Optional[Tuple[int, Optional[Tuple[int, int]]]]:
+    """
+    Get the size and dimensions of a file as recorded by any of the shared hash caches.
+
+    Every file hashed by a scan has its size (checked against the file when
+    the scan ran) and dimensions recorded, so they can be shown without
+    touching the file.
+
+    Args:
+        path: Path to the image file
+
+    Returns:
+        Tuple of (size in bytes, (width, height)), or None if no loaded cache has the file
+    """
+    with _instances_lock:
+        caches = list(_instances.values())
+
+    for cache in caches:
+        info = cache.file_info(path)
+        if info is not None:
+            return info
+    return None
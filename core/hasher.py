@@ -4,155 +4,335 @@ Hasher module for calculating perceptual hashes of images.
 from pathlib import Path
 from typing import Optional, Union, List, Dict, Tuple
 import os
+import logging
 import multiprocessing
 from concurrent.futures import ProcessPoolExecutor
 import concurrent.futures
 
 # Import resource manager
 from core.resource_manager import get_resource_manager
+from core.fast_reader import open_image, prefetch
+from core.file_handler import iter_batches
+from core.hash_cache import get_hash_cache
 
+import PIL
 from PIL import Image, UnidentifiedImageError
 import imagehash
+import numpy as np
+import scipy.fft
 
-def calculate_perceptual_hash(image_path: Union[str, Path]) -> Optional[str]:
+logger = logging.getLogger(__name__)
+
+# Perceptual hash parameters (same defaults as imagehash.phash)
+HASH_SIZE = 8
+HIGHFREQ_FACTOR = 4
+PHASH_IMAGE_SIZE = HASH_SIZE * HIGHFREQ_FACTOR
+
+# Pillow-SIMD (a drop-in Pillow replacement with SIMD resize kernels) marks its versions with ".post"
+PILLOW_SIMD = ".post" in PIL.__version__
+
+# Resampling filter for the phash downscale. This stays LANCZOS (as in imagehash) even with
+# Pillow-SIMD: a different filter changes the hashes, and after the JPEG draft decode the
+# input is at most 8x the target size, so the filter choice costs little.
+PHASH_RESAMPLE = Image.Resampling.LANCZOS
+
+# Rows of the unnormalized DCT-II basis for the fixed phash input size that
+# produce the low-frequency coefficients (D @ x is the DCT of x along axis 0)
+_DCT_LOW = scipy.fft.dct(np.eye(PHASH_IMAGE_SIZE), type=2, axis=0)[:HASH_SIZE]
+
+# Set IMAGECOMPARE_IMAGEHASH_PHASH=1 to hash with the ImageHash library
+# instead of the built-in kernel (useful for validating hash output)
+USE_IMAGEHASH = os.environ.get("IMAGECOMPARE_IMAGEHASH_PHASH") == "1"
+
+# Hashing runs in threads since decoding, resizing and the DCT all release the GIL.
+# Set IMAGECOMPARE_HEAVY_WORKERS=1 (or pass --heavy-workers) to use worker processes instead.
+USE_PROCESS_POOL = os.environ.get("IMAGECOMPARE_HEAVY_WORKERS") == "1"
+
+# Hashes are cached on disk between scans and only recomputed for new or changed files.
+# Set IMAGECOMPARE_HASH_CACHE=0 to always hash every image.
+USE_HASH_CACHE = os.environ.get("IMAGECOMPARE_HASH_CACHE") != "0"
+
+# Heavy modules imported once by the fork server so workers start warm
+PRELOAD_MODULES = ["PIL.Image", "imagehash", "numpy", "scipy.fft", "core.hasher"]
+
+def _preload_imports():
+    """Import the heavy hashing modules once when a worker process starts."""
+    import PIL.Image
+    import imagehash
+    import numpy
+    import scipy.fft
+    
+    # Register the image plugins up front instead of on the first Image.open
+    PIL.Image.preinit()
+
+def _get_mp_context():
+    """
+    Get the multiprocessing context used for the hashing workers.
+    
+    Uses a fork server with the heavy modules preloaded where available
+    (Linux), so each worker is forked from an already-warm process; other
+    platforms fall back to the default start method.
+    
+    Returns:
+        Multiprocessing context
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("forkserver")
+        ctx.set_forkserver_preload(PRELOAD_MODULES)
+        return ctx
+    
+    return multiprocessing.get_context()
+
+def _to_grayscale(img: Image.Image) -> Image.Image:
+    """Convert an image to 8-bit grayscale, going through RGB for exotic modes."""
+    if img.mode == 'L':
+        return img
+    try:
+        return img.convert('L')
+    except ValueError:
+        return img.convert('RGB').convert('L')
+
+def _phash(img: Image.Image) -> int:
     """
-    Calculate a perceptual hash for an image using ImageHash library.
+    Compute the phash of an image from the low-frequency DCT coefficients of its grayscale pixels.
+    
+    Produces the same value as int(str(imagehash.phash(img)), 16), except for
+    degenerate (e.g. flat) images whose bits are decided by rounding noise.
     
     Args:
-        image_path: Path to the image file
+        img: PIL image to hash
         
     Returns:
-        String representation of the perceptual hash,
+        Perceptual hash packed into a 64-bit unsigned integer
+    """
+    small = _to_grayscale(img).resize((PHASH_IMAGE_SIZE, PHASH_IMAGE_SIZE), PHASH_RESAMPLE)
+    pixels = np.asarray(small, dtype=np.float64)
+    
+    # Compute only the low-frequency corner of the 2D DCT as two small matrix
+    # products and threshold it against its median
+    low_freq = _DCT_LOW @ pixels @ _DCT_LOW.T
+    bits = low_freq > np.median(low_freq)
+    
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+def calculate_perceptual_hash(image_path: Union[str, Path, os.DirEntry]) -> Optional[int]:
+    """
+    Calculate a perceptual hash for an image.
+    
+    Args:
+        image_path: Path (or directory entry) of the image file
+        
+    Returns:
+        Perceptual hash packed into a 64-bit unsigned integer,
         or None if the image could not be processed
+    """
+    return _hash_image(image_path)[0]
+
+def _hash_image(image_path: Union[str, Path, os.DirEntry]) -> Tuple[Optional[int], Optional[Tuple[int, int]]]:
+    """
+    Calculate the perceptual hash of an image, along with its dimensions.
+    
+    The dimensions come from the image header that is read for hashing anyway.
+    
+    Args:
+        image_path: Path (or directory entry) of the image file
         
-    Raises:
-        FileNotFoundError: If the image file does not exist
+    Returns:
+        Tuple of (hash, (width, height)), both None if the image could not be processed
     """
+    image_path = os.fspath(image_path)
+    
     try:
-        # Convert to Path object for consistent handling
-        path = Path(image_path)
-        
-        # Check if file exists
-        if not path.exists():
-            raise FileNotFoundError(f"Image file not found: {image_path}")
-        
-        # Open the image and calculate its perceptual hash
-        with Image.open(path) as img:
-            # Convert to RGB if needed (for transparency handling)
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
+        # Open the image and calculate its perceptual hash (opening fails if the file is missing)
+        with open_image(image_path) as img:
+            # Full dimensions, before the draft mode below shrinks the image
+            dimensions = img.size
+            
+            # Let JPEG decoding shrink on load; only a 32x32 grayscale image is needed.
+            # libjpeg-turbo then decodes just the luma plane, scaled by up to 1/8 in
+            # the DCT domain, and never converts to RGB.
+            img.draft('L', (PHASH_IMAGE_SIZE, PHASH_IMAGE_SIZE))
             
-            # Calculate perceptual hash (using phash algorithm for best balance)
-            hash_value = imagehash.phash(img)
+            if USE_IMAGEHASH:
+                # Reference implementation from the ImageHash library
+                return int(str(imagehash.phash(img)), 16), dimensions
             
-            # Return the hash as a string for easy comparison
-            return str(hash_value)
+            return _phash(img), dimensions
             
+    except FileNotFoundError:
+        logger.warning("Image file not found: %s", image_path)
+        return None, None
     except UnidentifiedImageError:
         # Handle case where file exists but is not a valid image
-        print(f"Error: {image_path} is not a valid image file")
-        return None
+        logger.warning("%s is not a valid image file", image_path)
+        return None, None
     except Exception as e:
         # Handle any other exceptions that might occur
-        print(f"Error processing {image_path}: {str(e)}")
-        return None
+        logger.warning("Error processing %s: %s", image_path, e)
+        return None, None
+
+def _hash_chunk(image_paths: List[str]) -> List[Tuple[str, Optional[int], Optional[Tuple[int, int]]]]:
+    """
+    Calculate perceptual hashes for a chunk of images inside one worker.
+    
+    Args:
+        image_paths: List of paths to image files
+        
+    Returns:
+        List of (path, hash, dimensions) tuples (hash and dimensions are None for failed images)
+    """
+    # Start reading the whole chunk from disk while the first images are decoded
+    prefetch(image_paths)
+    
+    return [(path, *_hash_image(path)) for path in image_paths]
+
+def batch_calculate_hashes(image_paths: List[str], callback=None,
+                           stats: Optional[Dict[str, os.stat_result]] = None) -> Dict[str, Optional[int]]:
+    """
+    Calculate perceptual hashes for multiple images, reusing cached hashes of unchanged files.
+    
+    Args:
+        image_paths: List of paths to image files
+        callback: Optional callback function(processed_count, total_count) for progress tracking
+        stats: Optional dictionary of stat results already taken for the paths,
+            used to check the hash cache without stat'ing the files again
+        
+    Returns:
+        Dictionary mapping image paths to their hash values (None for failed images)
+    """
+    if not USE_HASH_CACHE:
+        return _calculate_hashes(image_paths, callback)
+    
+    # The two implementations may differ in the last bits, so they are cached separately
+    cache = get_hash_cache("imagehash" if USE_IMAGEHASH else "phash")
+    results = cache.get_or_compute(image_paths, _calculate_hashes, callback, stats)
+    cache.save()
+    return results
 
-def batch_calculate_hashes(image_paths: List[str], callback=None) -> Dict[str, Optional[str]]:
+def _calculate_hashes(image_paths: List[str], callback=None,
+                      dimensions: Optional[Dict[str, Tuple[int, int]]] = None) -> Dict[str, Optional[int]]:
     """
-    Calculate perceptual hashes for multiple images in parallel using a process pool.
+    Calculate perceptual hashes for multiple images in parallel.
+    
+    Images are hashed in the shared hashing thread pool, avoiding process startup and the
+    pickling of paths and results. The ImageHash reference implementation
+    holds the GIL for much longer, so it (or USE_PROCESS_POOL) uses a
+    process pool instead. Images are dispatched to the workers in chunks so
+    the per-task overhead is shared by many images instead of paid per image.
     
     Args:
         image_paths: List of paths to image files
         callback: Optional callback function(processed_count, total_count) for progress tracking
+        dimensions: Optional dictionary that receives the (width, height) of every hashed image
         
     Returns:
         Dictionary mapping image paths to their hash values (None for failed images)
     """
     results = {}
+    total_count = len(image_paths)
+    
+    if not total_count:
+        return results
     
     # Get resource recommendations from the resource manager
     resource_manager = get_resource_manager()
     resources = resource_manager.get_optimal_resources("hashing")
+    worker_count = resources["process_count"]
     
-    # Adjust batch size based on recommendations
-    if len(image_paths) > resources["batch_size"]:
-        # For very large collections, process in batches
-        batch_size = resources["batch_size"]
-        batches = [image_paths[i:i+batch_size] for i in range(0, len(image_paths), batch_size)]
-        
-        for batch in batches:
-            # Process each batch
-            batch_results = {}
-            with ProcessPoolExecutor(max_workers=resources["process_count"]) as executor:
-                future_to_path = {executor.submit(calculate_perceptual_hash, path): path for path in batch}
-                
-                # Process batch results
-                for future in concurrent.futures.as_completed(future_to_path):
-                    path = future_to_path[future]
-                    try:
-                        hash_value = future.result()
-                        results[path] = hash_value
-                    except Exception as e:
-                        print(f"Error processing {path}: {e}")
-                        results[path] = None
-                        
-                    # Call progress callback if provided
-                    if callback and callable(callback):
-                        callback(len(results), len(image_paths))
-            
-        return results
+    # Aim for several chunks per worker so the pool stays balanced, but never
+    # let a single chunk grow beyond the recommended batch size
+    chunk_size = -(-total_count // (worker_count * 8))
+    chunk_size = max(1, min(chunk_size, resources["batch_size"]))
+    chunks = list(iter_batches(image_paths, chunk_size))
+    
+    if USE_PROCESS_POOL or USE_IMAGEHASH:
+        executor = ProcessPoolExecutor(max_workers=worker_count, mp_context=_get_mp_context(),
+                                       initializer=_preload_imports)
     else:
-        # For smaller collections, process all at once
-        with ProcessPoolExecutor(max_workers=resources["process_count"]) as executor:
-            # Submit all images to the process pool
-            future_to_path = {executor.submit(calculate_perceptual_hash, path): path
-                             for path in image_paths}
-            
-            # Track progress
-            total_count = len(image_paths)
-            processed_count = 0
+        executor = resource_manager.get_executor("hashing")
+    
+    future_to_chunk = {}
+    wait_for_workers = True
+    try:
+        # Submit all chunks to the pool
+        future_to_chunk = {executor.submit(_hash_chunk, chunk): chunk for chunk in chunks}
+        
+        # Collect results as they complete
+        for future in concurrent.futures.as_completed(future_to_chunk):
+            chunk = future_to_chunk[future]
             
-            # Collect results as they complete
-            for future in concurrent.futures.as_completed(future_to_path):
-                path = future_to_path[future]
-                processed_count += 1
-                
-                try:
-                    hash_value = future.result()
+            try:
+                for path, hash_value, image_dimensions in future.result():
                     results[path] = hash_value
-                except Exception as e:
-                    # Handle exceptions in worker processes
-                    print(f"Error processing {path}: {e}")
+                    if dimensions is not None and image_dimensions is not None:
+                        dimensions[path] = image_dimensions
+            except Exception as e:
+                # Handle exceptions in workers
+                logger.error("Error processing chunk of %d images: %s", len(chunk), e)
+                for path in chunk:
                     results[path] = None
                     
-                # Call progress callback if provided
-                if callback and callable(callback):
-                    callback(processed_count, total_count)
+            # Call progress callback if provided
+            if callback and callable(callback):
+                callback(len(results), total_count)
+    except BaseException:
+        # The callback raised (e.g. InterruptedError on cancellation):
+        # drop the chunks that haven't started instead of hashing them for nothing
+        for future in future_to_chunk:
+            future.cancel()
+        # Nor wait for the chunks already running: their results are discarded,
+        # and the worker processes exit on their own once they finish
+        wait_for_workers = False
+        raise
+    finally:
+        # The shared thread pool stays alive for later calls
+        if isinstance(executor, ProcessPoolExecutor):
+            executor.shutdown(wait=wait_for_workers, cancel_futures=not wait_for_workers)
     
     return results
 
-def group_by_hash(image_paths: List[str], callback=None) -> Dict[str, List[str]]:
+def group_by_hash(image_paths: List[str], callback=None,
+                  identical_groups: Optional[Dict[str, List[str]]] = None,
+                  stats: Optional[Dict[str, os.stat_result]] = None) -> Dict[int, List[str]]:
     """
     Group images by their perceptual hash values using parallel processing.
     
+    Only groups with more than one image are returned. A hash seen once is
+    held as a single entry and only promoted to a group on its second hit,
+    so no separate pass is needed to drop unique images.
+    
     Args:
         image_paths: List of paths to image files
         callback: Optional callback function for progress tracking
+        identical_groups: Optional dictionary mapping each path to all paths
+            with identical contents; each path is expanded into its copies
+        stats: Optional dictionary of stat results already taken for the paths
         
     Returns:
-        Dictionary mapping hash values to lists of image paths with that hash
+        Dictionary mapping hash values to lists of duplicate image paths
     """
     # Calculate hashes in parallel
-    path_to_hash = batch_calculate_hashes(image_paths, callback)
+    path_to_hash = batch_calculate_hashes(image_paths, callback, stats)
     
-    # Group images by hash
+    # Group images by hash, keeping hashes seen only once aside
+    first_seen = {}
     hash_groups = {}
     
     for path, hash_value in path_to_hash.items():
         # Skip images that couldn't be hashed
-        if hash_value is not None:
-            if hash_value not in hash_groups:
-                hash_groups[hash_value] = []
-            hash_groups[hash_value].append(path)
+        if hash_value is None:
+            continue
+        
+        paths = identical_groups[path] if identical_groups else [path]
+        
+        if hash_value in hash_groups:
+            hash_groups[hash_value].extend(paths)
+        elif hash_value in first_seen:
+            hash_groups[hash_value] = first_seen.pop(hash_value) + paths
+        elif len(paths) > 1:
+            # Identical copies are duplicates of each other on their own
+            hash_groups[hash_value] = list(paths)
+        else:
+            first_seen[hash_value] = paths
     
     return hash_groups
\ No newline at end of file
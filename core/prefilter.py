@@ -0,0 +1,159 @@
+"""
+Prefilter module for cheaply detecting byte-identical image files before hashing.
+"""
+import os
+import logging
+import hashlib
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+# Number of bytes read from the start of a file for the quick content check
+DEFAULT_HEAD_SIZE = 4096
+
+# Chunk size used when reading whole files for the full content check (1 MB)
+READ_CHUNK_SIZE = 1024 * 1024
+
+logger = logging.getLogger(__name__)
+
+def group_by_inode(image_paths: Iterable[Union[str, os.DirEntry]],
+                   stats: Optional[Dict[str, os.stat_result]] = None) -> Dict[str, Tuple[int, List[str]]]:
+    """
+    Group paths that refer to the same file on disk.
+
+    Hardlinks share a device and inode number, so they collapse into one
+    group; a path listed more than once is kept only once. Directory entries
+    from os.scandir reuse their cached stat result instead of stat'ing the
+    file again.
+
+    Args:
+        image_paths: Paths (or directory entries) of image files
+        stats: Optional dictionary that receives the stat result of every
+            path, so later steps don't need to stat the files again
+
+    Returns:
+        Dictionary mapping a representative path to (file size, all paths linked to the file)
+    """
+    inode_groups = {}
+    seen_paths = set()
+
+    for path in image_paths:
+        path_str = os.fspath(path)
+        if path_str in seen_paths:
+            continue
+        seen_paths.add(path_str)
+
+        try:
+            st = path.stat() if isinstance(path, os.DirEntry) else os.stat(path_str)
+        except OSError as e:
+            logger.warning("Error reading size of %s: %s", path_str, e)
+            continue
+
+        if stats is not None:
+            stats[path_str] = st
+
+        # Directory entries on Windows don't report inode numbers, so those are never collapsed
+        key = (st.st_dev, st.st_ino) if st.st_ino else path_str
+
+        if key in inode_groups:
+            inode_groups[key][1].append(path_str)
+        else:
+            inode_groups[key] = (st.st_size, [path_str])
+
+    return {paths[0]: (size, paths) for size, paths in inode_groups.values()}
+
+def group_by_head_hash(image_paths: List[str], head_size: int = DEFAULT_HEAD_SIZE) -> Dict[bytes, List[str]]:
+    """
+    Group files by a hash of their first bytes.
+
+    Args:
+        image_paths: List of paths to image files
+        head_size: Number of bytes to read from the start of each file
+
+    Returns:
+        Dictionary mapping head digests to lists of paths with that digest
+    """
+    head_groups = {}
+
+    for path in image_paths:
+        try:
+            with open(path, 'rb') as f:
+                digest = hashlib.blake2b(f.read(head_size), digest_size=16).digest()
+        except OSError as e:
+            logger.warning("Error reading %s: %s", path, e)
+            continue
+
+        head_groups.setdefault(digest, []).append(path)
+
+    return head_groups
+
+def group_by_content_hash(image_paths: List[str]) -> Dict[bytes, List[str]]:
+    """
+    Group files by a hash of their full contents.
+
+    Args:
+        image_paths: List of paths to image files
+
+    Returns:
+        Dictionary mapping content digests to lists of paths with that digest
+    """
+    content_groups = {}
+
+    for path in image_paths:
+        try:
+            digest = hashlib.blake2b(digest_size=16)
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(READ_CHUNK_SIZE), b''):
+                    digest.update(block)
+        except OSError as e:
+            logger.warning("Error reading %s: %s", path, e)
+            continue
+
+        content_groups.setdefault(digest.digest(), []).append(path)
+
+    return content_groups
+
+def group_identical_files(image_paths: Iterable[Union[str, os.DirEntry]],
+                          stats: Optional[Dict[str, os.stat_result]] = None) -> Dict[str, List[str]]:
+    """
+    Collapse byte-identical files so each distinct content is hashed only once.
+
+    Hardlinks and repeated paths are collapsed first. The remaining files
+    are narrowed down by size, then by a hash of their first bytes, and only
+    the remaining candidates are read in full. Files that are unique at any
+    stage are kept as single-member groups: perceptual duplicates usually
+    differ in size, so nothing is dropped here.
+
+    Args:
+        image_paths: Paths (or directory entries) of image files
+        stats: Optional dictionary that receives the stat result of every path
+
+    Returns:
+        Dictionary mapping a representative path to all paths with identical contents
+    """
+    # Step 1: Collapse hardlinks so each file on disk is read at most once
+    inode_groups = group_by_inode(image_paths, stats)
+
+    size_groups = {}
+    for rep, (size, _) in inode_groups.items():
+        size_groups.setdefault(size, []).append(rep)
+
+    # Step 2: Narrow down by size, head hash and full content hash
+    identical_groups = {}
+
+    for size_group in size_groups.values():
+        if len(size_group) == 1:
+            identical_groups[size_group[0]] = size_group
+            continue
+
+        for head_group in group_by_head_hash(size_group).values():
+            if len(head_group) == 1:
+                identical_groups[head_group[0]] = head_group
+                continue
+
+            for content_group in group_by_content_hash(head_group).values():
+                identical_groups[content_group[0]] = content_group
+
+    # Step 3: Expand each file back into all of its links
+    return {
+        rep: [path for member in members for path in inode_groups[member][1]]
+        for rep, members in identical_groups.items()
+    }
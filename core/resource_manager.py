@@ -2,12 +2,33 @@
 Resource manager module for adaptive system resource management.
 """
 import os
+import logging
 import platform
-import psutil
 import threading
 import time
+from functools import cache, lru_cache
 from typing import Dict, Optional, Tuple, Callable
 
+from core.friendly_pool import FriendlyPool
+
+logger = logging.getLogger(__name__)
+
+def _detect_platform_name() -> str:
+    """Detect the operating system platform."""
+    try:
+        return platform.system().lower()
+    except Exception:
+        return "unknown"
+
+# Operating system name (lowercase); it can't change at runtime, so it is detected once
+_PLATFORM_NAME = _detect_platform_name()
+
+@cache
+def _psutil():
+    """Import psutil on first use, so importing this module stays cheap."""
+    import psutil
+    return psutil
+
 # Default resource settings if system detection fails
 DEFAULT_CPU_COUNT = 16  # Balanced setting for AMD Ryzen 9 9900X (leaving cores for OS & other apps)
 DEFAULT_MEMORY_LIMIT = 6 * 1024 * 1024 * 1024  # 6GB (modest for a 30GB system, leaving memory for other apps)
@@ -15,6 +36,26 @@ DEFAULT_THREAD_COUNT = 16  # ~70% of logical cores
 DEFAULT_PROCESS_COUNT = 8  # ~70% of physical core count (12)
 DEFAULT_BATCH_SIZE = 200  # Balanced for memory vs other applications
 
+# Load thresholds above which parallelism and batch sizes are reduced (percent)
+CPU_PRESSURE_THRESHOLD = 80
+MEMORY_PRESSURE_THRESHOLD = 70
+
+# Smoothing factor of the moving average of the usage samples (higher reacts faster)
+USAGE_EWMA_ALPHA = 0.2
+
+# Number of consecutive samples on the other side of a threshold before the load state flips
+PRESSURE_HYSTERESIS = 3
+
+# Seconds between two samples of the system and pool usage
+MONITORING_INTERVAL = 0.5
+
+# Blocking ratio of the scanning pool (share of wall time its running threads
+# spend off the CPU, per thread) at or below which the GIL is considered saturated
+GIL_SATURATION_BLOCKING_RATIO = 0.3
+
+# Upper bound on the number of I/O threads, however many cores there are
+MAX_IO_THREADS = 32
+
 class ResourceManager:
     """
     Adaptive resource manager that detects system capabilities
@@ -24,13 +65,28 @@ class ResourceManager:
     def __init__(self):
         # System capabilities
         self.cpu_count = self._detect_cpu_count()
+        self.physical_cpu_count = self._detect_physical_cpu_count()
         self.total_memory = self._detect_total_memory()
         self.platform_name = self._detect_platform()
         self.gpu_available = self._detect_gpu()
         
-        # Current usage tracking
+        # Current usage tracking (exponentially weighted moving averages of the samples)
         self.current_cpu_usage = 0
         self.current_memory_usage = 0
+        self._usage_sampled = False
+        
+        # Load state with hysteresis, so short spikes don't flip resource decisions
+        self.cpu_pressure = False
+        self.memory_pressure = False
+        self._cpu_crossings = 0
+        self._memory_crossings = 0
+        
+        # Blocking ratio of the scanning pool threads (moving average); when the
+        # threads hardly block, they are CPU bound and more won't help, so the
+        # pool is kept from growing while it is saturated
+        self.blocking_ratio = 1.0
+        self.gil_saturated = False
+        self._pool_sample = None  # ((pool CPU time, running workers), wall time) of the previous sample
         
         # Resource allocation settings
         self.recommended_thread_count = self._calculate_thread_count()
@@ -41,14 +97,21 @@ class ResourceManager:
         # Monitoring
         self.monitoring_active = False
         self.monitoring_thread = None
-        self.monitoring_interval = 1.0  # seconds
-        self.monitoring_callbacks = []
+        self.monitoring_interval = MONITORING_INTERVAL  # seconds
+        # Immutable snapshot, replaced on (un)registration, so the monitoring
+        # loop can iterate it without locking
+        self.monitoring_callbacks = ()
+        self.callbacks_lock = threading.Lock()
+        
+        # Long-lived worker pools, one per operation type
+        self.executors = {}
+        self.executors_lock = threading.Lock()
+        
         # Strategy
         self.strategy = "balanced"  # balanced, performance, memory
         
         # Apply system-specific optimizations
         self.optimize_for_current_system()
-        self.strategy = "balanced"  # balanced, performance, memory
     
     def _detect_cpu_count(self) -> int:
         """Detect the number of CPU cores."""
@@ -57,36 +120,31 @@ class ResourceManager:
             cpu_count = os.cpu_count() or DEFAULT_CPU_COUNT
             
             # Use psutil for more accurate information
-            if hasattr(psutil, 'cpu_count'):
-                physical_count = psutil.cpu_count(logical=False) or cpu_count
-                logical_count = psutil.cpu_count(logical=True) or cpu_count
-                
-                # If we have hyperthreading, we might want to use physical count
-                # for some operations, but for now return logical count
-                return logical_count
-            
-            return cpu_count
+            return _psutil().cpu_count(logical=True) or cpu_count
         except Exception as e:
-            print(f"Error detecting CPU count: {e}")
+            logger.warning("Error detecting CPU count: %s", e)
             return DEFAULT_CPU_COUNT
     
+    def _detect_physical_cpu_count(self) -> int:
+        """Detect the number of physical CPU cores (estimated as half the logical cores if unknown)."""
+        estimate = max(1, self.cpu_count // 2)
+        try:
+            return _psutil().cpu_count(logical=False) or estimate
+        except Exception as e:
+            logger.warning("Error detecting physical CPU count: %s", e)
+            return estimate
+    
     def _detect_total_memory(self) -> int:
         """Detect total system memory in bytes."""
         try:
-            if hasattr(psutil, 'virtual_memory'):
-                mem = psutil.virtual_memory()
-                return mem.total
-            return DEFAULT_MEMORY_LIMIT
+            return _psutil().virtual_memory().total
         except Exception as e:
-            print(f"Error detecting system memory: {e}")
+            logger.warning("Error detecting system memory: %s", e)
             return DEFAULT_MEMORY_LIMIT
     
     def _detect_platform(self) -> str:
         """Detect the operating system platform."""
-        try:
-            return platform.system().lower()
-        except Exception:
-            return "unknown"
+        return _PLATFORM_NAME
     
     def _detect_gpu(self) -> bool:
         """
@@ -108,18 +166,22 @@ class ResourceManager:
         
         if self.platform_name == "windows":
             # Windows has higher thread creation overhead
-            # Use approximately 1.5x logical cores, capped at 75% of total
-            return min(int(logical_cores * 1.5), int(logical_cores * 0.75))
+            # Use approximately 1.5x logical cores
+            thread_count = int(logical_cores * 1.5)
         else:
             # Linux/Unix can handle more threads efficiently
-            # Use approximately 2x logical cores, capped at 75% of total for highest priority tasks
-            return min(int(logical_cores * 2), int(logical_cores * 0.75))
+            # Use approximately 2x logical cores
+            thread_count = int(logical_cores * 2)
+        
+        # I/O threads mostly wait, so they may exceed the core count, but cap them
+        # so very large machines don't spawn an excessive number of threads
+        return max(1, min(thread_count, MAX_IO_THREADS))
+    
     def _calculate_process_count(self) -> int:
         """Calculate the recommended number of processes for CPU-bound operations."""
         # For CPU-bound operations on AMD Ryzen 9 9900X, use a balanced approach
         # Use approximately 70% of physical cores to leave resources for other applications
-        physical_cores = self.cpu_count // 2 if self.cpu_count > 1 else 1  # Estimate physical cores
-        return max(1, int(physical_cores * 0.7))
+        return max(1, int(self.physical_cpu_count * 0.7))
     
     def _calculate_batch_size(self) -> int:
         """Calculate the recommended batch size based on system memory."""
@@ -165,9 +227,9 @@ class ResourceManager:
         
         # Adjust based on operation type
         if operation_type == "scanning":
-            # File scanning is I/O bound, so use more threads but be balanced
-            # For a 24-thread system, use about 32 threads (still I/O bound, but not excessive)
-            resources["thread_count"] = min(self.cpu_count * 1.5, 32)
+            # File scanning is I/O bound, so use the full I/O thread count
+            # (more threads than cores, capped at MAX_IO_THREADS)
+            resources["thread_count"] = self.recommended_thread_count
             resources["process_count"] = 1  # Scanning doesn't benefit from multiple processes
             
         elif operation_type == "hashing":
@@ -182,12 +244,12 @@ class ResourceManager:
             resources["process_count"] = 1  # Loading in the main process for simplicity
         
         # Adjust based on current system load
-        if self.current_cpu_usage > 80:
+        if self.cpu_pressure:
             # System is under heavy CPU load, reduce parallel operations
             resources["thread_count"] = max(2, resources["thread_count"] // 2)
             resources["process_count"] = max(1, resources["process_count"] // 2)
         
-        if self.current_memory_usage > 70:
+        if self.memory_pressure:
             # System is under heavy memory pressure, reduce batch size
             resources["batch_size"] = max(10, resources["batch_size"] // 2)
             resources["memory_limit"] = int(resources["memory_limit"] * 0.7)
@@ -214,57 +276,101 @@ class ResourceManager:
         Apply optimizations specific to the current system (AMD Ryzen 9 9900X with 30GB RAM).
         This method fine-tunes settings specifically for the detected hardware.
         """
-        # Get current CPU model info
-        cpu_model = self._get_cpu_model()
+        # Get current CPU model info (cached for get_system_info)
+        cpu_model = self.cpu_model = self._get_cpu_model(self.cpu_count)
         memory_gb = self.total_memory / (1024**3)
         
         # Log system information
-        print(f"Optimizing for detected system: {cpu_model}, {memory_gb:.1f}GB RAM")
+        logger.info("Optimizing for detected system: %s, %.1fGB RAM", cpu_model, memory_gb)
         
         # AMD Ryzen 9 9900X specific optimizations
         if "AMD Ryzen 9" in cpu_model and self.cpu_count >= 20:
-            print("Applying AMD Ryzen 9 9900X specific optimizations")
+            logger.info("Applying AMD Ryzen 9 9900X specific optimizations")
             
             # AMD Ryzen processors benefit from specific thread/core allocation strategies
             
             # For scanning (mostly I/O bound), use thread count optimized for AMD architecture
             # AMD CPUs have strong multithreading performance in I/O operations
-            self.recommended_thread_count = min(int(self.cpu_count * 1.5), 32)
+            self.recommended_thread_count = min(int(self.cpu_count * 1.5), MAX_IO_THREADS)
             
             # For CPU-bound operations, Ryzen processors benefit from process count
             # that aligns with CCX (Core Complex) boundaries - typically groups of 4 cores
-            physical_cores = self.cpu_count // 2  # Estimate physical cores
             # Use 8 processes for 12-core Ryzen (leaving 4 cores free for system)
-            self.recommended_process_count = max(1, int(physical_cores * 2/3))
+            self.recommended_process_count = max(1, int(self.physical_cpu_count * 2/3))
             
             # Batch sizes can be moderately increased for high-memory AMD systems
             # AMD processors with high core counts benefit from larger batch processing
             if memory_gb >= 28:  # Detected ~30GB system
                 self.recommended_batch_size = 180  # Balanced setting for 30GB system
-                print(f"Using balanced batch size of {self.recommended_batch_size} for 30GB system")
+                logger.info("Using balanced batch size of %d for 30GB system", self.recommended_batch_size)
             
             # Update memory limit based on physical RAM (40% of your 30GB, about 12GB)
             self.memory_limit = int(self.total_memory * 0.4)
             
-            print(f"Optimized settings: threads={self.recommended_thread_count}, "
-                  f"processes={self.recommended_process_count}, "
-                  f"batch_size={self.recommended_batch_size}, "
-                  f"memory_limit={self.memory_limit/(1024**3):.1f}GB")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Optimized settings: threads=%s, processes=%s, batch_size=%s, memory_limit=%.1fGB",
+                            self.recommended_thread_count, self.recommended_process_count,
+                            self.recommended_batch_size, self.memory_limit / (1024**3))
     
-    def _get_cpu_model(self) -> str:
-        """Get CPU model name for system-specific optimizations."""
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _get_cpu_model(cpu_count: int) -> str:
+        """
+        Get CPU model name for system-specific optimizations.
+        
+        The result is cached, so /proc/cpuinfo is only read once per process.
+        
+        Args:
+            cpu_count: Number of logical cores, shown when the model can't be read
+            
+        Returns:
+            CPU model name
+        """
         try:
-            if platform.system() == "Linux":
+            if _PLATFORM_NAME == "linux":
                 with open("/proc/cpuinfo", "r") as f:
                     for line in f:
                         if "model name" in line:
                             return line.split(":")[1].strip()
             
             # If specific detection failed, use generic info
-            return f"{platform.processor()} ({self.cpu_count} threads)"
+            return f"{platform.processor()} ({cpu_count} threads)"
         except Exception as e:
-            print(f"Error detecting CPU model: {e}")
-            return f"Unknown CPU ({self.cpu_count} threads)"
+            logger.warning("Error detecting CPU model: %s", e)
+            return f"Unknown CPU ({cpu_count} threads)"
+    
+    def get_executor(self, operation_type: str) -> FriendlyPool:
+        """
+        Get the shared worker pool for an operation type.
+        
+        The pool is created on first use and reused afterwards. The hashing
+        pool adapts the number of active workers to the load of the system
+        itself, so callers should not shut it down.
+        
+        Args:
+            operation_type: Type of operation (scanning, hashing, image_loading)
+            
+        Returns:
+            FriendlyPool for the operation type
+        """
+        with self.executors_lock:
+            executor = self.executors.get(operation_type)
+            if executor is None:
+                resources = self.get_optimal_resources(operation_type)
+                
+                # CPU-bound hashing runs one worker per recommended process and
+                # backs off under CPU contention; the I/O-bound pools stay at full width
+                cpu_bound = operation_type == "hashing"
+                if cpu_bound:
+                    worker_count = resources["process_count"]
+                else:
+                    worker_count = resources["thread_count"]
+                
+                executor = FriendlyPool(max_workers=int(worker_count), name=f"{operation_type}-pool",
+                                        cpu_bound=cpu_bound)
+                self.executors[operation_type] = executor
+            
+            return executor
     
     def set_strategy(self, strategy: str):
         """
@@ -276,7 +382,7 @@ class ResourceManager:
         if strategy in ("balanced", "performance", "memory"):
             self.strategy = strategy
         else:
-            print(f"Unknown strategy: {strategy}, using 'balanced'")
+            logger.warning("Unknown strategy: %s, using 'balanced'", strategy)
             self.strategy = "balanced"
     
     def start_monitoring(self):
@@ -297,29 +403,139 @@ class ResourceManager:
         if self.monitoring_thread and self.monitoring_thread.is_alive():
             self.monitoring_thread.join(timeout=2.0)
     
+    def _update_pressure(self, pressure: bool, crossings: int, usage: float, threshold: float) -> Tuple[bool, int]:
+        """
+        Advance the hysteresis state of one resource.
+        
+        The state only flips after PRESSURE_HYSTERESIS consecutive samples
+        on the other side of the threshold.
+        
+        Args:
+            pressure: Whether the resource is currently considered under pressure
+            crossings: Consecutive samples so far that disagree with the current state
+            usage: Smoothed usage in percent
+            threshold: Usage threshold in percent
+            
+        Returns:
+            Tuple of (new pressure state, new crossing count)
+        """
+        if (usage > threshold) == pressure:
+            return pressure, 0
+        
+        crossings += 1
+        if crossings >= PRESSURE_HYSTERESIS:
+            return not pressure, 0
+        return pressure, crossings
+    
+    def _record_usage(self, cpu_percent: float, memory_percent: float):
+        """
+        Fold a new usage sample into the moving averages and load state.
+        
+        Args:
+            cpu_percent: Sampled CPU usage in percent
+            memory_percent: Sampled memory usage in percent
+        """
+        if self._usage_sampled:
+            self.current_cpu_usage = USAGE_EWMA_ALPHA * cpu_percent + (1 - USAGE_EWMA_ALPHA) * self.current_cpu_usage
+            self.current_memory_usage = USAGE_EWMA_ALPHA * memory_percent + (1 - USAGE_EWMA_ALPHA) * self.current_memory_usage
+        else:
+            # Seed the averages with the first sample
+            self.current_cpu_usage = cpu_percent
+            self.current_memory_usage = memory_percent
+            self._usage_sampled = True
+        
+        self.cpu_pressure, self._cpu_crossings = self._update_pressure(
+            self.cpu_pressure, self._cpu_crossings, self.current_cpu_usage, CPU_PRESSURE_THRESHOLD)
+        self.memory_pressure, self._memory_crossings = self._update_pressure(
+            self.memory_pressure, self._memory_crossings, self.current_memory_usage, MEMORY_PRESSURE_THRESHOLD)
+    
+    def _sample_pool_cpu_time(self, process) -> Optional[Tuple[float, int]]:
+        """
+        Get the CPU time used so far by the threads of the scanning pool.
+        
+        Args:
+            process: psutil.Process of this process
+            
+        Returns:
+            Tuple of (total user and system CPU time in seconds, number of workers
+            running a task), or None if the pool has no threads yet
+        """
+        executor = self.executors.get("scanning")
+        if executor is None:
+            return None
+        
+        thread_ids = executor.worker_native_ids()
+        if not thread_ids:
+            return None
+        
+        cpu_time = sum(thread.user_time + thread.system_time
+                       for thread in process.threads() if thread.id in thread_ids)
+        return cpu_time, executor.running
+    
+    def _record_blocking(self, process):
+        """
+        Sample the scanning pool's blocking ratio and cap the pool while the GIL is saturated.
+        
+        The blocking ratio is the share of wall time the running workers spend
+        off the CPU, per worker: 1 - (pool CPU time / (workers * wall time)).
+        Workers waiting on I/O keep it high however many run in parallel,
+        while workers that keep the CPU busy drive it towards zero; adding
+        workers then only adds contention for the GIL. While saturated, the
+        pool is kept at the number of workers running when saturation began.
+        
+        Args:
+            process: psutil.Process of this process
+        """
+        sample = self._sample_pool_cpu_time(process)
+        wall_time = time.monotonic()
+        previous, self._pool_sample = self._pool_sample, (sample, wall_time)
+        
+        if sample is None or previous is None or previous[0] is None:
+            return
+        
+        wall_delta = wall_time - previous[1]
+        if wall_delta <= 0:
+            return
+        
+        # Parked workers would count as blocked, so only the running ones are counted
+        cpu_time, running = sample
+        threads = max(running, previous[0][1])
+        if threads == 0:
+            return  # Nothing ran, so nothing to judge
+        
+        busy = (cpu_time - previous[0][0]) / (threads * wall_delta)
+        blocking = 1.0 - min(1.0, max(0.0, busy))
+        self.blocking_ratio = USAGE_EWMA_ALPHA * blocking + (1 - USAGE_EWMA_ALPHA) * self.blocking_ratio
+        
+        saturated = self.blocking_ratio <= GIL_SATURATION_BLOCKING_RATIO
+        if saturated != self.gil_saturated:
+            self.gil_saturated = saturated
+            executor = self.executors.get("scanning")
+            executor.set_worker_cap(max(1, running) if saturated else executor.max_workers)
+    
     def _monitoring_loop(self):
         """Background thread to monitor system resources."""
+        psutil = _psutil()
+        process = psutil.Process()
         while self.monitoring_active:
             try:
-                # Update CPU usage
-                self.current_cpu_usage = psutil.cpu_percent(interval=None)
-                
-                # Update memory usage
-                mem = psutil.virtual_memory()
-                self.current_memory_usage = mem.percent
+                # Sample CPU and memory usage once per interval
+                self._record_usage(psutil.cpu_percent(interval=None), psutil.virtual_memory().percent)
+                self._record_blocking(process)
                 
-                # Notify callbacks
-                for callback in self.monitoring_callbacks:
+                # Notify callbacks (read the snapshot once per tick)
+                callbacks = self.monitoring_callbacks
+                for callback in callbacks:
                     try:
                         callback(self.current_cpu_usage, self.current_memory_usage)
                     except Exception as e:
-                        print(f"Error in monitoring callback: {e}")
+                        logger.warning("Error in monitoring callback: %s", e)
                 
                 # Sleep for the interval
                 time.sleep(self.monitoring_interval)
                 
             except Exception as e:
-                print(f"Error in resource monitoring: {e}")
+                logger.warning("Error in resource monitoring: %s", e)
                 time.sleep(self.monitoring_interval)
     
     def register_monitoring_callback(self, callback: Callable[[float, float], None]):
@@ -329,8 +545,9 @@ class ResourceManager:
         Args:
             callback: Function to call with (cpu_percent, memory_percent)
         """
-        if callback not in self.monitoring_callbacks:
-            self.monitoring_callbacks.append(callback)
+        with self.callbacks_lock:
+            if callback not in self.monitoring_callbacks:
+                self.monitoring_callbacks = self.monitoring_callbacks + (callback,)
     
     def unregister_monitoring_callback(self, callback: Callable[[float, float], None]):
         """
@@ -339,8 +556,9 @@ class ResourceManager:
         Args:
             callback: Function to unregister
         """
-        if callback in self.monitoring_callbacks:
-            self.monitoring_callbacks.remove(callback)
+        with self.callbacks_lock:
+            self.monitoring_callbacks = tuple(
+                registered for registered in self.monitoring_callbacks if registered != callback)
     
     def get_system_info(self) -> Dict[str, any]:
         """
@@ -365,20 +583,15 @@ class ResourceManager:
         # Add detailed CPU info if available
         try:
             cpu_info = {}
+            psutil = _psutil()
             if hasattr(psutil, "cpu_freq"):
                 freq = psutil.cpu_freq()
                 if freq:
                     cpu_info["frequency_mhz"] = round(freq.current)
                     
-            if platform.system() == "Linux":
-                try:
-                    with open("/proc/cpuinfo", "r") as f:
-                        for line in f:
-                            if "model name" in line:
-                                cpu_info["model"] = line.split(":")[1].strip()
-                                break
-                except:
-                    pass
+            # The model name was read once at startup
+            if self.platform_name == "linux":
+                cpu_info["model"] = self.cpu_model
                     
             info["cpu_info"] = cpu_info
         except:
@@ -386,8 +599,9 @@ class ResourceManager:
             
         return info
 
-# Singleton instance
+# Singleton instance (created under the lock so concurrent first calls share one manager)
 _instance = None
+_instance_lock = threading.Lock()
 
 def get_resource_manager(force_balanced: bool = False) -> ResourceManager:
     """
@@ -401,7 +615,10 @@ def get_resource_manager(force_balanced: bool = False) -> ResourceManager:
     """
     global _instance
     if _instance is None:
-        _instance = ResourceManager()
+        with _instance_lock:
+            # Check again: another thread may have created it while we waited
+            if _instance is None:
+                _instance = ResourceManager()
         
     # Apply balanced mode if requested
     if force_balanced and _instance.strategy != "balanced":
@@ -2,17 +2,28 @@
 Scanner module for finding image files in specified directories.
 """
 import os
-from pathlib import Path
-from typing import List, Set
+import logging
+from typing import Iterator, List, Optional, Set, Tuple
 import concurrent.futures
 import multiprocessing
+import threading
 
 # Import resource manager
 from core.resource_manager import get_resource_manager
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Executor
 
-# Common image file extensions to scan for
-IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp'}
+logger = logging.getLogger(__name__)
+
+# Common image file extensions to scan for (lowercase, immutable)
+IMAGE_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp'})
+
+# Tuple form of the extensions, built once at import time, for a single
+# lower() + str.endswith call per file name (no splitext, no per-entry set).
+# endswith tries the suffixes in order, so the most common formats come first
+# (iterating the set would give a different, hash-seed dependent order per run).
+_EXT_POPULARITY = ('.jpg', '.jpeg', '.png', '.webp', '.gif', '.tiff', '.bmp')
+_IMG_EXT_TUPLE = tuple(sorted(IMAGE_EXTENSIONS, key=lambda ext: (
+    _EXT_POPULARITY.index(ext) if ext in _EXT_POPULARITY else len(_EXT_POPULARITY))))
 
 def scan_single_directory(directory: str) -> List[str]:
     """
@@ -28,22 +39,151 @@ def scan_single_directory(directory: str) -> List[str]:
         ValueError: If the directory path is invalid
     """
     image_files = []
-    dir_path = Path(directory)
     
-    if not dir_path.exists() or not dir_path.is_dir():
-        raise ValueError(f"Invalid directory path: {directory}")
+    # Walk through directory tree with a stack of directories to visit;
+    # opening the root doubles as its validation
+    stack = _open_directories([directory])
+    while stack:
+        current_dir, entries = stack.pop()
+        try:
+            with entries if entries is not None else os.scandir(current_dir) as it:
+                for entry in it:
+                    # The entry type comes from the directory listing itself, so no stat is needed
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append((entry.path, None))
+                    # Only add regular files with image extensions; the extension is
+                    # checked first so the file type is only looked up for candidates
+                    elif entry.name.lower().endswith(_IMG_EXT_TUPLE) and entry.is_file(follow_symlinks=False):
+                        image_files.append(entry.path)
+        except OSError:
+            # Skip directories that can't be read (same as os.walk)
+            continue
+    
+    return image_files
+
+def _open_directories(directory_paths: List[str]) -> List[Tuple[str, Iterator[os.DirEntry]]]:
+    """
+    Open the root directories of a scan, validating them in the same step.
+    
+    Opening a directory is the first step of scanning it anyway, so this
+    avoids separate exists()/is_dir() stats for each root.
+    
+    Args:
+        directory_paths: Root directories to scan
+        
+    Returns:
+        List of (directory, scandir iterator) pairs; directories that exist
+        but can't be read are left out (skipped, like os.walk)
+        
+    Raises:
+        ValueError: If any directory path is invalid
+    """
+    opened = []
+    try:
+        for directory in directory_paths:
+            try:
+                opened.append((directory, os.scandir(directory)))
+            except (FileNotFoundError, NotADirectoryError):
+                raise ValueError(f"Invalid directory path: {directory}") from None
+            except OSError as e:
+                logger.debug("Skipping unreadable directory %s: %s", directory, e)
+    except BaseException:
+        # Don't leak the directories opened before the invalid one
+        for _, entries in opened:
+            entries.close()
+        raise
+    
+    return opened
+
+class _ParallelWalker:
+    """
+    Directory walker that scans every subdirectory as a separate pool task,
+    so even a single directory tree is scanned by several threads.
+    """
+    
+    def __init__(self, executor: Executor):
+        """
+        Initialize the walker.
+        
+        Args:
+            executor: Thread pool to scan the directories on
+        """
+        self.executor = executor
+        self.lock = threading.Lock()
+        self.pending = 0  # Directories submitted but not yet scanned
+        self.done = threading.Event()
+        self.image_files = []
     
-    # Walk through directory tree
-    for root, _, files in os.walk(dir_path):
-        for file in files:
-            file_path = os.path.join(root, file)
-            ext = os.path.splitext(file_path)[1].lower()
+    def walk(self, directories: List[str]) -> List[str]:
+        """
+        Scan directory trees recursively for image files.
+        
+        Args:
+            directories: Root directories to scan
             
-            # Only add files with image extensions
-            if ext in IMAGE_EXTENSIONS:
-                image_files.append(file_path)
+        Returns:
+            List of paths to image files found
+            
+        Raises:
+            ValueError: If any directory path is invalid (nothing is scanned then)
+        """
+        roots = _open_directories(directories)
+        if not roots:
+            return []
+        
+        for i, (directory, entries) in enumerate(roots):
+            try:
+                self._submit(directory, entries)
+            except Exception:
+                # Close the roots that were never handed to the pool
+                for _, unsubmitted in roots[i + 1:]:
+                    unsubmitted.close()
+                raise
+        
+        self.done.wait()
+        return self.image_files
     
-    return image_files
+    def _submit(self, directory: str, entries: Optional[Iterator[os.DirEntry]] = None):
+        """Queue a directory to be scanned (optionally with its already opened scandir iterator)."""
+        with self.lock:
+            self.pending += 1
+        try:
+            self.executor.submit(self._scan, directory, entries)
+        except Exception:
+            # The directory will never be scanned, so don't wait for it
+            if entries is not None:
+                entries.close()
+            self._finish_one()
+            raise
+    
+    def _scan(self, directory: str, entries: Optional[Iterator[os.DirEntry]] = None):
+        """Scan one directory, queueing its subdirectories for other workers."""
+        found = []
+        try:
+            with entries if entries is not None else os.scandir(directory) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        # Subdirectories are queued before this task finishes,
+                        # so the pending count only reaches zero at the very end
+                        self._submit(entry.path)
+                    elif entry.name.lower().endswith(_IMG_EXT_TUPLE) and entry.is_file(follow_symlinks=False):
+                        found.append(entry.path)
+        except OSError as e:
+            # Skip directories that can't be read (same as os.walk)
+            logger.debug("Skipping unreadable directory %s: %s", directory, e)
+        except Exception as e:
+            logger.warning("Error scanning directory %s: %s", directory, e)
+        finally:
+            with self.lock:
+                self.image_files.extend(found)
+            self._finish_one()
+    
+    def _finish_one(self):
+        """Count one submitted directory as done, waking walk() after the last one."""
+        with self.lock:
+            self.pending -= 1
+            if self.pending == 0:
+                self.done.set()
 
 def find_image_files(directory_paths: List[str]) -> List[str]:
     """
@@ -58,35 +198,10 @@ def find_image_files(directory_paths: List[str]) -> List[str]:
     Raises:
         ValueError: If any directory path is invalid
     """
-    # Validate directories first to fail early if any are invalid
-    for directory in directory_paths:
-        dir_path = Path(directory)
-        if not dir_path.exists() or not dir_path.is_dir():
-            raise ValueError(f"Invalid directory path: {directory}")
-    
-    # Get resource recommendations from the resource manager
     resource_manager = get_resource_manager()
-    resources = resource_manager.get_optimal_resources("scanning")
-    
-    # Use recommended thread count, but adjust based on directory count
-    max_workers = min(resources["thread_count"], len(directory_paths) * 4)
-    
-    all_image_files = []
-    
-    # Use ThreadPoolExecutor for parallel directory scanning
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all directories to the thread pool
-        future_to_dir = {executor.submit(scan_single_directory, dir_path): dir_path
-                        for dir_path in directory_paths}
-        
-        # Collect results as they complete
-        for future in concurrent.futures.as_completed(future_to_dir):
-            dir_path = future_to_dir[future]
-            try:
-                image_files = future.result()
-                all_image_files.extend(image_files)
-            except Exception as e:
-                # Log the error but continue processing other directories
-                print(f"Error scanning directory {dir_path}: {e}")
     
-    return all_image_files
\ No newline at end of file
+    # Use the shared scanning pool; each subdirectory is a separate task,
+    # so a single root directory is still scanned in parallel. Every root is
+    # opened (and so validated) before any scanning starts.
+    executor = resource_manager.get_executor("scanning")
+    return _ParallelWalker(executor).walk(list(directory_paths))
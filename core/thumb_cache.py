@@ -0,0 +1,178 @@
+"""
+Thumbnail cache module for persisting generated thumbnails on disk.
+"""
+import os
+import logging
+import hashlib
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Optional, Tuple, Union
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Location of the cache (follows the XDG base directory convention)
+CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+    "imagecompare", "thumbs"
+)
+
+# Number of bytes from the start of the file used in the cache key (64 KB)
+KEY_HEAD_SIZE = 64 * 1024
+
+# Maximum total size of the cache directory before old entries are evicted (256 MB)
+CACHE_SIZE_BUDGET = 256 * 1024 * 1024
+
+# Quality used when encoding cached thumbnails as WebP
+WEBP_QUALITY = 80
+
+# How many thumbnails are stored between checks of the cache size budget
+EVICTION_CHECK_INTERVAL = 64
+
+_stores_since_check = 0
+_eviction_lock = threading.Lock()
+
+def get_cache_key(file_path: Union[str, Path], size: Tuple[int, int]) -> Optional[str]:
+    """
+    Build the cache key for a thumbnail of a file.
+
+    The key combines the first bytes of the file with its size and
+    modification time, so edited files never hit a stale entry.
+
+    Args:
+        file_path: Path to the image file
+        size: Thumbnail size (width, height)
+
+    Returns:
+        Hex digest identifying the thumbnail, or None if the file can't be read
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            digest = hashlib.blake2b(f.read(KEY_HEAD_SIZE), digest_size=16)
+    except OSError:
+        return None
+
+    digest.update(f"{st.st_size}:{st.st_mtime_ns}:{size[0]}x{size[1]}".encode())
+    return digest.hexdigest()
+
+def _cache_file(key: str) -> str:
+    """Get the path of the cache file for a key."""
+    return os.path.join(CACHE_DIR, f"{key}.webp")
+
+def load(key: str) -> Optional[Image.Image]:
+    """
+    Load a cached thumbnail.
+
+    Args:
+        key: Cache key from get_cache_key
+
+    Returns:
+        PIL Image, or None on a cache miss
+    """
+    cache_file = _cache_file(key)
+    try:
+        with Image.open(cache_file) as img:
+            img.load()
+        # Refresh the modification time so eviction treats the entry as recently used
+        os.utime(cache_file)
+        return img
+    except (OSError, ValueError):
+        return None
+
+def store(key: str, image: Image.Image):
+    """
+    Write a thumbnail to the cache.
+
+    Args:
+        key: Cache key from get_cache_key
+        image: Thumbnail to store
+    """
+    global _stores_since_check
+
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+
+        # Write to a temporary file first so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                image.save(f, format="WEBP", quality=WEBP_QUALITY)
+            os.replace(tmp_path, _cache_file(key))
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+    except Exception as e:
+        logger.warning("Error writing thumbnail cache entry: %s", e)
+        return
+
+    with _eviction_lock:
+        _stores_since_check += 1
+        if _stores_since_check < EVICTION_CHECK_INTERVAL:
+            return
+        _stores_since_check = 0
+
+    evict()
+
+def evict(budget: int = CACHE_SIZE_BUDGET):
+    """
+    Remove the least recently used thumbnails once the cache exceeds its budget.
+
+    Args:
+        budget: Maximum total size of the cache in bytes
+    """
+    try:
+        entries = []
+        total_size = 0
+        with os.scandir(CACHE_DIR) as it:
+            for entry in it:
+                if entry.name.endswith(".webp"):
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+                    total_size += st.st_size
+    except OSError:
+        return
+
+    if total_size <= budget:
+        return
+
+    # Remove oldest entries until we're comfortably under the budget
+    entries.sort()
+    target_size = int(budget * 0.8)
+    for _, size, path in entries:
+        if total_size <= target_size:
+            break
+        try:
+            os.remove(path)
+            total_size -= size
+        except OSError:
+            pass
+
+def get_or_make(file_path: Union[str, Path], size: Tuple[int, int],
+                make_thumbnail: Callable[[Union[str, Path], Tuple[int, int]], Image.Image]) -> Image.Image:
+    """
+    Get a thumbnail from the cache, generating and storing it on a miss.
+
+    Args:
+        file_path: Path to the image file
+        size: Desired thumbnail size (width, height)
+        make_thumbnail: Function(file_path, size) that generates the thumbnail
+
+    Returns:
+        PIL Image thumbnail
+    """
+    key = get_cache_key(file_path, size)
+
+    if key is not None:
+        cached = load(key)
+        if cached is not None:
+            return cached
+
+    thumbnail = make_thumbnail(file_path, size)
+
+    if key is not None:
+        store(key, thumbnail)
+
+    return thumbnail
@@ -4,13 +4,18 @@ Main entry point for the ImageCompare application.
 """
 import sys
 import os
-from PySide6.QtWidgets import QApplication, QMessageBox
-from ui.main_window import MainWindow
+import logging
 from core.resource_manager import get_resource_manager
 
+logger = logging.getLogger(__name__)
+
 def show_optimization_info():
     """Display information about system optimizations."""
     try:
+        # Only the PIL package itself is imported here, not the hashing stack
+        import PIL
+        pillow_simd = ".post" in PIL.__version__
+        
         # Get optimized resource manager
         resource_manager = get_resource_manager()
         system_info = resource_manager.get_system_info()
@@ -29,6 +34,7 @@ def show_optimization_info():
             f"• Using {system_info.get('recommended_process_count', 'Unknown')} processes for hashing\n"
             f"• Using up to {system_info.get('recommended_thread_count', 'Unknown')} threads for scanning\n"
             f"• Using batch size of {system_info.get('recommended_batch_size', 'Unknown')} for processing\n"
+            f"• Pillow-SIMD: {'Yes' if pillow_simd else 'No (optional, see README)'}\n"
             f"\nOptimization strategy: {system_info.get('current_strategy', 'balanced').capitalize()}"
         )
         
@@ -36,13 +42,31 @@ def show_optimization_info():
         return info
         
     except Exception as e:
-        print(f"Error showing optimization info: {e}")
+        logger.warning("Error showing optimization info: %s", e)
         return None
 
 def main():
     """Main entry point for the application."""
+    # Configure logging once for the whole application
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    
     # Initialize resource manager with system optimizations
     get_resource_manager()
+    
+    # Hash in worker processes instead of threads (optional)
+    if "--heavy-workers" in sys.argv:
+        # Imported only here: the hashing stack (NumPy, SciPy, Pillow) is slow to load
+        from core import hasher
+        hasher.USE_PROCESS_POOL = True
+    
+    # Headless: print the optimization info and exit without loading Qt
+    if "--print-optimizations" in sys.argv:
+        sys.exit(0 if show_optimization_info() else 1)
+    
+    # Qt is only imported once we know the GUI is needed (it is the largest startup cost)
+    from PySide6.QtWidgets import QApplication, QMessageBox
+    from ui.main_window import MainWindow
+    
     # Create the Qt Application
     app = QApplication(sys.argv)
     
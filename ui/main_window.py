@@ -2,19 +2,16 @@
 Main window module for the ImageCompare application.
 """
 import os
+import time
 import threading
-from typing import Dict, List
+from typing import Dict, List, Optional
 
-from PySide6.QtCore import Qt, Slot, Signal, QObject, QEvent
+from PySide6.QtCore import Qt, Slot, Signal, QObject, QEvent, QRunnable, QThreadPool
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QSplitter, QMessageBox, QApplication, QStatusBar, QLabel,
-    QTreeWidgetItem
+    QSplitter, QMessageBox, QApplication, QStatusBar, QLabel
 )
 
-from core.scanner import find_image_files
-from core.hasher import calculate_perceptual_hash
-from core.duplicate_finder import identify_duplicates, find_duplicates
 from core.file_handler import move_to_trash
 from core.resource_manager import get_resource_manager
 
@@ -23,33 +20,53 @@ from ui.widgets.progress_display import ProgressDisplay
 from ui.widgets.duplicate_list import DuplicateList
 from ui.widgets.image_compare import ImageCompare
 
+# Minimum time between two progress updates sent from the scan thread (~30 Hz)
+PROGRESS_UPDATE_INTERVAL = 1 / 30
+
 # Helper class for thread-safe signals
 class ThreadHelper(QObject):
     """Helper class to emit signals from a worker thread to the main thread."""
     update_status_signal = Signal(str)
     update_progress_signal = Signal(int)
-    update_duplicate_sets_signal = Signal(dict)
+    # Emitted as object: hash keys are 64-bit ints, which Qt can't convert to a QVariantMap
+    update_duplicate_sets_signal = Signal(object)
     enable_scan_button_signal = Signal()
+    resource_update_signal = Signal()
+
+class ScanRunnable(QRunnable):
+    """Runnable that executes a scan function on a QThreadPool thread."""
+    
+    def __init__(self, function, *args):
+        super().__init__()
+        self.function = function
+        self.args = args
+    
+    def run(self):
+        self.function(*self.args)
 
 class MainWindow(QMainWindow):
     """Main window for the ImageCompare application."""
     
+    # Text templates of the resource labels in the status bar
+    CPU_FORMAT = "CPU: %.1f%%"
+    MEMORY_FORMAT = "Memory: %.1f%%"
+    
     def __init__(self):
         super().__init__()
         
         # Instance variables and worker threads
         self.image_files = []
         self.duplicate_groups = {}
-        self.scanning_thread = None
-        self.cancel_requested = False
+        self.cancel_event = threading.Event()  # Cancellation token of the current scan
+        self.thread_pool = QThreadPool.globalInstance()  # Reuses worker threads across scans
         self.select_next_after_loading = False  # Flag to select next set after loading
         
         # Initialize resource manager
         self.resource_manager = get_resource_manager()
         self.resource_manager.start_monitoring()
         
-        # Track whether application is shutting down
-        self.shutting_down = False
+        # Set once the application is shutting down (read from worker threads)
+        self.shutting_down_event = threading.Event()
         
         # Create thread helper
         self.thread_helper = ThreadHelper()
@@ -129,32 +146,93 @@ class MainWindow(QMainWindow):
         self.cpu_label = QLabel("CPU: 0%")
         self.memory_label = QLabel("Memory: 0%")
         
+        # Values (in tenths of a percent) and style sheets currently shown by the labels
+        self.cpu_tenths = None
+        self.memory_tenths = None
+        self.cpu_style = ""
+        self.memory_style = ""
+        
         # Add to status bar
         self.statusBar().addPermanentWidget(self.cpu_label)
         self.statusBar().addPermanentWidget(self.memory_label)
         
+        # Latest reading from the monitor thread, and whether a display update
+        # for it is already queued on the UI thread
+        self.latest_resources = (0.0, 0.0)
+        self.resource_update_pending = False
+        
+        # Connected before registering so no reading can be lost; the signal is
+        # emitted from the monitor thread, so the slot runs queued on the UI thread
+        self.thread_helper.resource_update_signal.connect(self.flush_resource_update)
+        
         # Register callback with resource manager
-        self.resource_manager.register_monitoring_callback(self.update_resource_display)
+        self.resource_manager.register_monitoring_callback(self.on_resource_reading)
+    
+    def on_resource_reading(self, cpu_percent, memory_percent):
+        """
+        Receive a resource reading on the monitor thread.
+        
+        Readings are coalesced: at most one display update is queued on the
+        UI thread at a time, and it shows the latest reading when it runs.
+        
+        Args:
+            cpu_percent: CPU usage percentage
+            memory_percent: Memory usage percentage
+        """
+        self.latest_resources = (cpu_percent, memory_percent)
+        if not self.resource_update_pending:
+            self.resource_update_pending = True
+            self.thread_helper.resource_update_signal.emit()
+    
+    @Slot()
+    def flush_resource_update(self):
+        """Show the latest resource reading (runs on the UI thread)."""
+        # Cleared first so a reading that arrives meanwhile queues another update
+        self.resource_update_pending = False
+        self.update_resource_display(*self.latest_resources)
     
     def update_resource_display(self, cpu_percent, memory_percent):
         """Update the resource display with current CPU and memory usage."""
-        self.cpu_label.setText(f"CPU: {cpu_percent:.1f}%")
-        self.memory_label.setText(f"Memory: {memory_percent:.1f}%")
+        # Late readings may still arrive from the monitor thread while shutting down
+        if self.shutting_down_event.is_set():
+            return
+        
+        # Work in the tenths of a percent that are displayed; when neither
+        # changed there is nothing to format or redraw
+        cpu_tenths = round(cpu_percent * 10)
+        memory_tenths = round(memory_percent * 10)
+        if cpu_tenths == self.cpu_tenths and memory_tenths == self.memory_tenths:
+            return
+        
+        # Only touch the labels when what they show changes: setStyleSheet
+        # restyles and repaints the label even when given the same string
+        if cpu_tenths != self.cpu_tenths:
+            self.cpu_label.setText(self.CPU_FORMAT % (cpu_tenths / 10))
+            self.cpu_tenths = cpu_tenths
+        
+        if memory_tenths != self.memory_tenths:
+            self.memory_label.setText(self.MEMORY_FORMAT % (memory_tenths / 10))
+            self.memory_tenths = memory_tenths
         
         # Change color based on load
-        if cpu_percent > 80:
-            self.cpu_label.setStyleSheet("color: red; font-weight: bold")
-        elif cpu_percent > 60:
-            self.cpu_label.setStyleSheet("color: orange")
-        else:
-            self.cpu_label.setStyleSheet("")
-            
-        if memory_percent > 80:
-            self.memory_label.setStyleSheet("color: red; font-weight: bold")
-        elif memory_percent > 60:
-            self.memory_label.setStyleSheet("color: orange")
-        else:
-            self.memory_label.setStyleSheet("")
+        cpu_style = self._load_style(cpu_tenths / 10)
+        if cpu_style != self.cpu_style:
+            self.cpu_label.setStyleSheet(cpu_style)
+            self.cpu_style = cpu_style
+        
+        memory_style = self._load_style(memory_tenths / 10)
+        if memory_style != self.memory_style:
+            self.memory_label.setStyleSheet(memory_style)
+            self.memory_style = memory_style
+    
+    @staticmethod
+    def _load_style(percent: float) -> str:
+        """Get the label style sheet for a usage percentage."""
+        if percent > 80:
+            return "color: red; font-weight: bold"
+        elif percent > 60:
+            return "color: orange"
+        return ""
     
     def connect_signals(self):
         """Connect widget signals to slots."""
@@ -164,9 +242,6 @@ class MainWindow(QMainWindow):
         # Connect duplicate list's selection signal
         self.duplicate_list.set_selected.connect(self.image_compare.set_images)
         
-        # Connect duplicate list's tree expansion signal
-        self.duplicate_list.tree_widget.itemExpanded.connect(self.on_tree_item_expanded)
-        
         # Connect duplicate list's loading complete signal
         self.duplicate_list.loading_complete.connect(self.on_duplicate_list_loaded)
         
@@ -180,8 +255,7 @@ class MainWindow(QMainWindow):
         self.thread_helper.enable_scan_button_signal.connect(self.enable_scan_button)
         
         # Connect progress display's cancel signal
-        self.progress_display.cancelled.connect(self.cancel_scanning)
-        self.thread_helper.enable_scan_button_signal.connect(self.enable_scan_button)
+        self.progress_display.cancelled.connect(self.cancel_scanning, Qt.UniqueConnection)
     
     @Slot(list)
     def start_scanning(self, directories: List[str]):
@@ -203,18 +277,14 @@ class MainWindow(QMainWindow):
         self.progress_display.set_operation_in_progress(True)
         self.progress_display.update_status("Initializing scan...")
         
-        # Reset cancellation flag
-        self.cancel_requested = False
+        # Fresh cancellation token, so a cancelled scan that is still winding
+        # down can't be revived (or cancel this one)
+        self.cancel_event = threading.Event()
         
-        # Start scanning thread
-        self.scanning_thread = threading.Thread(
-            target=self.scanning_process,
-            args=(directories,)
-        )
-        self.scanning_thread.daemon = True
-        self.scanning_thread.start()
+        # Run the scan on a pooled thread
+        self.thread_pool.start(ScanRunnable(self.scanning_process, directories, self.cancel_event))
     
-    def scanning_process(self, directories: List[str]):
+    def scanning_process(self, directories: List[str], cancel_event: threading.Event):
         """
         Process to scan directories and find duplicates.
         This runs in a separate thread to avoid blocking the UI.
@@ -223,13 +293,19 @@ class MainWindow(QMainWindow):
         
         Args:
             directories: List of directories to scan
+            cancel_event: Event that is set when the scan should be cancelled
         """
+        # Imported on the first scan: the scanner and the hashing modules
+        # (SciPy, imagehash) are not needed to open the window
+        from core.scanner import find_image_files
+        from core.duplicate_finder import find_duplicates
+        
         try:
             # Step 1: Find all image files using parallel processing
             self.update_progress_status("Scanning for image files in parallel...", 0)
             
             # Check for cancellation
-            if self.cancel_requested:
+            if cancel_event.is_set():
                 self.handle_cancellation()
                 return
                 
@@ -245,7 +321,7 @@ class MainWindow(QMainWindow):
                 return
             
             # Check for cancellation
-            if self.cancel_requested:
+            if cancel_event.is_set():
                 self.handle_cancellation()
                 return
                 
@@ -254,14 +330,24 @@ class MainWindow(QMainWindow):
             
             # Track current progress for hash calculation
             total_files = len(self.image_files)
+            last_progress = -1
+            last_update_time = 0.0
             
             # Define progress callback for hash calculation
+            # (find_duplicates checks the cancellation token between chunks)
             def hash_progress_callback(processed_count, total_count):
-                # Check for cancellation during processing
-                if self.cancel_requested:
-                    raise InterruptedError("Operation cancelled by user")
-                    
+                nonlocal last_progress, last_update_time
+                
+                # Throttle the cross-thread signals: only send an update when the bar
+                # moves and at most ~30 times per second (the last one always goes out)
                 progress = 10 + int((processed_count / total_count) * 70)
+                now = time.monotonic()
+                if processed_count < total_count and (
+                        progress == last_progress or now - last_update_time < PROGRESS_UPDATE_INTERVAL):
+                    return
+                
+                last_progress = progress
+                last_update_time = now
                 self.update_progress_status(
                     f"Hashing images: {processed_count}/{total_count}", progress
                 )
@@ -269,17 +355,18 @@ class MainWindow(QMainWindow):
             # Step 3: Find duplicates in parallel (combines hash calculation and identification)
             self.duplicate_groups = find_duplicates(
                 self.image_files,
-                progress_callback=hash_progress_callback
+                progress_callback=hash_progress_callback,
+                cancel_event=cancel_event
             )
             
             # Check for cancellation
-            if self.cancel_requested:
+            if cancel_event.is_set():
                 self.handle_cancellation()
                 return
                 
             # Step 4: Update the UI with results
             duplicate_count = len(self.duplicate_groups)
-            duplicate_file_count = sum(len(paths) for paths in self.duplicate_groups.values())
+            duplicate_file_count = sum(map(len, self.duplicate_groups.values()))
             
             self.update_progress_status(
                 f"Found {duplicate_count} duplicate sets with {duplicate_file_count} total files", 100
@@ -317,37 +404,28 @@ class MainWindow(QMainWindow):
         self.thread_helper.update_status_signal.emit(status_text)
         self.thread_helper.update_progress_signal.emit(progress_value)
     
-    @Slot(QTreeWidgetItem)
-    def on_tree_item_expanded(self, item):
-        """Handle tree item expansion to trigger lazy loading."""
-        # Delegate to the duplicate list to load children
-        if hasattr(self.duplicate_list, '_load_children'):
-            self.duplicate_list._load_children(item)
-    
     def cleanup_resources(self):
         """Clean up resources before application exit."""
-        self.shutting_down = True
+        self.shutting_down_event.set()
         
         # Stop resource monitoring
         if hasattr(self, 'resource_manager'):
             self.resource_manager.stop_monitoring()
         
-        # Stop any running scan thread
-        self.cancel_requested = True
+        # Stop any running scan
+        self.cancel_event.set()
         
         # Clean up image loader in the ImageCompare widget
         if hasattr(self.image_compare, 'image_loader'):
             self.image_compare.image_loader.shutdown()
             
-        # Wait for scanning thread to finish
-        if self.scanning_thread and self.scanning_thread.is_alive():
-            self.scanning_thread.join(timeout=0.5)
+        # Wait for the scan to finish
+        self.thread_pool.waitForDone(500)
     
-    @Slot()
     @Slot()
     def cancel_scanning(self):
         """Handle cancellation request from the progress display."""
-        self.cancel_requested = True
+        self.cancel_event.set()
         self.update_progress_status("Cancellation requested, waiting for operations to complete...", -1)
     
     def handle_cancellation(self):
@@ -383,7 +461,7 @@ class MainWindow(QMainWindow):
         # Find the current hash from the duplicate list
         current_hash = self.duplicate_list.current_hash
         
-        if current_hash and current_hash in self.duplicate_groups:
+        if current_hash is not None and current_hash in self.duplicate_groups:
             # Remove this set from the duplicate groups
             del self.duplicate_groups[current_hash]
             
@@ -392,10 +470,9 @@ class MainWindow(QMainWindow):
             
             # Check if there are any duplicate groups left
             if self.duplicate_groups:
-                # Still have duplicates, update the UI
-                # Set the flag to select next set after loading completes
-                self.select_next_after_loading = True
-                self.duplicate_list.update_duplicate_sets(self.duplicate_groups)
+                # Still have duplicates: remove just this set from the list,
+                # which selects the set that follows it
+                self.duplicate_list.remove_set(current_hash)
             else:
                 # No more duplicates, clear everything and show message
                 self.duplicate_list.clear()
@@ -411,22 +488,38 @@ class MainWindow(QMainWindow):
             image_paths: List of paths to images to delete
         """
         try:
+            # The same file can be listed under several paths when the selected
+            # directories overlap through symlinks; trash each file only once
+            aliases = {}
+            for path in image_paths:
+                aliases.setdefault(os.path.realpath(path), []).append(path)
+
             # Move files to trash
-            moved_files = move_to_trash(image_paths)
-            
+            moved_files = move_to_trash([paths[0] for paths in aliases.values()])
+
             if moved_files:
                 # Show success message as a status update (non-modal)
                 self.progress_display.update_status(f"Successfully moved {len(moved_files)} file(s) to trash.")
-                
+
+                # Every alias of a trashed file is gone as well
+                moved_files = [alias for path in moved_files for alias in aliases[os.path.realpath(path)]]
+
                 # Update the duplicate groups
-                self.update_duplicate_groups_after_deletion(moved_files)
+                changed_groups = self.update_duplicate_groups_after_deletion(moved_files)
                 
                 # Check if there are any duplicate groups left
                 if self.duplicate_groups:
-                    # Still have duplicates, update the UI
-                    # Set the flag to select next set after loading completes
-                    self.select_next_after_loading = True
-                    self.duplicate_list.update_duplicate_sets(self.duplicate_groups)
+                    # Still have duplicates: update only the affected sets in the list
+                    moved_on = False
+                    for hash_value, paths in changed_groups.items():
+                        if paths is None:
+                            moved_on = self.duplicate_list.remove_set(hash_value) or moved_on
+                        else:
+                            self.duplicate_list.update_set(hash_value, paths)
+                    
+                    # Move on to the next set if the current one is still there
+                    if not moved_on:
+                        self.duplicate_list.select_next_set()
                 else:
                     # No more duplicates, clear everything and show message
                     self.duplicate_list.clear()
@@ -440,24 +533,41 @@ class MainWindow(QMainWindow):
             # Show error as status update instead of dialog
             self.progress_display.update_status(f"Error during deletion: {str(e)}")
     
-    def update_duplicate_groups_after_deletion(self, deleted_files: List[str]):
+    def update_duplicate_groups_after_deletion(self, deleted_files: List[str]) -> Dict[int, Optional[List[str]]]:
         """
         Update duplicate groups after files have been deleted.
         
         Args:
             deleted_files: List of paths to deleted files
+            
+        Returns:
+            Dictionary mapping the hash of every group that lost files to its
+            remaining paths, or to None if the group was removed
         """
+        # Hashed lookups instead of scanning the deleted list for every path
+        deleted_set = set(deleted_files)
+        
         # Create a new duplicate groups dictionary
         updated_groups = {}
+        changed_groups = {}
         
         # For each hash group
         for hash_value, paths in self.duplicate_groups.items():
+            # Most groups aren't touched by a deletion: keep their list as is
+            if deleted_set.isdisjoint(paths):
+                updated_groups[hash_value] = paths
+                continue
+            
             # Filter out deleted files
-            updated_paths = [path for path in paths if path not in deleted_files]
+            updated_paths = [path for path in paths if path not in deleted_set]
             
             # Only keep groups with at least 2 files (duplicates)
             if len(updated_paths) > 1:
                 updated_groups[hash_value] = updated_paths
+                changed_groups[hash_value] = updated_paths
+            else:
+                changed_groups[hash_value] = None
         
         # Update the class variable
-        self.duplicate_groups = updated_groups
\ No newline at end of file
+        self.duplicate_groups = updated_groups
+        return changed_groups
\ No newline at end of file
@@ -1,7 +1,7 @@
 """
 Directory selector widget for choosing directories to scan.
 """
-from typing import List
+from typing import Dict, List
 
 from PySide6.QtCore import Signal
 from PySide6.QtWidgets import (
@@ -22,7 +22,8 @@ class DirectorySelector(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         
-        self.selected_directories = []
+        # Insertion-ordered dict used as an ordered set (keys are the directory paths)
+        self.selected_directories: Dict[str, None] = {}
         self.init_ui()
         
     def init_ui(self):
@@ -79,7 +80,7 @@ class DirectorySelector(QWidget):
         if directory:
             # Check if directory is already in the list
             if directory not in self.selected_directories:
-                self.selected_directories.append(directory)
+                self.selected_directories[directory] = None
                 self.directory_list.addItem(QListWidgetItem(directory))
                 self.scan_button.setEnabled(True)
     
@@ -104,9 +105,8 @@ class DirectorySelector(QWidget):
         # Remove from the list widget
         self.directory_list.takeItem(selected_row)
         
-        # Remove from the selected directories list
-        if directory_path in self.selected_directories:
-            self.selected_directories.remove(directory_path)
+        # Remove from the selected directories
+        self.selected_directories.pop(directory_path, None)
             
         # Disable the scan button if no directories remain
         if not self.selected_directories:
@@ -123,7 +123,7 @@ class DirectorySelector(QWidget):
     def on_scan_clicked(self):
         """Emit the directories_selected signal with selected directories."""
         if self.selected_directories:
-            self.directories_selected.emit(self.selected_directories)
+            self.directories_selected.emit(list(self.selected_directories))
     
     def get_selected_directories(self) -> List[str]:
         """
@@ -132,4 +132,4 @@ class DirectorySelector(QWidget):
         Returns:
             List of directory paths
         """
-        return self.selected_directories
\ No newline at end of file
+        return list(self.selected_directories)
\ No newline at end of file
@@ -2,16 +2,374 @@
 Duplicate list widget for displaying sets of duplicate images.
 """
 import os
-import time
-from typing import Dict, List, Optional, Set, Tuple, Iterator
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 
-from PySide6.QtCore import Qt, Signal, Slot, QTimer, QSize
+from PySide6.QtCore import (
+    Qt, Signal, Slot, QAbstractItemModel, QModelIndex, QPersistentModelIndex, QItemSelectionModel
+)
 from PySide6.QtWidgets import (
-    QWidget, QTreeWidget, QTreeWidgetItem, QVBoxLayout,
-    QLabel, QHBoxLayout, QPushButton, QScrollBar,
-    QApplication, QAbstractItemView, QProgressBar
+    QWidget, QTreeView, QVBoxLayout,
+    QLabel, QHBoxLayout, QPushButton, QAbstractItemView
 )
 
+from PIL import Image
+
+from core.hash_cache import cached_file_info
+from core.resource_manager import get_resource_manager
+
+# Maximum number of files whose metadata is kept; the least recently shown are evicted first
+MAX_METADATA_ENTRIES = 50_000
+
+class DuplicateSetsModel(QAbstractItemModel):
+    """
+    Item model exposing duplicate sets as a two-level tree.
+    
+    Top-level rows are duplicate sets and their children are the image
+    paths of the set. Nothing is materialized per row: the view only asks
+    for the rows it paints, and the data is read straight from the sets.
+    
+    Set rows have an internal id of 0. Child rows carry the id of their
+    set instead, which stays the same while rows are removed or re-sorted
+    (unlike the set's row or its 64-bit hash, which doesn't fit).
+    """
+    
+    HEADERS = ("Duplicate Sets", "Size", "Dimensions")
+    
+    # Signal emitted from a worker thread with the metadata read for a path
+    metadata_loaded = Signal(str, object)
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        
+        self.duplicate_sets = {}  # Dictionary of hash: [image_paths]
+        self.hashes = []  # Hash of the set shown at each top-level row
+        self.labels = {}  # Dictionary of hash: label of the set (built once, used to paint and sort)
+        self.rows = {}  # Dictionary of hash: top-level row (reverse of hashes)
+        self.set_ids = {}  # Dictionary of hash: id used by the set's child indexes
+        self.id_hashes = {}  # Dictionary of id: hash (reverse of set_ids)
+        self.next_id = 1
+        self.sort_order = Qt.AscendingOrder
+        self.metadata_cache = OrderedDict()  # Cache for file metadata (size, dimensions), in LRU order
+        self.use_recorded_sizes = True  # Take sizes and dimensions from the hash cache instead of the files
+        self.pending_metadata = {}  # Dictionary of path: index of the row waiting for it
+        
+        # Emitted on a worker thread, so the slot runs queued on the model's thread
+        self.metadata_loaded.connect(self._apply_metadata)
+    
+    def set_duplicate_sets(self, duplicate_sets: Dict[int, List[str]]):
+        """
+        Replace all duplicate sets.
+        
+        Args:
+            duplicate_sets: Dictionary mapping hash values to lists of image paths
+        """
+        self.beginResetModel()
+        self.duplicate_sets = duplicate_sets
+        # Only show sets with at least 2 duplicates
+        self.labels = {hash_value: _set_label(paths) for hash_value, paths in duplicate_sets.items()
+                       if len(paths) > 1}
+        self.hashes = sorted(self.labels, key=self._sort_key,
+                             reverse=self.sort_order == Qt.DescendingOrder)
+        self._update_rows()
+        self.set_ids.clear()
+        self.id_hashes.clear()
+        self.use_recorded_sizes = True
+        self.endResetModel()
+    
+    def remove_set(self, hash_value: int) -> Optional[int]:
+        """
+        Remove a single duplicate set.
+        
+        Args:
+            hash_value: Hash of the set to remove
+        
+        Returns:
+            Row the set was shown at, or None if it wasn't shown
+        """
+        self.duplicate_sets.pop(hash_value, None)
+        
+        row = self.rows.get(hash_value)
+        if row is None:
+            return None
+        
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.hashes[row]
+        del self.labels[hash_value]
+        self._update_rows()
+        set_id = self.set_ids.pop(hash_value, None)
+        self.id_hashes.pop(set_id, None)
+        self.endRemoveRows()
+        return row
+    
+    def update_set(self, hash_value: int, paths: List[str]):
+        """
+        Replace the images of a single duplicate set.
+        
+        Args:
+            hash_value: Hash of the set to update
+            paths: New list of image paths in the set
+        """
+        row = self.rows.get(hash_value)
+        if row is None:
+            self.duplicate_sets[hash_value] = paths
+            return
+        
+        # Swap the children in two steps so the views can drop and re-add them
+        set_index = self.index(row, 0)
+        old_count = len(self.duplicate_sets.get(hash_value, []))
+        if old_count:
+            self.beginRemoveRows(set_index, 0, old_count - 1)
+            self.duplicate_sets[hash_value] = []
+            self.endRemoveRows()
+        
+        if paths:
+            self.beginInsertRows(set_index, 0, len(paths) - 1)
+        self.duplicate_sets[hash_value] = paths
+        if paths:
+            self.endInsertRows()
+        
+        self.labels[hash_value] = _set_label(paths)
+        
+        # The set's label shows its first file and the number of files
+        self.dataChanged.emit(set_index, set_index.siblingAtColumn(len(self.HEADERS) - 1))
+    
+    def hash_at(self, index: QModelIndex) -> Optional[int]:
+        """
+        Get the hash of the set an index belongs to.
+        
+        Args:
+            index: Index of a set row or of one of its image rows
+        
+        Returns:
+            Hash of the set, or None for an invalid index
+        """
+        if not index.isValid():
+            return None
+        if index.internalId():
+            return self.id_hashes.get(index.internalId())
+        return self.hashes[index.row()]
+    
+    def set_label(self, hash_value: int) -> str:
+        """Get the label of a duplicate set."""
+        label = self.labels.get(hash_value)
+        if label is None:
+            label = _set_label(self.duplicate_sets.get(hash_value, []))
+        return label
+    
+    def clear_metadata(self):
+        """Forget the cached file metadata so it is read from the files again when shown."""
+        self.metadata_cache.clear()
+        self.use_recorded_sizes = False
+        
+        # Only the metadata columns of image rows change, not the structure. Image
+        # indexes only exist for sets that got an id, so only those can be shown.
+        for hash_value, set_id in self.set_ids.items():
+            count = len(self.duplicate_sets.get(hash_value, ()))
+            if count:
+                self.dataChanged.emit(self.createIndex(0, 1, set_id), self.createIndex(count - 1, 2, set_id))
+    
+    def index(self, row: int, column: int, parent: QModelIndex = QModelIndex()) -> QModelIndex:
+        """Get the index of an item."""
+        # The bounds are checked here rather than with hasIndex(), which calls back
+        # into rowCount() and columnCount(); the view calls this for every set row
+        if row < 0 or not 0 <= column < len(self.HEADERS):
+            return QModelIndex()
+        
+        if not parent.isValid():
+            if row >= len(self.hashes):
+                return QModelIndex()
+            return self.createIndex(row, column, 0)
+        
+        if parent.internalId() or parent.column() != 0:
+            # Images have no children
+            return QModelIndex()
+        
+        hash_value = self.hashes[parent.row()]
+        if row >= len(self.duplicate_sets.get(hash_value, ())):
+            return QModelIndex()
+        
+        # Children point at their set through the set's id
+        set_id = self.set_ids.get(hash_value)
+        if set_id is None:
+            set_id = self.set_ids[hash_value] = self.next_id
+            self.id_hashes[set_id] = hash_value
+            self.next_id += 1
+        return self.createIndex(row, column, set_id)
+    
+    def parent(self, index: QModelIndex = QModelIndex()) -> QModelIndex:
+        """Get the parent of an item (the set row for an image row)."""
+        if not index.isValid() or not index.internalId():
+            return QModelIndex()
+        
+        row = self.rows.get(self.id_hashes.get(index.internalId()))
+        if row is None:
+            return QModelIndex()
+        return self.createIndex(row, 0, 0)
+    
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        """Get the number of sets, or of images in a set."""
+        if not parent.isValid():
+            return len(self.hashes)
+        if parent.internalId() or parent.column() != 0:
+            # Images have no children
+            return 0
+        return len(self.duplicate_sets.get(self.hashes[parent.row()], []))
+    
+    def hasChildren(self, parent: QModelIndex = QModelIndex()) -> bool:
+        """Check whether an item has children (cheaper than the default, which builds an index)."""
+        if not parent.isValid():
+            return bool(self.hashes)
+        if parent.internalId() or parent.column() != 0:
+            return False
+        return bool(self.duplicate_sets.get(self.hashes[parent.row()]))
+    
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        """Get the number of columns."""
+        return len(self.HEADERS)
+    
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        """Get the text shown for an item."""
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        
+        if not index.internalId():
+            # Set row: only the first column has a label
+            return self.labels[self.hashes[index.row()]] if index.column() == 0 else None
+        
+        paths = self.duplicate_sets.get(self.id_hashes.get(index.internalId()), [])
+        if index.row() >= len(paths):
+            return None
+        path = paths[index.row()]
+        
+        if index.column() == 0:
+            return path
+        
+        # Metadata is only read for rows that are actually shown
+        size_str, dimensions = self._metadata(index, path)
+        return size_str if index.column() == 1 else dimensions
+    
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole):
+        """Get the column titles."""
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole and section < len(self.HEADERS):
+            return self.HEADERS[section]
+        return None
+    
+    def sort(self, column: int, order: Qt.SortOrder = Qt.AscendingOrder):
+        """Sort the sets by size and label (the only column with set values)."""
+        self.sort_order = order
+        
+        self.layoutAboutToBeChanged.emit()
+        
+        # Remember which sets the persistent (e.g. selected) set indexes point at;
+        # image indexes don't need updating because they refer to their set by id
+        persistent = [(index, self.hashes[index.row()]) for index in self.persistentIndexList()
+                      if index.isValid() and not index.internalId()]
+        
+        self.hashes.sort(key=self._sort_key, reverse=order == Qt.DescendingOrder)
+        self._update_rows()
+        
+        for index, hash_value in persistent:
+            self.changePersistentIndex(index, self.createIndex(self.rows[hash_value], index.column(), 0))
+        
+        self.layoutChanged.emit()
+    
+    def _sort_key(self, hash_value: int) -> Tuple[int, str]:
+        """Get the sort key of a set: largest sets first (in ascending order), then by label."""
+        return -len(self.duplicate_sets[hash_value]), self.labels[hash_value]
+    
+    def _update_rows(self):
+        """Rebuild the hash-to-row lookup after the rows changed."""
+        self.rows = {hash_value: row for row, hash_value in enumerate(self.hashes)}
+    
+    def _metadata(self, index: QModelIndex, path: str) -> Tuple[str, str]:
+        """Get the (size, dimensions) text of an image, loading it in the background on first use."""
+        # Check cache first
+        metadata = self.metadata_cache.get(path)
+        if metadata is not None:
+            self.metadata_cache.move_to_end(path)
+            return metadata
+        
+        # The scan recorded the size and dimensions of every file it hashed,
+        # so most files aren't touched at all
+        info = cached_file_info(path) if self.use_recorded_sizes else None
+        if info is not None and info[1] is not None:
+            file_size, dimensions = info
+            metadata = (_format_size(file_size), _format_dimensions(dimensions))
+            self._cache_metadata(path, metadata)
+            return metadata
+        
+        # Otherwise read it on the shared I/O pool, so a slow (e.g. network)
+        # drive doesn't block painting; the row is updated when it arrives
+        if path not in self.pending_metadata:
+            self.pending_metadata[path] = QPersistentModelIndex(index)
+            get_resource_manager().get_executor("scanning").submit(self._load_metadata, path)
+        return ("Loading...", "Loading...")
+    
+    def _load_metadata(self, path: str):
+        """Read the metadata of an image (runs on a worker thread)."""
+        self.metadata_loaded.emit(path, _read_metadata(path))
+    
+    def _cache_metadata(self, path: str, metadata: Tuple[str, str]):
+        """Store the metadata of a file, evicting the least recently shown beyond MAX_METADATA_ENTRIES."""
+        self.metadata_cache[path] = metadata
+        self.metadata_cache.move_to_end(path)
+        if len(self.metadata_cache) > MAX_METADATA_ENTRIES:
+            self.metadata_cache.popitem(last=False)
+    
+    @Slot(str, object)
+    def _apply_metadata(self, path: str, metadata: Tuple[str, str]):
+        """Store metadata read in the background and update the row showing it."""
+        self._cache_metadata(path, metadata)
+        
+        # The row may have been removed (or the sets replaced) meanwhile
+        index = self.pending_metadata.pop(path, None)
+        if index is not None and index.isValid():
+            self.dataChanged.emit(index.sibling(index.row(), 1), index.sibling(index.row(), 2))
+
+def _set_label(paths: List[str]) -> str:
+    """Build the label of a duplicate set."""
+    # Get a representative filename from the first image in the set
+    if paths:
+        filename = os.path.basename(paths[0])
+        return f"{filename} ({len(paths)} duplicates)"
+    return f"Duplicate Set ({len(paths)} files)"
+
+def _format_size(file_size: int) -> str:
+    """Format a file size in KB or MB."""
+    # Pick the unit with an integer comparison, so only one division is needed
+    if file_size >= 1 << 20:
+        return f"{file_size / (1 << 20):.2f} MB"
+    return f"{file_size / (1 << 10):.2f} KB"
+
+def _format_dimensions(dimensions: Tuple[int, int]) -> str:
+    """Format image dimensions as width x height."""
+    return f"{dimensions[0]} x {dimensions[1]}"
+
+def _read_metadata(path: str) -> Tuple[str, str]:
+    """
+    Read the (size, dimensions) text of an image from the file.
+    
+    Args:
+        path: Path to the image file
+        
+    Returns:
+        Tuple of size and dimensions text ("Error" for both if the file can't be read)
+    """
+    try:
+        size_str = _format_size(os.path.getsize(path))
+    except Exception:
+        return ("Error", "Error")
+    
+    # Opening an image only parses its header; the pixels are never decoded here
+    try:
+        with Image.open(path) as img:
+            dimensions = _format_dimensions(img.size)
+    except Exception:
+        dimensions = "Unknown"
+    
+    return (size_str, dimensions)
+
 class DuplicateList(QWidget):
     """
     Widget that displays sets of duplicate images in a tree structure.
@@ -27,17 +385,16 @@ class DuplicateList(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         
-        self.duplicate_sets = {}  # Dictionary of hash: [image_paths]
         self.current_hash = None  # Currently selected hash
-        self.loaded_items = set()  # Set of hashes that have been fully loaded
-        self.is_loading = False  # Flag to track if we're currently loading items
-        self.chunk_size = 10  # Number of sets to load at once
-        self.update_timer = None  # Timer for chunked updates
-        self.scrollbar_value = 0  # Track scrollbar position
-        self.metadata_cache = {}  # Cache for file metadata (size, dimensions)
+        self.model = DuplicateSetsModel(self)
         
         self.init_ui()
     
+    @property
+    def duplicate_sets(self) -> Dict[int, List[str]]:
+        """Dictionary of hash: [image_paths] shown in the list."""
+        return self.model.duplicate_sets
+    
     def init_ui(self):
         """Initialize the user interface components."""
         # Main layout
@@ -60,44 +417,33 @@ class DuplicateList(QWidget):
         
         main_layout.addLayout(header_layout)
         
-        # Progress bar for loading
-        self.progress_bar = QProgressBar()
-        self.progress_bar.setRange(0, 100)
-        self.progress_bar.setValue(0)
-        self.progress_bar.setVisible(False)
-        main_layout.addWidget(self.progress_bar)
-        
-        # Tree widget for displaying the duplicate sets
-        self.tree_widget = QTreeWidget()
-        self.tree_widget.setHeaderLabels(["Duplicate Sets", "Size", "Dimensions"])
-        self.tree_widget.setColumnWidth(0, 400)  # Width for file path column
-        self.tree_widget.setAlternatingRowColors(True)
-        self.tree_widget.itemSelectionChanged.connect(self.on_selection_changed)
-        # Connect the itemExpanded signal internally to prepare for lazy loading
-        self.tree_widget.itemExpanded.connect(self._load_children)
-        
-        # Set item delegate for more control over rendering
-        self.tree_widget.setUniformRowHeights(True)  # Better performance with large lists
-        self.tree_widget.setSortingEnabled(True)  # Enable sorting
-        self.tree_widget.sortByColumn(0, Qt.AscendingOrder)  # Default sort
-        
-        # Connect scroll event for lazy loading
-        self.tree_widget.verticalScrollBar().valueChanged.connect(self.on_scroll)
-        self.tree_widget.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)  # Smoother scrolling
-        
-        main_layout.addWidget(self.tree_widget)
+        # Tree view for displaying the duplicate sets; it only asks the model
+        # for the rows it shows, so even huge lists need no chunked loading
+        self.tree_view = QTreeView()
+        self.tree_view.setModel(self.model)
+        self.tree_view.setColumnWidth(0, 400)  # Width for file path column
+        self.tree_view.setAlternatingRowColors(True)
+        self.tree_view.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.tree_view.selectionModel().selectionChanged.connect(self.on_selection_changed)
+        
+        self.tree_view.setUniformRowHeights(True)  # Better performance with large lists
+        self.tree_view.setSortingEnabled(True)  # Enable sorting
+        self.tree_view.sortByColumn(0, Qt.AscendingOrder)  # Default sort
+        self.tree_view.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)  # Smoother scrolling
+        
+        main_layout.addWidget(self.tree_view)
         
         # Button layout
         button_layout = QHBoxLayout()
         
         # Expand all button
         expand_button = QPushButton("Expand All")
-        expand_button.clicked.connect(self.tree_widget.expandAll)
+        expand_button.clicked.connect(self.tree_view.expandAll)
         button_layout.addWidget(expand_button)
         
         # Collapse all button
         collapse_button = QPushButton("Collapse All")
-        collapse_button.clicked.connect(self.tree_widget.collapseAll)
+        collapse_button.clicked.connect(self.tree_view.collapseAll)
         button_layout.addWidget(collapse_button)
         
         # Refresh button
@@ -110,253 +456,119 @@ class DuplicateList(QWidget):
         # Set layout
         self.setLayout(main_layout)
     
-    @Slot(dict)
-    def update_duplicate_sets(self, duplicate_sets: Dict[str, List[str]]):
+    @Slot(object)
+    def update_duplicate_sets(self, duplicate_sets: Dict[int, List[str]]):
         """
-        Update the tree widget with new duplicate sets using chunked loading.
+        Show new duplicate sets.
         
         Args:
             duplicate_sets: Dictionary mapping hash values to lists of image paths
         """
-        # Stop any previous loading
-        if self.update_timer and self.update_timer.isActive():
-            self.update_timer.stop()
-        
-        # Store the new sets
-        self.duplicate_sets = duplicate_sets
-        self.loaded_items.clear()
-        self.is_loading = True
-        
-        # Clear current items
-        self.tree_widget.clear()
+        # Resetting the model clears the selection without signals
+        self.current_hash = None
+        self.model.set_duplicate_sets(duplicate_sets)
         
         # Update counter label
-        set_count = len(self.duplicate_sets)
-        self.counter_label.setText(f"{set_count} sets found (loading...)")
-        
-        # Show progress bar
-        self.progress_bar.setValue(0)
-        self.progress_bar.setVisible(set_count > self.chunk_size)
-        
-        # Start chunked loading if there are lots of items
-        if set_count > self.chunk_size:
-            self._load_chunks()
-        else:
-            # For small sets, just load everything at once
-            self._load_all_items()
-    
-    def _load_chunks(self):
-        """Load duplicate sets in chunks to prevent UI freezing."""
-        self.is_loading = True
-        
-        # Create a timer to load chunks with delay
-        if not self.update_timer:
-            self.update_timer = QTimer(self)
-            self.update_timer.timeout.connect(self._load_next_chunk)
-        
-        # Start the timer
-        self.update_timer.start(10)  # 10ms between chunks
-    
-    def _load_next_chunk(self):
-        """Load the next chunk of duplicate sets."""
-        # Calculate progress
-        total_sets = len(self.duplicate_sets)
-        loaded_sets = len(self.loaded_items)
-        progress = int((loaded_sets / total_sets) * 100) if total_sets > 0 else 100
-        
-        # Update progress bar
-        self.progress_bar.setValue(progress)
-        
-        # Get items to load in this chunk
-        items_to_load = self._get_next_chunk()
-        
-        # Stop if no more items to load
-        if not items_to_load:
-            self._finish_loading()
-            return
+        self.counter_label.setText(f"{len(self.duplicate_sets)} sets found")
         
-        # Load this chunk of items
-        for hash_value in items_to_load:
-            self._create_parent_item(hash_value)
-            self.loaded_items.add(hash_value)
-            
-            # Process events to keep UI responsive
-            QApplication.processEvents()
-        
-        # Update counter label with loading progress
-        self.counter_label.setText(f"{total_sets} sets found (loading {loaded_sets}/{total_sets})")
+        # Emit the loading complete signal
+        self.loading_complete.emit()
     
-    def _get_next_chunk(self) -> List[str]:
-        """Get the next chunk of hash values to load."""
-        # Get all hash values that haven't been loaded yet
-        remaining = [h for h in self.duplicate_sets.keys() if h not in self.loaded_items]
+    def remove_set(self, hash_value: int) -> bool:
+        """
+        Remove a single duplicate set.
         
-        # Priority loading for visible items
-        visible_rect = self.tree_widget.viewport().rect()
+        If the removed set was the selected one, the set that takes its place
+        (or the first set, when the last one was removed) is selected instead.
         
-        # Get items that would be visible first
-        # For simplicity, we'll just take the next chunk based on current count
-        return remaining[:self.chunk_size]
-    
-    def _load_all_items(self):
-        """Load all items at once (for small datasets)."""
-        # Show all sets
-        for hash_value in self.duplicate_sets.keys():
-            self._create_parent_item(hash_value)
-            self.loaded_items.add(hash_value)
+        Args:
+            hash_value: Hash of the set to remove
         
-        self._finish_loading()
-    
-    def _finish_loading(self):
-        """Finish the loading process."""
-        if self.update_timer:
-            self.update_timer.stop()
+        Returns:
+            True if another set was selected in place of the removed one
+        """
+        was_current = hash_value == self.current_hash
+        if was_current:
+            self.current_hash = None
+        row = self.model.remove_set(hash_value)
         
-        self.is_loading = False
-        self.progress_bar.setVisible(False)
+        self.counter_label.setText(f"{len(self.duplicate_sets)} sets found")
         
-        # Update counter label
-        set_count = len(self.duplicate_sets)
-        self.counter_label.setText(f"{set_count} sets found")
+        if not was_current:
+            return False
         
-        # Emit the loading complete signal
-        self.loading_complete.emit()
-    
-    def _create_parent_item(self, hash_value: str):
-        """Create a tree item for a duplicate set."""
-        paths = self.duplicate_sets.get(hash_value, [])
+        root_count = self.model.rowCount()
+        if root_count == 0:
+            return False
         
-        if len(paths) > 1:  # Only show sets with at least 2 duplicates
-            # Create parent item for this set
-            set_item = QTreeWidgetItem(self.tree_widget)
-            
-            # Get a representative filename from the first image in the set
-            if paths:
-                representative_path = paths[0]
-                filename = os.path.basename(representative_path)
-                # Use the filename as part of the set label
-                set_item.setText(0, f"{filename} ({len(paths)} duplicates)")
-            else:
-                set_item.setText(0, f"Duplicate Set ({len(paths)} files)")
-            
-            # Store the hash value as data for easy access later
-            set_item.setData(0, Qt.UserRole, hash_value)
-            set_item.setFlags(set_item.flags() | Qt.ItemIsAutoTristate)
-            
-            # Store a flag indicating children aren't loaded yet
-            set_item.setData(0, Qt.UserRole + 1, False)
-            
-            # We don't load child items until the parent is expanded
-            set_item.setChildIndicatorPolicy(QTreeWidgetItem.ShowIndicator)
+        # Select the next sibling, which now sits at the removed set's row
+        # (unless the view already moved the selection there itself)
+        if self.current_hash is None:
+            self._select_row(row if row is not None and row < root_count else 0)
+        return True
     
-    def _load_children(self, parent_item: QTreeWidgetItem):
-        """Lazily load children for a parent item when expanded."""
-        # Check if children are already loaded
-        if parent_item.data(0, Qt.UserRole + 1):
-            return
-            
-        # Get hash value and paths
-        hash_value = parent_item.data(0, Qt.UserRole)
-        paths = self.duplicate_sets.get(hash_value, [])
-        
-        # Add child items for each image in the set
-        for path in paths:
-            child_item = QTreeWidgetItem(parent_item)
-            child_item.setText(0, path)
-            
-            # Lazy load metadata (size, dimensions) in background
-            self._queue_metadata_load(child_item, path)
+    def update_set(self, hash_value: int, paths: List[str]):
+        """
+        Replace the images of a single duplicate set.
         
-        # Mark as loaded
-        parent_item.setData(0, Qt.UserRole + 1, True)
-    
-    def _queue_metadata_load(self, item: QTreeWidgetItem, path: str):
-        """Queue loading metadata for an item."""
-        # Check cache first
-        if path in self.metadata_cache:
-            size_str, dimensions = self.metadata_cache[path]
-            item.setText(1, size_str)
-            item.setText(2, dimensions)
-            return
-            
-        # Set placeholder text
-        item.setText(1, "Loading...")
-        item.setText(2, "Loading...")
-        
-        # In a real implementation, we'd load this in a background thread
-        # For simplicity, we'll just load it directly here
-        try:
-            file_size = os.path.getsize(path)
-            size_kb = file_size / 1024
-            size_mb = size_kb / 1024
-            
-            if size_mb >= 1:
-                size_str = f"{size_mb:.2f} MB"
-            else:
-                size_str = f"{size_kb:.2f} KB"
-            
-            # For dimensions, we'd use PIL/QImage but that's expensive
-            # So we'll just use a placeholder for now
-            dimensions = "Unknown"
-            
-            # Update cache
-            self.metadata_cache[path] = (size_str, dimensions)
-            
-            # Update item
-            item.setText(1, size_str)
-            item.setText(2, dimensions)
-            
-        except Exception as e:
-            item.setText(1, "Error")
-            item.setText(2, "Error")
+        Args:
+            hash_value: Hash of the set to update
+            paths: New list of image paths in the set
+        """
+        self.model.update_set(hash_value, paths)
     
     def refresh(self):
-        """Refresh the tree widget display with current duplicate sets."""
-        # Clear loaded items tracking
-        self.loaded_items.clear()
-        
-        # Reload using chunked loading
-        if len(self.duplicate_sets) > self.chunk_size:
-            self._load_chunks()
-        else:
-            self._load_all_items()
-    
-    def on_selection_changed(self):
-        """Handle selection change in the tree widget."""
-        # Get selected items
-        selected_items = self.tree_widget.selectedItems()
-        
-        if selected_items:
-            # Check if the selection is a parent item (duplicate set)
-            parent_item = selected_items[0]
-            
-            # If this is a child item, get its parent
-            if parent_item.parent():
-                parent_item = parent_item.parent()
-            
-            # Ensure children are loaded
-            if not parent_item.data(0, Qt.UserRole + 1):
-                self._load_children(parent_item)
+        """Refresh the display with current duplicate sets, reading file metadata again."""
+        self.model.clear_metadata()
+        self.tree_view.viewport().update()
+    
+    def on_selection_changed(self, *_):
+        """Handle selection change in the tree view."""
+        # Get the selected items
+        selected = self.tree_view.selectionModel().selectedIndexes()
+        
+        if selected:
+            # The selection may be the set itself or one of its images
+            hash_value = self.model.hash_at(selected[0])
+            if hash_value is None:
+                return
             
             # Store current hash
-            self.current_hash = parent_item.data(0, Qt.UserRole)
+            self.current_hash = hash_value
             
-            # Collect all the paths in this duplicate set
-            paths = []
-            for i in range(parent_item.childCount()):
-                child = parent_item.child(i)
-                paths.append(child.text(0))
-            
-            # Emit signal with the image paths in this set
+            # Emit signal with the image paths in this duplicate set
+            paths = list(self.duplicate_sets.get(hash_value, []))
             if paths:
                 self.set_selected.emit(paths)
     
     def clear(self):
         """Clear all duplicate sets."""
-        self.duplicate_sets = {}
-        self.tree_widget.clear()
+        # Nothing to tear down when the list is already empty (e.g. before the first scan)
+        if not self.model.hashes and not self.duplicate_sets:
+            return
+        
+        self.current_hash = None
+        self.model.set_duplicate_sets({})
         self.counter_label.setText("0 sets found")
     
+    def next_sets(self, count: int) -> List[List[str]]:
+        """
+        Get the image paths of the sets shown after the current one.
+        
+        Args:
+            count: Maximum number of sets to return
+        
+        Returns:
+            Lists of image paths, in display order (wrapping around to the first set)
+        """
+        row = self.model.rows.get(self.current_hash)
+        if row is None:
+            return []
+        
+        hashes = self.model.hashes
+        count = min(count, len(hashes) - 1)
+        return [self.duplicate_sets.get(hashes[(row + i) % len(hashes)], []) for i in range(1, count + 1)]
+    
     def select_next_set(self) -> bool:
         """
         Select the next duplicate set in the tree.
@@ -365,85 +577,26 @@ class DuplicateList(QWidget):
         Returns:
             True if successfully selected a set, False if no sets available
         """
-        # Get the root items (duplicate sets)
-        root_count = self.tree_widget.topLevelItemCount()
+        # Get the number of duplicate sets
+        root_count = self.model.rowCount()
         
         if root_count == 0:
             return False
         
-        # Find the currently selected item
-        selected_items = self.tree_widget.selectedItems()
+        # Determine the next row to select after the selected set
+        next_row = 0
+        selected = self.tree_view.selectionModel().selectedIndexes()
+        if selected:
+            current_row = self.model.rows.get(self.model.hash_at(selected[0]))
+            if current_row is not None:
+                next_row = (current_row + 1) % root_count
         
-        # Determine the next index to select
-        next_index = 0
-        if selected_items:
-            current_item = selected_items[0]
-            
-            # If it's a child item, get its parent
-            if current_item.parent():
-                current_item = current_item.parent()
-            
-            # Find the index of the current item
-            for i in range(root_count):
-                if self.tree_widget.topLevelItem(i) == current_item:
-                    next_index = (i + 1) % root_count
-                    break
-        
-        # Select the next item
-        next_item = self.tree_widget.topLevelItem(next_index)
-        if next_item:
-            # Clear current selection
-            self.tree_widget.clearSelection()
-            
-            # Select the next item
-            next_item.setSelected(True)
-            
-            # Make sure the item is visible
-            self.tree_widget.scrollToItem(next_item)
-            
-            return True
-        
-        return False
+        self._select_row(next_row)
+        return True
     
-    def on_scroll(self, value):
-        """Handle scrollbar value change."""
-        # Track scrollbar position
-        old_value = self.scrollbar_value
-        self.scrollbar_value = value
-        
-        # Only load items when scrolling down to conserve resources
-        if value > old_value:
-            # Find visible items
-            visible_items = self._get_visible_items()
-            
-            # Load children for visible parent items if needed
-            for item in visible_items:
-                if not item.parent() and not item.data(0, Qt.UserRole + 1):
-                    self._load_children(item)
-    
-    def _get_visible_items(self) -> List[QTreeWidgetItem]:
-        """Get tree items that are currently visible in the viewport."""
-        result = []
-        
-        # Get viewport rectangle
-        viewport = self.tree_widget.viewport()
-        viewport_rect = viewport.rect()
-        
-        # Check all top-level items
-        for i in range(self.tree_widget.topLevelItemCount()):
-            item = self.tree_widget.topLevelItem(i)
-            rect = self.tree_widget.visualItemRect(item)
-            
-            # If the item is visible in the viewport
-            if rect.intersects(viewport_rect):
-                result.append(item)
-                
-                # If expanded, check visible children too
-                if item.isExpanded():
-                    for j in range(item.childCount()):
-                        child = item.child(j)
-                        child_rect = self.tree_widget.visualItemRect(child)
-                        if child_rect.intersects(viewport_rect):
-                            result.append(child)
-        
-        return result
\ No newline at end of file
+    def _select_row(self, row: int):
+        """Select a set row and scroll it into view."""
+        index = self.model.index(row, 0)
+        self.tree_view.selectionModel().setCurrentIndex(
+            index, QItemSelectionModel.ClearAndSelect | QItemSelectionModel.Rows)
+        self.tree_view.scrollTo(index)
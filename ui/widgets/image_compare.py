@@ -2,21 +2,281 @@
 Image compare widget for displaying and comparing duplicate images.
 """
 import os
+import logging
 import subprocess
+import threading
 import re  # For extracting resolution from filenames
-from typing import List, Dict, Optional
+from collections import Counter
+from typing import List, Dict, Optional, Tuple
 
-from PySide6.QtCore import Qt, Signal, QSize
-from PySide6.QtGui import QPixmap, QImage
+from PySide6.QtCore import Qt, Signal, Slot, QSize
+from PySide6.QtGui import QPixmap
 from PySide6.QtWidgets import (
     QWidget, QLabel, QCheckBox, QPushButton, QScrollArea,
     QVBoxLayout, QHBoxLayout, QGridLayout, QMessageBox,
     QFrame, QSizePolicy, QProgressBar
 )
 
+from PIL import Image
+
+from core.hash_cache import cached_file_info
+from core.resource_manager import get_resource_manager
 from ui.widgets.preferences_dialog import PreferencesDialog, PreferencesManager
 from ui.widgets.image_loader import ImageLoader
 
+logger = logging.getLogger(__name__)
+
+# Patterns used by auto-select, compiled once at import time
+# Resolution embedded in a filename, e.g. "wallpaper_1920x1080.jpg"
+_RESOLUTION_RE = re.compile(r'(\d+)x(\d+)')
+
+# Language code suffix, e.g. "_EN" or "-ZHS" (case-sensitive on purpose)
+_LANGUAGE_RE = re.compile(r'[_-]([A-Z]{2,5})\b')
+
+# Quality indicators in a filename
+_QUALITY_PATTERNS = (
+    r'\b(HD)\b', r'\b(4K)\b', r'\b(UHD)\b', r'\b(HQ)\b', r'\b(LQ)\b',
+    r'\b(high[\s_-]?quality)\b', r'\b(low[\s_-]?quality)\b',
+    r'\b(high[\s_-]?res)\b', r'\b(low[\s_-]?res)\b',
+    r'\b(1080p?)\b', r'\b(720p?)\b', r'\b(2160p?)\b', r'\b(480p?)\b'
+)
+_QUALITY_RES = [re.compile(pattern, re.IGNORECASE) for pattern in _QUALITY_PATTERNS]
+
+# Duplicate indicators in a filename
+_DUPLICATE_PATTERNS = (
+    r'\b(copy)\b', r'\((1|2|3)\)', r'[\s_-](1|2|3)[\s_.\)]',
+    r'duplicate', r'backup', r'[(]?\s*copy\s*[)]?'
+)
+_DUPLICATE_RES = [re.compile(pattern, re.IGNORECASE) for pattern in _DUPLICATE_PATTERNS]
+
+# Unions of each group of patterns, to check a filename for any of them in one scan.
+# Most filenames contain no indicator at all, so the individual patterns (which
+# may overlap, and each count once) only need to run when the union matches.
+_QUALITY_ANY_RE = re.compile('|'.join(_QUALITY_PATTERNS), re.IGNORECASE)
+_DUPLICATE_ANY_RE = re.compile('|'.join(_DUPLICATE_PATTERNS), re.IGNORECASE)
+
+# Scores of language codes in filenames, for language preference scoring
+_LANGUAGE_WEIGHTS = {
+    'EN': 100,  # English highest priority
+    'US': 95,
+    'UK': 90,
+    'FR': 60,
+    'DE': 60,
+    'ES': 60,
+    'IT': 60,
+    'JP': 50,
+    'KR': 50,
+    'ZH': 45,
+    'ZHS': 45,
+    'ZHT': 45,
+    None: 0   # No language code
+}
+
+def _image_dimensions(path: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Get the dimensions of an image without decoding its pixels.
+    
+    The dimensions recorded when the scan hashed the file are used while the
+    file still has the recorded size; otherwise only the image header is read.
+    
+    Args:
+        path: Path to the image file
+        size: Current size of the file in bytes
+        
+    Returns:
+        Tuple of (width, height), or None if the file isn't a readable image
+    """
+    info = cached_file_info(path)
+    if info is not None and info[1] is not None and info[0] == size:
+        return info[1]
+    
+    try:
+        with Image.open(path) as img:
+            return img.size
+    except Exception:
+        return None
+
+def _set_resolution(metrics: dict, width: int, height: int, source: str):
+    """
+    Record an image's resolution in a metrics dictionary.
+    
+    Args:
+        metrics: Metrics dictionary to update
+        width: Width in pixels
+        height: Height in pixels
+        source: Where the resolution came from ('actual', 'filename' or 'none')
+    """
+    metrics['resolution_width'] = width
+    metrics['resolution_height'] = height
+    metrics['resolution_pixels'] = width * height
+    metrics['resolution_source'] = source
+
+class FileInfo:
+    """
+    Information about one file of a set, gathered and scored by auto-select.
+    
+    Uses __slots__, since the scoring loop reads and updates these fields for
+    every file (attribute slots are smaller and faster to access than dict keys).
+    """
+    
+    __slots__ = (
+        'path', 'size', 'filename', 'extension',
+        'resolution_width', 'resolution_height', 'resolution_pixels', 'resolution_source',
+        'language_code', 'quality_indicators', 'duplicate_indicators',
+        'score', 'size_score', 'resolution_score', 'language_score', 'quality_score', 'duplicate_score'
+    )
+    
+    def __init__(self, path: str, size: int, filename: str, extension: str, metrics: dict):
+        """
+        Initialize the file information.
+        
+        Args:
+            path: Full path to the file
+            size: Size of the file in bytes
+            filename: Basename of the file
+            extension: Lowercase file extension
+            metrics: Metrics extracted by ImageCompare.extract_file_metrics
+        """
+        self.path = path
+        self.size = size
+        self.filename = filename
+        self.extension = extension
+        
+        self.resolution_width = metrics['resolution_width']
+        self.resolution_height = metrics['resolution_height']
+        self.resolution_pixels = metrics['resolution_pixels']
+        self.resolution_source = metrics['resolution_source']
+        self.language_code = metrics['language_code']
+        self.quality_indicators = metrics['quality_indicators']
+        self.duplicate_indicators = metrics['duplicate_indicators']
+        
+        # Higher score = more likely to be kept (not deleted)
+        self.score = 0
+        
+        # Factor-specific scores, for tracking how the score came about
+        self.size_score = 0
+        self.resolution_score = 0
+        self.language_score = 0
+        self.quality_score = 0
+        self.duplicate_score = 0
+
+# Maximum number of image widgets kept hidden for reuse between sets
+MAX_POOLED_SLOTS = 30
+
+class ImageSlot(QFrame):
+    """
+    Widget showing one image of a duplicate set with its file information
+    and a checkbox to mark it for deletion.
+    
+    Slots are reused between sets: show_image() points an existing slot at
+    another file instead of building a new widget tree for every image.
+    """
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        
+        self.image_path = None
+        
+        self.setFrameShape(QFrame.StyledPanel)
+        self.setFrameShadow(QFrame.Raised)
+        self.setLineWidth(1)
+        
+        # Layout for the container
+        layout = QVBoxLayout(self)
+        
+        # Create a loading placeholder
+        self.loading_label = QLabel("Loading...")
+        self.loading_label.setAlignment(Qt.AlignCenter)
+        self.loading_label.setStyleSheet("font-style: italic; color: #666;")
+        layout.addWidget(self.loading_label)
+        
+        # Progress indicator
+        self.progress = QProgressBar()
+        self.progress.setRange(0, 0)  # Indeterminate progress
+        self.progress.setMaximumHeight(5)
+        self.progress.setTextVisible(False)
+        layout.addWidget(self.progress)
+        
+        # Image display, hidden until the image is loaded
+        self.image_label = QLabel()
+        self.image_label.setAlignment(Qt.AlignCenter)
+        self.image_label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.image_label.setMinimumSize(300, 220)
+        layout.addWidget(self.image_label)
+        
+        # File info layout
+        info_layout = QVBoxLayout()
+        
+        # File name
+        self.name_label = QLabel()
+        self.name_label.setWordWrap(True)
+        info_layout.addWidget(self.name_label)
+        
+        # File path
+        self.path_label = QLabel()
+        self.path_label.setWordWrap(True)
+        self.path_label.setStyleSheet("font-size: 10px; color: #666;")
+        info_layout.addWidget(self.path_label)
+        
+        # File size
+        self.size_label = QLabel()
+        info_layout.addWidget(self.size_label)
+        
+        layout.addLayout(info_layout)
+        
+        # Checkbox for selection
+        self.checkbox = QCheckBox("Delete this image")
+        layout.addWidget(self.checkbox)
+    
+    def show_image(self, image_path: str, size_bytes: Optional[int]):
+        """
+        Point the slot at an image, showing the loading indicator until set_pixmap() is called.
+        
+        Args:
+            image_path: Path to the image file
+            size_bytes: Size of the file in bytes, or None if it couldn't be read
+        """
+        self.image_path = image_path
+        
+        # Show the loading indicator in place of the previous image
+        self.image_label.hide()
+        self.image_label.clear()
+        self.loading_label.show()
+        self.progress.show()
+        
+        filename = os.path.basename(image_path)
+        self.name_label.setText(f"<b>{filename}</b>")
+        self.path_label.setText(image_path)
+        
+        if size_bytes is not None:
+            size_kb = size_bytes / 1024
+            size_mb = size_kb / 1024
+            
+            if size_mb >= 1:
+                size_str = f"{size_mb:.2f} MB"
+            else:
+                size_str = f"{size_kb:.2f} KB"
+            
+            self.size_label.setText(f"Size: {size_str}")
+            self.size_label.show()
+        else:
+            self.size_label.hide()
+        
+        self.checkbox.setChecked(False)
+        self.checkbox.setObjectName(f"checkbox_{image_path}")
+    
+    def set_pixmap(self, pixmap: QPixmap):
+        """
+        Show the loaded image, hiding the loading indicator.
+        
+        Args:
+            pixmap: Image (or thumbnail) to display
+        """
+        self.image_label.setPixmap(pixmap)
+        self.loading_label.hide()
+        self.progress.hide()
+        self.image_label.show()
+
 class ImageCompare(QWidget):
     """
     Widget that displays multiple images side-by-side for comparison,
@@ -29,12 +289,19 @@ class ImageCompare(QWidget):
     delete_requested = Signal(list)
     # Signal emitted when skip button is clicked
     skip_requested = Signal()
+    # Signal emitted from a worker thread with the paths auto-select picked
+    auto_select_ready = Signal(int, list)
     
     def __init__(self, parent=None):
         super().__init__(parent)
         
         self.image_paths = []
         self.image_widgets = {}  # Dictionary to store references to image widgets
+        self.checkboxes = {}  # Dictionary of path: checkbox marking the image for deletion
+        self.file_sizes = {}  # Dictionary of path: file size read when the image was shown
+        self.pending_loads = []  # Load requests of the shown images, cancelled when they're cleared
+        self.slot_pool = []  # Hidden image widgets kept for reuse by the next set
+        self.auto_select_generation = 0  # Incremented by every auto-select run and every set change
         
         # Create image loader for asynchronous loading
         self.image_loader = ImageLoader(self)
@@ -42,6 +309,9 @@ class ImageCompare(QWidget):
         # Image size for thumbnails
         self.thumbnail_size = QSize(300, 300)
         
+        # Emitted on a worker thread, so the slot runs queued on the GUI thread
+        self.auto_select_ready.connect(self._apply_auto_select)
+        
         self.init_ui()
     
     def init_ui(self):
@@ -152,10 +422,6 @@ class ImageCompare(QWidget):
         # Store new paths
         self.image_paths = image_paths
         
-        # Start preloading the next few duplicate sets (if parent has them)
-        if hasattr(self.parent(), 'duplicate_list') and hasattr(self.parent().duplicate_list, 'duplicate_sets'):
-            self.preload_next_sets()
-        
         # Calculate grid dimensions
         # Try to display max 3 images per row for better comparison
         max_columns = 3
@@ -171,14 +437,18 @@ class ImageCompare(QWidget):
             
             # Store reference to widget
             self.image_widgets[path] = image_widget
+        
+        # Start preloading the next few duplicate sets, queued after the shown images
+        self.preload_next_sets()
             
         # Run auto-select if checkbox is checked
         if self.auto_select_checkbox.isChecked():
             self.auto_select_images()
     
-    def create_image_widget(self, image_path: str) -> QWidget:
+    def create_image_widget(self, image_path: str) -> ImageSlot:
         """
-        Create a widget for displaying an image with checkbox and info.
+        Get a widget for displaying an image with checkbox and info.
+        A widget left over from a previous set is reused when one is available.
         Uses asynchronous loading for better UI responsiveness.
         
         Args:
@@ -187,121 +457,68 @@ class ImageCompare(QWidget):
         Returns:
             Widget containing the image, checkbox and information
         """
-        # Container widget
-        container = QFrame()
-        container.setFrameShape(QFrame.StyledPanel)
-        container.setFrameShadow(QFrame.Raised)
-        container.setLineWidth(1)
-        
-        # Layout for the container
-        layout = QVBoxLayout(container)
-        
-        # Image display
-        image_label = QLabel()
-        image_label.setAlignment(Qt.AlignCenter)
-        
-        # Create a loading placeholder
-        loading_label = QLabel("Loading...")
-        loading_label.setAlignment(Qt.AlignCenter)
-        loading_label.setStyleSheet("font-style: italic; color: #666;")
-        
-        # Progress indicator
-        progress = QProgressBar()
-        progress.setRange(0, 0)  # Indeterminate progress
-        progress.setMaximumHeight(5)
-        progress.setTextVisible(False)
+        # Reuse a pooled widget instead of building a new one
+        slot = self.slot_pool.pop() if self.slot_pool else ImageSlot(self.scroll_widget)
         
-        # Add loading indicator to layout
-        layout.addWidget(loading_label)
-        layout.addWidget(progress)
-        layout.addWidget(image_label)
+        # Try to get file size (remembered, so auto-select needn't stat the file again)
+        try:
+            size_bytes = os.stat(image_path).st_size
+            self.file_sizes[image_path] = size_bytes
+        except OSError:
+            size_bytes = None
         
-        # Hide actual image label until loaded
-        image_label.hide()
+        slot.show_image(image_path, size_bytes)
         
         # Start asynchronous loading of image
         def image_loaded_callback(path, pixmap, is_thumbnail):
-            # This is called when the image is loaded
-            if path == image_path:
-                # Update the image
-                image_label.setPixmap(pixmap)
-                
-                # Show image and hide loading indicators
-                loading_label.hide()
-                progress.hide()
-                image_label.show()
+            # This is called when the image is loaded; the slot may show another image by now
+            if path == slot.image_path:
+                slot.set_pixmap(pixmap)
                 
         # Queue the image for loading
-        self.image_loader.load_image(
+        request = self.image_loader.load_image(
             image_path=image_path,
             target_size=self.thumbnail_size,
             callback=image_loaded_callback,
             priority=10,  # High priority for visible images
-            load_full_res=True  # Load full resolution after thumbnail
+            load_full_res=True,  # Load full resolution after thumbnail
+            file_size=size_bytes  # Already stat'ed above (None makes the loader check the file)
         )
+        if request is not None:
+            self.pending_loads.append(request)
         
-        # Set a minimum size policy
-        image_label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        image_label.setMinimumSize(300, 220)
-        
-        layout.addWidget(image_label)
-        
-        # File info layout
-        info_layout = QVBoxLayout()
+        # Keep a reference so selections don't need to search the widget tree
+        self.checkboxes[image_path] = slot.checkbox
         
-        # File name
-        filename = os.path.basename(image_path)
-        name_label = QLabel(f"<b>{filename}</b>")
-        name_label.setWordWrap(True)
-        info_layout.addWidget(name_label)
-        
-        # File path (shortened)
-        path_label = QLabel(image_path)
-        path_label.setWordWrap(True)
-        path_label.setStyleSheet("font-size: 10px; color: #666;")
-        info_layout.addWidget(path_label)
-        
-        # Try to get file size
-        try:
-            size_bytes = os.path.getsize(image_path)
-            size_kb = size_bytes / 1024
-            size_mb = size_kb / 1024
-            
-            if size_mb >= 1:
-                size_str = f"{size_mb:.2f} MB"
-            else:
-                size_str = f"{size_kb:.2f} KB"
-                
-            size_label = QLabel(f"Size: {size_str}")
-            info_layout.addWidget(size_label)
-        except:
-            pass
-        
-        layout.addLayout(info_layout)
-        
-        # Checkbox for selection
-        checkbox = QCheckBox("Delete this image")
-        checkbox.setObjectName(f"checkbox_{image_path}")
-        layout.addWidget(checkbox)
-        
-        container.setLayout(layout)
-        return container
+        slot.show()
+        return slot
     
     def clear_images(self):
-        """Clear all displayed images."""
+        """Clear all displayed images, keeping their widgets for reuse."""
         # Remove all widgets from the grid
         while self.grid_layout.count():
             item = self.grid_layout.takeAt(0)
             widget = item.widget()
             if widget:
-                widget.deleteLater()
+                widget.hide()
+                if len(self.slot_pool) < MAX_POOLED_SLOTS:
+                    self.slot_pool.append(widget)
+                else:
+                    widget.deleteLater()
         
         # Clear stored references
         self.image_widgets = {}
+        self.checkboxes = {}
+        self.file_sizes = {}
         self.image_paths = []
         
-        # Cancel any pending image loads
-        # (The image_loader will continue running but discard results)
+        # Drop the result of an auto-select run still in progress for these images
+        self.auto_select_generation += 1
+        
+        # Cancel any pending image loads, so images no longer shown aren't decoded
+        for request in self.pending_loads:
+            self.image_loader.cancel(request)
+        self.pending_loads = []
     
     def get_selected_images(self) -> List[str]:
         """
@@ -312,27 +529,21 @@ class ImageCompare(QWidget):
         """
         selected = []
         
-        for path, widget in self.image_widgets.items():
-            # Find the checkbox within the widget
-            checkbox = widget.findChild(QCheckBox, f"checkbox_{path}")
-            if checkbox and checkbox.isChecked():
+        for path, checkbox in self.checkboxes.items():
+            if checkbox.isChecked():
                 selected.append(path)
         
         return selected
     
     def select_all_images(self):
         """Select all images for deletion."""
-        for path, widget in self.image_widgets.items():
-            checkbox = widget.findChild(QCheckBox, f"checkbox_{path}")
-            if checkbox:
-                checkbox.setChecked(True)
+        for checkbox in self.checkboxes.values():
+            checkbox.setChecked(True)
     
     def deselect_all_images(self):
         """Deselect all images."""
-        for path, widget in self.image_widgets.items():
-            checkbox = widget.findChild(QCheckBox, f"checkbox_{path}")
-            if checkbox:
-                checkbox.setChecked(False)
+        for checkbox in self.checkboxes.values():
+            checkbox.setChecked(False)
     
     def auto_select_images(self):
         """
@@ -344,91 +555,150 @@ class ImageCompare(QWidget):
         2. Files with patterns like "(1)", "copy", etc. in the filename are preferred for deletion
         3. Files with user-defined preferred patterns receive bonus points
         """
-        if not self.image_paths:
-            return
-        
         # Reset selections first
         self.deselect_all_images()
         
-        # Get file information for scoring
-        file_info = []
-        for path in self.image_paths:
-            try:
-                size = os.path.getsize(path)
-                filename = os.path.basename(path)
-                extension = os.path.splitext(filename)[1].lower()
-                
-                # Extract all useful information from filename
-                file_metrics = self.extract_file_metrics(path, filename)
-                
-                # Create info dictionary with all extracted metrics
-                info = {
-                    'path': path,
-                    'size': size,
-                    'filename': filename,
-                    'extension': extension,
-                    'score': 0  # Higher score = more likely to be kept (not deleted)
-                }
-                
-                # Add all extracted metrics
-                info.update(file_metrics)
-                
-                file_info.append(info)
-            except Exception as e:
-                # Skip files with errors
-                print(f"Error processing {path}: {str(e)}")
-                continue
+        # Any earlier run still in progress is for a stale selection; drop its result
+        self.auto_select_generation += 1
+        generation = self.auto_select_generation
         
-        if not file_info:
-            return  # No valid files to process
+        # One file is always kept, so a set needs two files for anything to be selected
+        if len(self.image_paths) < 2:
+            return
         
-        # Print initial file info
-        print("\n--- Debug: Auto-Select Scoring ---")
-        for info in file_info:
-            print(f"File: {os.path.basename(info['path'])}")
-            print(f"  Size: {info['size']} bytes")
-            
-            # Print identified metrics
-            if 'resolution_width' in info and info['resolution_width'] > 0:
-                source = info.get('resolution_source', 'unknown')
-                print(f"  Resolution: {info['resolution_width']}x{info['resolution_height']} (source: {source})")
-            if 'language_code' in info and info['language_code']:
-                print(f"  Language: {info['language_code']}")
-            if 'quality_indicators' in info and info['quality_indicators']:
-                print(f"  Quality indicators: {', '.join(info['quality_indicators'])}")
-            if 'duplicate_indicators' in info and info['duplicate_indicators']:
-                print(f"  Duplicate indicators: {', '.join(info['duplicate_indicators'])}")
+        # Get file information for scoring; every file needs a stat and may need its
+        # header read, so the files are looked at in parallel on the worker pool. The
+        # GUI thread doesn't wait for them: the last file to finish scores the set and
+        # hands the selection back through auto_select_ready.
+        executor = get_resource_manager().get_executor("image_loading")
+        futures = [executor.submit(self.get_file_info, path) for path in self.image_paths]
+        remaining = [len(futures)]
+        lock = threading.Lock()
+        
+        def on_file_done(_future):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            
+            file_info = [future.result() for future in futures]
+            self.auto_select_ready.emit(generation, self.choose_images_to_delete(file_info))
+        
+        for future in futures:
+            future.add_done_callback(on_file_done)
+    
+    def choose_images_to_delete(self, file_info: List[Optional[FileInfo]]) -> List[str]:
+        """
+        Score the files of a set and pick all but the best one for deletion.
+        Runs on a worker thread, so it must not touch any widgets.
+        
+        Args:
+            file_info: Information about each file (None for files that couldn't be read), in set order
             
-        # Apply scoring based on multiple factors
-        self.score_files(file_info)
+        Returns:
+            List of paths to select for deletion
+        """
+        file_info = [info for info in file_info if info is not None]
         
-        # Print final scores
-        print("\n--- Final Scores ---")
-        for info in file_info:
-            print(f"File: {os.path.basename(info['path'])}, Final Score: {info['score']:.2f}")
+        if len(file_info) < 2:
+            return []  # Not enough valid files to select any
+        
+        # The debug output walks every file, so skip it entirely unless it's shown
+        debug = logger.isEnabledFor(logging.DEBUG)
+        
+        # Log initial file info
+        if debug:
+            logger.debug("--- Auto-Select Scoring ---")
+            for info in file_info:
+                logger.debug("File: %s", info.filename)
+                logger.debug("  Size: %d bytes", info.size)
+                
+                # Log identified metrics
+                if info.resolution_width > 0:
+                    logger.debug("  Resolution: %dx%d (source: %s)", info.resolution_width,
+                                 info.resolution_height, info.resolution_source)
+                if info.language_code:
+                    logger.debug("  Language: %s", info.language_code)
+                if info.quality_indicators:
+                    logger.debug("  Quality indicators: %s", ', '.join(info.quality_indicators))
+                if info.duplicate_indicators:
+                    logger.debug("  Duplicate indicators: %s", ', '.join(info.duplicate_indicators))
             
-        # Sort by score (ascending, so lower scores come first)
-        file_info.sort(key=lambda x: x['score'])
+        # Apply scoring based on multiple factors
+        self.score_files(file_info)
         
-        # Print sorted order
-        print("\n--- Sorted Order (lowest to highest score) ---")
-        for i, info in enumerate(file_info):
-            status = "KEEP" if i == len(file_info)-1 else "DELETE"
-            print(f"{status}: {os.path.basename(info['path'])}, Score: {info['score']:.2f}")
+        # Log final scores
+        if debug:
+            logger.debug("--- Final Scores ---")
+            for info in file_info:
+                logger.debug("File: %s, Final Score: %.2f", info.filename, info.score)
+            
+        # Only the highest-scored file is kept, so a single pass finds it (no sort
+        # needed); on a tie the later file wins, as the last of a stable sort would
+        keep = file_info[0]
+        for info in file_info[1:]:
+            if info.score >= keep.score:
+                keep = info
+        
+        # Log sorted order
+        if debug:
+            logger.debug("--- Sorted Order (lowest to highest score) ---")
+            for info in sorted(file_info, key=lambda x: x.score):
+                status = "KEEP" if info is keep else "DELETE"
+                logger.debug("%s: %s, Score: %.2f", status, info.filename, info.score)
         
         # Select all but the highest-scored file
-        if len(file_info) > 1:
-            # Always keep the highest-scored file
-            files_to_delete = [info['path'] for info in file_info[:-1]]
-            
-            # Set checkboxes for files to delete (just checking boxes, not deleting)
-            for path in files_to_delete:
-                widget = self.image_widgets.get(path)
-                if widget:
-                    checkbox = widget.findChild(QCheckBox, f"checkbox_{path}")
-                    if checkbox:
-                        checkbox.setChecked(True)
-    def extract_file_metrics(self, path: str, filename: str) -> dict:
+        return [info.path for info in file_info if info is not keep]
+    
+    @Slot(int, list)
+    def _apply_auto_select(self, generation: int, paths: List[str]):
+        """
+        Check the boxes of the images auto-select picked (just checking boxes, not deleting).
+        
+        Args:
+            generation: Run of auto-select the paths were picked by
+            paths: Paths of the images to select for deletion
+        """
+        # Ignore results for a set no longer shown, or superseded by a newer run
+        if generation != self.auto_select_generation:
+            return
+        
+        for path in paths:
+            checkbox = self.checkboxes.get(path)
+            if checkbox:
+                checkbox.setChecked(True)
+    
+    def get_file_info(self, path: str) -> Optional[FileInfo]:
+        """
+        Gather the information used to score a file for auto-select.
+        Runs on a worker thread, so it must not touch any widgets.
+        
+        Args:
+            path: Full path to the file
+            
+        Returns:
+            Information about the file, or None if the file can't be read
+        """
+        try:
+            # Reuse the size read when the image was shown; stat only files that weren't
+            size = self.file_sizes.get(path)
+            if size is None:
+                size = os.stat(path).st_size
+            filename = os.path.basename(path)
+            extension = os.path.splitext(filename)[1].lower()
+            
+            # Extract all useful information from filename
+            file_metrics = self.extract_file_metrics(path, filename, size)
+            
+            info = FileInfo(path, size, filename, extension, file_metrics)
+            
+            return info
+        except Exception as e:
+            # Skip files with errors
+            logger.warning("Error processing %s: %s", path, e)
+            return None
+    
+    def extract_file_metrics(self, path: str, filename: str, size: Optional[int] = None) -> dict:
         """
         Extract various metrics from a file to use in scoring.
         Uses multiple approaches to identify important characteristics.
@@ -436,55 +706,37 @@ class ImageCompare(QWidget):
         Args:
             path: Full path to the file
             filename: Basename of the file
+            size: Size of the file in bytes, if already known
             
         Returns:
             Dictionary with extracted metrics
         """
         metrics = {}
         
-        # 1. Extract actual image dimensions by loading the image
+        # 1. Extract actual image dimensions (from the scan or the image header,
+        # so the pixels aren't decoded just to read two numbers)
         try:
-            # Use QImage to get actual dimensions of the image
-            image = QImage(path)
-            if not image.isNull():
-                # Successfully loaded the image
-                width = image.width()
-                height = image.height()
-                metrics['resolution_width'] = width
-                metrics['resolution_height'] = height
-                metrics['resolution_pixels'] = width * height
-                metrics['resolution_source'] = 'actual'
-            else:
-                # Fall back to filename pattern if image loading fails
-                res_match = re.search(r'(\d+)x(\d+)', filename)
-                if res_match:
-                    metrics['resolution_width'] = int(res_match.group(1))
-                    metrics['resolution_height'] = int(res_match.group(2))
-                    metrics['resolution_pixels'] = metrics['resolution_width'] * metrics['resolution_height']
-                    metrics['resolution_source'] = 'filename'
-                else:
-                    metrics['resolution_width'] = 0
-                    metrics['resolution_height'] = 0
-                    metrics['resolution_pixels'] = 0
-                    metrics['resolution_source'] = 'none'
+            if size is None:
+                size = os.path.getsize(path)
+            dimensions = _image_dimensions(path, size)
         except Exception as e:
-            # If there's an error loading the image, fall back to filename method
-            print(f"Error loading image dimensions for {filename}: {str(e)}")
-            res_match = re.search(r'(\d+)x(\d+)', filename)
+            logger.warning("Error loading image dimensions for %s: %s", filename, e)
+            dimensions = None
+        
+        if dimensions is not None:
+            # Successfully read the dimensions
+            _set_resolution(metrics, dimensions[0], dimensions[1], 'actual')
+        else:
+            # Fall back to filename pattern if image loading fails
+            res_match = _RESOLUTION_RE.search(filename)
             if res_match:
-                metrics['resolution_width'] = int(res_match.group(1))
-                metrics['resolution_height'] = int(res_match.group(2))
-                metrics['resolution_pixels'] = metrics['resolution_width'] * metrics['resolution_height']
-                metrics['resolution_source'] = 'filename'
+                _set_resolution(metrics, int(res_match.group(1)), int(res_match.group(2)), 'filename')
             else:
-                metrics['resolution_width'] = 0
-                metrics['resolution_height'] = 0
-                metrics['resolution_pixels'] = 0
-                metrics['resolution_source'] = 'none'
+                _set_resolution(metrics, 0, 0, 'none')
         
         # 2. Detect language codes using more generic approach
         # Look for language codes with various formats
-        lang_match = re.search(r'[_-]([A-Z]{2,5})\b', filename)
+        lang_match = _LANGUAGE_RE.search(filename)
         if lang_match:
             metrics['language_code'] = lang_match.group(1)
         elif any(suffix in filename for suffix in ['-EN', '_EN', '-en', '_en']):
@@ -492,116 +744,90 @@ class ImageCompare(QWidget):
         else:
             metrics['language_code'] = None
         
-        # 3. Detect quality indicators
-        quality_patterns = [
-            r'\b(HD)\b', r'\b(4K)\b', r'\b(UHD)\b', r'\b(HQ)\b', r'\b(LQ)\b',
-            r'\b(high[\s_-]?quality)\b', r'\b(low[\s_-]?quality)\b',
-            r'\b(high[\s_-]?res)\b', r'\b(low[\s_-]?res)\b',
-            r'\b(1080p?)\b', r'\b(720p?)\b', r'\b(2160p?)\b', r'\b(480p?)\b'
-        ]
+        # 3. Detect quality indicators (one search per pattern, if any can match)
         metrics['quality_indicators'] = []
-        for pattern in quality_patterns:
-            if re.search(pattern, filename, re.IGNORECASE):
-                # Extract the matched quality indicator
-                match = re.search(pattern, filename, re.IGNORECASE)
+        if _QUALITY_ANY_RE.search(filename):
+            for pattern in _QUALITY_RES:
+                match = pattern.search(filename)
                 if match:
+                    # Extract the matched quality indicator
                     metrics['quality_indicators'].append(match.group(1))
         
         # 4. Detect duplicate indicators
-        duplicate_patterns = [
-            r'\b(copy)\b', r'\((1|2|3)\)', r'[\s_-](1|2|3)[\s_.\)]',
-            r'duplicate', r'backup', r'[(]?\s*copy\s*[)]?'
-        ]
         metrics['duplicate_indicators'] = []
-        for pattern in duplicate_patterns:
-            if re.search(pattern, filename, re.IGNORECASE):
-                match = re.search(pattern, filename, re.IGNORECASE)
+        if _DUPLICATE_ANY_RE.search(filename):
+            for pattern in _DUPLICATE_RES:
+                match = pattern.search(filename)
                 if match:
                     metrics['duplicate_indicators'].append(match.group(0))
         
         return metrics
     
-    def score_files(self, file_info: List[dict]):
+    def score_files(self, file_info: List[FileInfo]):
         """
         Apply scoring to files based on multiple extracted metrics.
         
         Args:
-            file_info: List of file information dictionaries
+            file_info: List of file information
         """
-        # Get value ranges for normalization
-        max_size = max([info['size'] for info in file_info]) if file_info else 0
-        min_size = min([info['size'] for info in file_info]) if file_info else 0
-        
-        has_resolution_info = any(info['resolution_width'] > 0 for info in file_info)
-        if has_resolution_info:
-            max_resolution = max([info['resolution_pixels'] for info in file_info if info['resolution_pixels'] > 0])
-        
-        # Language preference scoring
-        language_weights = {
-            'EN': 100,  # English highest priority
-            'US': 95,
-            'UK': 90,
-            'FR': 60,
-            'DE': 60,
-            'ES': 60,
-            'IT': 60,
-            'JP': 50,
-            'KR': 50,
-            'ZH': 45,
-            'ZHS': 45,
-            'ZHT': 45,
-            None: 0   # No language code
-        }
+        # Get value ranges for normalization, all in a single pass over the files
+        max_size = 0
+        min_size = file_info[0].size if file_info else 0
+        max_resolution = 0
+        for info in file_info:
+            if info.size > max_size:
+                max_size = info.size
+            if info.size < min_size:
+                min_size = info.size
+            if info.resolution_pixels > max_resolution:
+                max_resolution = info.resolution_pixels
+        
+        has_resolution_info = max_resolution > 0
+        
+        # Size normalization is the same for every file, so work it out once:
+        # if all files are very similar in size, reduce the importance of size
+        size_range_percentage = ((max_size - min_size) / max_size) * 100 if max_size > 0 else 0
+        if size_range_percentage < 5:  # Within 5% size difference
+            size_weight = 15  # Low weight for size
+        else:
+            size_weight = 40  # Medium weight for size
+        
+        # Load the user preferences once for the whole set (not once per file)
+        pref_manager = self.get_preferences_manager()
+        preferences = pref_manager.get_patterns() if pref_manager else []
+        pref_matcher = pref_manager.get_compiled_matcher() if pref_manager else None
         
         # Process files
         for info in file_info:
-            # Initialize factor-specific scores for better tracking
-            info['size_score'] = 0
-            info['resolution_score'] = 0
-            info['language_score'] = 0
-            info['quality_score'] = 0
-            info['duplicate_score'] = 0
-            
-            # 1. Apply language preference scoring
-            if info['language_code'] in language_weights:
-                lang_score = language_weights[info['language_code']]
-            else:
-                # Default score for other language codes
-                lang_score = 40
+            # 1. Apply language preference scoring (other language codes score 40)
+            lang_score = _LANGUAGE_WEIGHTS.get(info.language_code, 40)
             
-            info['language_score'] = lang_score
-            info['score'] += lang_score
-            print(f"  Language score: {lang_score} for {info['language_code']} in {os.path.basename(info['path'])}")
+            info.language_score = lang_score
+            info.score += lang_score
+            logger.debug("  Language score: %s for %s in %s", lang_score, info.language_code, info.filename)
             
             # 2. Apply resolution scoring if available
-            if has_resolution_info and info['resolution_pixels'] > 0:
+            if has_resolution_info and info.resolution_pixels > 0:
                 # Higher resolution gets higher score
-                resolution_ratio = info['resolution_pixels'] / max_resolution
+                resolution_ratio = info.resolution_pixels / max_resolution
                 resolution_score = resolution_ratio * 70  # High importance for resolution
-                info['resolution_score'] = resolution_score
-                info['score'] += resolution_score
-                print(f"  Resolution score: {resolution_score:.1f} for {os.path.basename(info['path'])}")
-            
-            # 3. Apply size scoring - check if files have similar sizes
-            size_range_percentage = ((max_size - min_size) / max_size) * 100 if max_size > 0 else 0
+                info.resolution_score = resolution_score
+                info.score += resolution_score
+                logger.debug("  Resolution score: %.1f for %s", resolution_score, info.filename)
             
+            # 3. Apply size scoring, weighted by how similar the sizes are
             # Calculate size ratio (0.0 to 1.0)
-            size_ratio = info['size'] / max_size if max_size > 0 else 0
+            size_ratio = info.size / max_size if max_size > 0 else 0
+            size_score = size_ratio * size_weight
             
-            # If all files are very similar in size, reduce the importance of size
-            if size_range_percentage < 5:  # Within 5% size difference
-                size_score = size_ratio * 15  # Low weight for size
-            else:
-                size_score = size_ratio * 40  # Medium weight for size
-            
-            info['size_score'] = size_score
-            info['score'] += size_score
-            print(f"  Size score: {size_score:.1f} for {os.path.basename(info['path'])}")
+            info.size_score = size_score
+            info.score += size_score
+            logger.debug("  Size score: %.1f for %s", size_score, info.filename)
             
             # 4. Apply quality indicator scoring
             quality_score = 0
-            if info['quality_indicators']:
-                for indicator in info['quality_indicators']:
+            if info.quality_indicators:
+                for indicator in info.quality_indicators:
                     indicator_lower = indicator.lower()
                     # Higher quality indicators boost score
                     if any(term in indicator_lower for term in ['4k', 'uhd', '2160', 'high']):
@@ -614,136 +840,38 @@ class ImageCompare(QWidget):
                     elif any(term in indicator_lower for term in ['low', '480', 'lq']):
                         quality_score -= 20
             
-            info['quality_score'] = quality_score
-            info['score'] += quality_score
+            info.quality_score = quality_score
+            info.score += quality_score
             
             if quality_score != 0:
-                print(f"  Quality score: {quality_score} for {os.path.basename(info['path'])}")
+                logger.debug("  Quality score: %s for %s", quality_score, info.filename)
             
             # 5. Apply duplicate indicator penalties
             duplicate_penalty = 0
-            if info['duplicate_indicators']:
+            if info.duplicate_indicators:
                 # Each duplicate indicator reduces score
-                duplicate_penalty = -30 * len(info['duplicate_indicators'])
+                duplicate_penalty = -30 * len(info.duplicate_indicators)
             
-            info['duplicate_score'] = duplicate_penalty
-            info['score'] += duplicate_penalty
+            info.duplicate_score = duplicate_penalty
+            info.score += duplicate_penalty
             
             if duplicate_penalty != 0:
-                print(f"  Duplicate penalty: {duplicate_penalty} for {os.path.basename(info['path'])}")
+                logger.debug("  Duplicate penalty: %s for %s", duplicate_penalty, info.filename)
             
-            # 6. Apply user preferences from PreferencesManager
-            pref_manager = self.get_preferences_manager()
-            if pref_manager:
+            # 6. Apply user preferences from PreferencesManager (a single search
+            # skips the names that contain none of the patterns)
+            if pref_matcher is not None and pref_matcher.search(info.filename):
                 pref_score = 0
-                for pref in pref_manager.get_patterns():
+                for pref in preferences:
                     pattern = pref.pattern
-                    if pattern in info['filename']:
-                        # Apply preference
-                        pref_score += pref.weight * 1.2
-                        print(f"  Preference score: +{pref.weight * 1.2} for pattern '{pattern}' in {os.path.basename(info['path'])}")
-                
-                info['score'] += pref_score
-            # If we have resolution information, prioritize that over raw file size
-            # Use the correct resolution keys
-            max_resolution = max([info['resolution_pixels'] for info in file_info if info['resolution_pixels'] > 0])
-            
-            for info in file_info:
-                resolution_score = 0
-                if info['resolution_width'] > 0:
-                    # Calculate resolution ratio (0.0 to 1.0)
-                    # No need to recalculate pixel count since we already have resolution_pixels
-                    resolution_ratio = info['resolution_pixels'] / max_resolution
-                    # Moderate weight for resolution: 0-50 points
-                    resolution_score = resolution_ratio * 50
-                
-                # Still consider file size but with reduced weight
-                size_ratio = info['size'] / max_size
-                size_score = size_ratio * 20
-                
-                # Add both scores
-                info['score'] += resolution_score + size_score
-        else:
-            # No resolution info available, use regular size-based scoring
-            # Calculate percentage difference between smallest and largest file
-            size_range_percentage = ((max_size - min_size) / max_size) * 100
-            
-            for info in file_info:
-                # Calculate size ratio (0.0 to 1.0)
-                size_ratio = info['size'] / max_size
+                    if pattern in info.filename:
+                        # Language code patterns like "_EN" match exactly, so they weigh more
+                        weight = pref.weight * (1.8 if pattern.startswith("_") else 1.2)
+                        pref_score += weight
+                        logger.debug("  Preference score: +%s for pattern '%s' in %s",
+                                     weight, pattern, info.filename)
                 
-                # For files that are very close in size (within 2.5%),
-                # drastically reduce the importance of size differences
-                if size_range_percentage < 2.5:
-                    # Files are nearly identical in size, so size gets very little weight
-                    size_points = size_ratio * 10
-                else:
-                    # Normal weight for size when there are significant differences
-                    size_points = size_ratio * 50
-                
-                info['score'] += size_points
-        
-        # Load preference manager
-        pref_manager = self.get_preferences_manager()
-        
-        # Score files based on filename patterns
-        
-        # 1. Penalty for duplicate patterns (files with duplicate indicators get lower scores)
-        duplicate_patterns = [
-            '(1)', '(2)', '(3)', '(copy)', 'copy', 'Copy',
-            '_1', '_2', '_3', '-1', '-2', '-3', 'duplicate'
-        ]
-        
-        for info in file_info:
-            # Check for duplicate patterns in filename (lower score = more likely to be deleted)
-            # Apply negative scoring for duplicate patterns
-            for pattern in duplicate_patterns:
-                if pattern in info['filename']:
-                    # Reduce score by 30 points for each duplicate pattern found
-                    info['score'] -= 30
-        
-        # 2. Bonus for preferred patterns from preferences
-        if pref_manager:
-            for info in file_info:
-                for pref in pref_manager.get_patterns():
-                    pattern = pref.pattern
-                    # Handle special case for language codes
-                    # Look for exact matches of "_EN", "_KR", etc.
-                    if pattern.startswith("_") and f"{pattern}" in info['filename']:
-                        # Give language code patterns higher weight when they match exactly
-                        info['score'] += pref.weight * 1.8
-                        print(f"  Applied preference weight {pref.weight * 1.8} for pattern '{pattern}' to {os.path.basename(info['path'])}")
-                    elif pattern in info['filename']:
-                        # Regular pattern match
-                        info['score'] += pref.weight * 1.2
-                        print(f"  Applied preference weight {pref.weight * 1.2} for pattern '{pattern}' to {os.path.basename(info['path'])}")
-        
-        # Print final scores before sorting
-        print("\n--- Final Scores ---")
-        for info in file_info:
-            print(f"File: {os.path.basename(info['path'])}, Final Score: {info['score']}")
-            
-        # Sort by score (ascending, so lower scores come first)
-        file_info.sort(key=lambda x: x['score'])
-        
-        # Print sorted order
-        print("\n--- Sorted Order (lowest to highest score) ---")
-        for i, info in enumerate(file_info):
-            status = "KEEP" if i == len(file_info)-1 else "DELETE"
-            print(f"{status}: {os.path.basename(info['path'])}, Score: {info['score']}")
-        
-        # Select all but the highest-scored file
-        if len(file_info) > 1:
-            # Always keep the highest-scored file
-            files_to_delete = [info['path'] for info in file_info[:-1]]
-            
-            # Set checkboxes for files to delete (just checking boxes, not deleting)
-            for path in files_to_delete:
-                widget = self.image_widgets.get(path)
-                if widget:
-                    checkbox = widget.findChild(QCheckBox, f"checkbox_{path}")
-                    if checkbox:
-                        checkbox.setChecked(True)
+                info.score += pref_score
     
     def show_preferences(self):
         """Show the preferences dialog."""
@@ -769,35 +897,23 @@ class ImageCompare(QWidget):
             # No images to get folder from
             return
             
-        # Handle multiple selected files from potentially different folders
-        if len(selected) > 1:
-            # Identify all unique folders
-            folders = {os.path.dirname(path): path for path in selected}
-            
-            if len(folders) > 1:
-                # Multiple different folders selected - count files per folder
-                folder_counts = {}
-                for path in selected:
-                    folder = os.path.dirname(path)
-                    folder_counts[folder] = folder_counts.get(folder, 0) + 1
-                
-                # Find the folder with the most selected files
-                most_common_folder = max(folder_counts.items(), key=lambda x: x[1])[0]
-                
-                # Report if multiple folders were detected
-                status_msg = f"Multiple folders detected. Opening the folder with most files: {os.path.basename(most_common_folder)}"
-                
-                # Update status
-                if self.parent() and hasattr(self.parent(), 'progress_display'):
-                    self.parent().progress_display.update_status(status_msg)
-                
-                folder = most_common_folder
-            else:
-                # All files are in the same folder
-                folder = list(folders.keys())[0]
+        # Count the selected files per folder in a single pass
+        folder_counts = Counter(os.path.dirname(path) for path in selected)
+        
+        if len(folder_counts) > 1:
+            # Multiple different folders selected - find the folder with the most
+            # selected files (the first of them on a tie)
+            folder = folder_counts.most_common(1)[0][0]
+            
+            # Report if multiple folders were detected
+            status_msg = f"Multiple folders detected. Opening the folder with most files: {os.path.basename(folder)}"
+            
+            # Update status
+            if self.parent() and hasattr(self.parent(), 'progress_display'):
+                self.parent().progress_display.update_status(status_msg)
         else:
-            # Only one file selected
-            folder = os.path.dirname(selected[0])
+            # All files are in the same folder
+            folder = next(iter(folder_counts))
         
         try:
             # Use the appropriate command based on the platform
@@ -811,7 +927,7 @@ class ImageCompare(QWidget):
             if self.parent() and hasattr(self.parent(), 'progress_display'):
                 self.parent().progress_display.update_status(f"Opened folder: {folder}")
         except Exception as e:
-            print(f"Error opening folder: {str(e)}")
+            logger.warning("Error opening folder: %s", e)
             
             # Show error if possible
             if self.parent() and hasattr(self.parent(), 'progress_display'):
@@ -822,7 +938,7 @@ class ImageCompare(QWidget):
         # Create a new instance each time for thread safety
         return PreferencesManager()
     
-    def preload_next_sets(self, count: int = 3):
+    def preload_next_sets(self, count: int = 2):
         """
         Preload images from the next few duplicate sets.
         This improves user experience when navigating between sets.
@@ -831,44 +947,23 @@ class ImageCompare(QWidget):
             count: Number of future sets to preload
         """
         try:
-            # Only if we have access to the duplicate sets
-            if not hasattr(self.parent(), 'duplicate_list'):
-                return
-                
-            duplicate_list = self.parent().duplicate_list
-            if not hasattr(duplicate_list, 'duplicate_sets'):
-                return
-                
-            # Get current index and duplicate sets
-            current_hash = duplicate_list.current_hash
-            if not current_hash:
+            # The duplicate list belongs to the main window (our parent is a splitter)
+            duplicate_list = getattr(self.window(), 'duplicate_list', None)
+            if duplicate_list is None:
                 return
                 
-            duplicate_sets = duplicate_list.duplicate_sets
-            if not duplicate_sets:
-                return
-                
-            # Find next few sets
-            keys = list(duplicate_sets.keys())
-            if current_hash in keys:
-                current_idx = keys.index(current_hash)
-                
-                # Preload the next few sets
-                preload_paths = []
-                for i in range(1, count + 1):
-                    next_idx = (current_idx + i) % len(keys)
-                    next_hash = keys[next_idx]
-                    preload_paths.extend(duplicate_sets[next_hash])
-                
-                # Queue preloading with low priority
-                if preload_paths:
-                    self.image_loader.preload_images(
-                        preload_paths,
-                        self.thumbnail_size
-                    )
+            # Preload the sets shown after the current one, in the list's order
+            preload_paths = [path for paths in duplicate_list.next_sets(count) for path in paths]
+            
+            # Queue preloading with low priority (shown images always go first)
+            if preload_paths:
+                self.image_loader.preload_images(
+                    preload_paths,
+                    self.thumbnail_size
+                )
         except Exception as e:
             # Don't let preloading errors affect the main functionality
-            print(f"Error in preload_next_sets: {e}")
+            logger.warning("Error in preload_next_sets: %s", e)
     def on_skip_clicked(self):
         """Handle skip button click by emitting the skip_requested signal."""
         # Emit the skip signal to notify that we want to skip this set
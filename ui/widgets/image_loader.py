@@ -2,22 +2,28 @@
 Image loader module for asynchronous image loading and caching.
 """
 import os
+import bisect
+import logging
+from collections import OrderedDict
 from typing import Dict, Callable, Optional, List, Tuple
 from pathlib import Path
 import threading
-import queue
-import time
-import gc
+import heapq
+import itertools
 
-from PySide6.QtCore import QObject, Signal, QSize, Qt
-from PIL import Image, ImageQt
+from PySide6.QtCore import QObject, Signal, Slot, QSize, Qt
+from PIL import Image
 
-from core.file_handler import MemoryMappedImage, batch_process_images
-from PySide6.QtGui import QPixmap, QImage
+from core import thumb_cache
+from core.fast_reader import prefetch
+from core.file_handler import StreamedImage, load_image_thumbnail
+from PySide6.QtGui import QPixmap, QImage, QImageReader
 
 # Import resource manager
 from core.resource_manager import get_resource_manager
 
+logger = logging.getLogger(__name__)
+
 class ImageLoadRequest:
     """Class representing an image load request with priorities and callbacks."""
     
@@ -44,17 +50,61 @@ class ImageLoadRequest:
         self.priority = priority
         self.load_full_res = load_full_res
         self.memory_efficient = memory_efficient
-        self.timestamp = time.time()
-    
-    def __lt__(self, other):
-        """Compare requests by priority."""
-        if self.priority == other.priority:
-            # If priorities are equal, older requests come first
-            return self.timestamp < other.timestamp
-        return self.priority > other.priority
+        self.key = (image_path, target_size.width(), target_size.height())  # Same key = same image
+        self.cancelled = False  # Set by ImageLoader.cancel; no callbacks are called afterwards
+        self.job = None  # Job loading the image, shared with other requests for the same image
+
+class ImageLoadJob:
+    """
+    Loading of one image at one size, shared by all requests for it.
+    
+    A request for an image that is already being loaded joins its job
+    instead of loading the image again; the job's images are delivered to
+    the callback of every request that joined it.
+    """
+    
+    def __init__(self, request: ImageLoadRequest):
+        """
+        Initialize a job for a request.
+        
+        Args:
+            request: The first request for the image
+        """
+        self.key = request.key
+        self.image_path = request.image_path
+        self.target_size = request.target_size
+        self.memory_efficient = request.memory_efficient
+        self.load_full_res = request.load_full_res
+        self.priority = request.priority  # Highest priority of the requests
+        self.requests = [request]
+        self.started = False  # Set by the worker thread that loads the image
+        self.cancelled = False  # Set once every request is cancelled
+        request.job = self
+    
+    def add(self, request: ImageLoadRequest):
+        """
+        Join a request to the job.
+        
+        Args:
+            request: Another request for the same image
+        """
+        self.requests.append(request)
+        self.load_full_res = self.load_full_res or request.load_full_res
+        self.priority = max(self.priority, request.priority)
+        request.job = self
+
+# Maximum number of sizes cached per image; smaller sizes are scaled down from larger ones
+MAX_SIZES_PER_IMAGE = 4
 
 class ImageCache:
-    """Thread-safe cache for loaded images."""
+    """
+    Thread-safe LRU cache for loaded images.
+    
+    Images are kept as QImage, which (unlike QPixmap) can be created and
+    scaled on the worker threads. Every size of an image is a separate
+    entry, keyed by (path, (width, height)); at most MAX_SIZES_PER_IMAGE
+    sizes are kept per image.
+    """
     
     def __init__(self, max_size: int = 50):
         """
@@ -63,139 +113,212 @@ class ImageCache:
         Args:
             max_size: Maximum number of images to keep in cache
         """
-        self.cache: Dict[str, Dict[QSize, QPixmap]] = {}
+        self.cache: OrderedDict = OrderedDict()  # (path, (width, height)) -> QImage, least recently used first
+        self.sizes: Dict[str, List[Tuple[int, int, int]]] = {}  # path -> (area, width, height) of its cached sizes, sorted
         self.max_size = max_size
         self.lock = threading.RLock()
-        self.access_times: Dict[str, float] = {}
     
-    def get(self, image_path: str, size: QSize, memory_efficient: bool = True) -> Optional[QPixmap]:
+    def get(self, image_path: str, size: QSize, memory_efficient: bool = True) -> Optional[QImage]:
         """
         Get an image from the cache if available.
         
+        If the exact size isn't cached, a larger cached size of the image is
+        scaled down (and the result cached).
+        
         Args:
             image_path: Path to the image
             size: Requested size
+            memory_efficient: Only scale down from sizes not much larger than
+                requested (less than 1.5 times the area), to avoid scaling large images
             
         Returns:
-            Cached pixmap or None if not in cache
+            Cached image or None if not in cache
         """
+        target = (size.width(), size.height())
+        
         with self.lock:
-            if image_path in self.cache:
-                # Update access time
-                self.access_times[image_path] = time.time()
-                
-                # Check if the exact size is in cache
-                if size in self.cache[image_path]:
-                    return self.cache[image_path][size]
-                
-                # For memory-efficient mode, we prefer the exact size or smaller sizes
-                if memory_efficient:
-                    # First try exact size
-                    if size in self.cache[image_path]:
-                        return self.cache[image_path][size]
-                    
-                    # Then try to find a size that's not too much larger to avoid scaling large images
-                    best_size = None
-                    best_area_ratio = float('inf')
-                    
-                    for cached_size in self.cache[image_path].keys():
-                        # Skip sizes smaller than what we need
-                        if cached_size.width() < size.width() or cached_size.height() < size.height():
-                            continue
-                            
-                        # Calculate ratio of areas (1.0 would be perfect match)
-                        target_area = size.width() * size.height()
-                        cached_area = cached_size.width() * cached_size.height()
-                        area_ratio = cached_area / target_area
-                        
-                        # If ratio is < 1.5 (not too much bigger), and better than previous best
-                        if area_ratio < 1.5 and area_ratio < best_area_ratio:
-                            best_size = cached_size
-                            best_area_ratio = area_ratio
-                    
-                    if best_size:
-                        # Scale down the better size
-                        pixmap = self.cache[image_path][best_size]
-                        scaled = pixmap.scaled(
-                            size,
-                            Qt.KeepAspectRatio,
-                            Qt.SmoothTransformation
-                        )
-                        # Cache the scaled version
-                        self.cache[image_path][size] = scaled
-                        return scaled
-                else:
-                    # Traditional approach - check if we have a larger version that can be scaled down
-                    for cached_size, pixmap in self.cache[image_path].items():
-                        if cached_size.width() >= size.width() and cached_size.height() >= size.height():
-                            # Scale down the larger version
-                            scaled = pixmap.scaled(
-                                size,
-                                Qt.KeepAspectRatio,
-                                Qt.SmoothTransformation
-                            )
-                            # Cache the scaled version
-                            self.cache[image_path][size] = scaled
-                            return scaled
+            # Check if the exact size is in cache
+            key = (image_path, target)
+            image = self.cache.get(key)
+            if image is not None:
+                self.cache.move_to_end(key)
+                return image
             
-            return None
+            # Find the smallest cached size that covers the requested size. A size
+            # covering it has at least its area, so the search starts there (sizes
+            # are sorted by area); in memory-efficient mode it stops at sizes much
+            # bigger (1.5 times the area or more), to avoid scaling large images.
+            sizes = self.sizes.get(image_path)
+            if not sizes:
+                return None
+            
+            target_area = target[0] * target[1]
+            area_limit = target_area * 1.5 if memory_efficient and target_area > 0 else float('inf')
+            best_size = None
+            for index in range(bisect.bisect_left(sizes, (target_area,)), len(sizes)):
+                area, width, height = sizes[index]
+                if area >= area_limit:
+                    break
+                if width >= target[0] and height >= target[1]:
+                    best_size = (width, height)
+                    break
+            
+            if best_size is None:
+                return None
+            
+            key = (image_path, best_size)
+            image = self.cache[key]
+            self.cache.move_to_end(key)
+        
+        # Scale down the larger version (outside the lock, so other threads aren't held up)
+        scaled = image.scaled(size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        
+        # Cache the scaled version
+        self.put(image_path, size, scaled)
+        return scaled
     
-    def put(self, image_path: str, size: QSize, pixmap: QPixmap):
+    def put(self, image_path: str, size: QSize, image: QImage):
         """
-        Add an image to the cache.
+        Add an image to the cache, evicting the least recently used images beyond max_size.
+        
+        If the image now has more than MAX_SIZES_PER_IMAGE sizes cached, the
+        largest one that can be scaled down from a cached size is dropped, so
+        scaled copies from window resizes don't pile up.
         
         Args:
             image_path: Path to the image
             size: Size of the image
-            pixmap: Pixmap to cache
+            image: Image to cache
         """
+        dimensions = (size.width(), size.height())
+        key = (image_path, dimensions)
+        
         with self.lock:
-            # Check if we need to make room in the cache
-            if len(self.cache) >= self.max_size:
-                self._cleanup()
+            if key not in self.cache:
+                sizes = self.sizes.setdefault(image_path, [])
+                bisect.insort(sizes, (dimensions[0] * dimensions[1],) + dimensions)
+                
+                # Drop the second largest size (the largest is what the others are
+                # scaled from), skipping the one just added
+                if len(sizes) > MAX_SIZES_PER_IMAGE:
+                    for _, width, height in reversed(sizes[:-1]):
+                        if (width, height) != dimensions:
+                            self._remove(image_path, (width, height))
+                            break
             
-            # Add to cache
-            if image_path not in self.cache:
-                self.cache[image_path] = {}
-                self.access_times[image_path] = time.time()
+            self.cache[key] = image
+            self.cache.move_to_end(key)
             
-            self.cache[image_path][size] = pixmap
-            self.access_times[image_path] = time.time()
+            # Make room in the cache
+            while len(self.cache) > self.max_size:
+                self._evict_oldest()
     
-    def _cleanup(self):
-        """Remove least recently accessed images to make room."""
-        if not self.access_times:
-            return
-            
-        # Sort by access time (oldest first)
-        sorted_paths = sorted(
-            self.access_times.items(),
-            key=lambda x: x[1]
-        )
+    def resize(self, max_size: int):
+        """
+        Change the maximum number of images, evicting the least recently used ones right away.
         
-        # Remove oldest entries until we're under the limit
-        for path, _ in sorted_paths:
-            if len(self.cache) < self.max_size:
-                break
-                
-            if path in self.cache:
-                del self.cache[path]
-                del self.access_times[path]
+        Args:
+            max_size: New maximum number of images to keep in cache
+        """
+        with self.lock:
+            self.max_size = max_size
+            while len(self.cache) > self.max_size:
+                self._evict_oldest()
+    
+    def _evict_oldest(self):
+        """Remove the least recently used image (called with the lock held)."""
+        (path, dimensions), _ = self.cache.popitem(last=False)
+        self._forget_size(path, dimensions)
+    
+    def _remove(self, path: str, dimensions: Tuple[int, int]):
+        """Remove one size of an image (called with the lock held)."""
+        del self.cache[(path, dimensions)]
+        self._forget_size(path, dimensions)
+    
+    def _forget_size(self, path: str, dimensions: Tuple[int, int]):
+        """Drop a size from the sizes cached for an image (called with the lock held)."""
+        sizes = self.sizes[path]
+        sizes.remove((dimensions[0] * dimensions[1],) + dimensions)
+        if not sizes:
+            del self.sizes[path]
+
+def _to_qimage(pil_img: Image.Image) -> QImage:
+    """
+    Convert a PIL image to a QImage that owns its pixel data.
+    
+    The result is in the format QPixmap uses natively, so converting it to
+    a pixmap on the GUI thread doesn't have to touch the pixels again.
+    
+    Args:
+        pil_img: PIL image to convert
+        
+    Returns:
+        QImage copy of the image
+    """
+    # Only RGB and RGBA are wrapped directly, so convert the other modes (e.g. CMYK)
+    if pil_img.mode not in ("RGB", "RGBA"):
+        pil_img = pil_img.convert("RGBA")
+    
+    # Wrap PIL's bytes in their own channel order, then let Qt convert them to
+    # the native format; the conversion also copies the pixels out of the
+    # bytes object, so the image stays valid after being queued to the GUI thread
+    width, height = pil_img.size
+    if pil_img.mode == "RGB":
+        image = QImage(pil_img.tobytes(), width, height, 3 * width, QImage.Format_RGB888)
+        return image.convertToFormat(QImage.Format_RGB32)
+    
+    image = QImage(pil_img.tobytes(), width, height, 4 * width, QImage.Format_RGBA8888)
+    return image.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+
+def _decode_scaled(path: str, size: Tuple[int, int]) -> Image.Image:
+    """
+    Decode an image scaled down to fit in a size.
+    
+    JPEGs are drafted to the size, so libjpeg decodes them at the smallest
+    reduced scale (1/2, 1/4 or 1/8) that still covers it. thumbnail() alone
+    only drafts down to twice the size, which for most photos means a full
+    decode; drafting to the size itself still decodes at least as many
+    pixels as the result needs.
+    
+    Args:
+        path: Path to the image
+        size: Size the image must fit in (width, height)
+        
+    Returns:
+        Decoded PIL image
+    """
+    with Image.open(path) as pil_img:
+        pil_img.draft('RGB', size)  # No-op for formats other than JPEG
+        pil_img.thumbnail(size)
+        pil_img.load()
+        return pil_img
+
+# Memory usage thresholds (percent, highest first) above which the image
+# cache is shrunk, with the number of images kept above each
+CACHE_PRESSURE_LEVELS = ((80, 25), (60, 50))
+
+# Memory usage has to drop this many points below a threshold before the cache grows again
+CACHE_PRESSURE_DEADBAND = 5
 
 class ImageLoaderSignals(QObject):
     """Signals for the ImageLoader class."""
-    image_loaded = Signal(str, QPixmap, bool)  # path, pixmap, is_thumbnail
+    image_loaded = Signal(object, QImage, bool)  # job, image, is_thumbnail
 
 class ImageLoader(QObject):
     """
     Thread-safe asynchronous image loader with prioritization and caching.
+    
+    Images are decoded and scaled as QImage on the worker threads. Only the
+    conversion to QPixmap (which must happen on the GUI thread) and the
+    callbacks run on the thread the loader was created on.
     """
     
     def __init__(self, parent=None):
         super().__init__(parent)
         
-        # Create signals object
+        # Create signals object; loaded images are handed to the GUI thread through it
         self.signals = ImageLoaderSignals()
+        self.signals.image_loaded.connect(self._deliver)
         
         # Get resource manager recommendations
         self.resource_manager = get_resource_manager()
@@ -204,14 +327,25 @@ class ImageLoader(QObject):
         # Create image cache with adaptive size
         cache_size = max(50, min(200, resources["batch_size"]))
         self.cache = ImageCache(max_size=cache_size)
+        self.cache_pressure_level = len(CACHE_PRESSURE_LEVELS)  # Index into CACHE_PRESSURE_LEVELS (past the end: no pressure)
         
-        # Create request queue with priority
-        self.queue = queue.PriorityQueue()
+        # Track the jobs of active requests, so an image is only loaded once (request key: job)
+        self.active_requests = {}
+        self.active_requests_lock = threading.Lock()
+        
+        # Create request queue with priority: a heap guarded by the same lock as the
+        # active requests (which are updated together with it), so queueing a request
+        # takes one lock instead of PriorityQueue's lock and conditions. Entries are
+        # (-priority, sequence, request) tuples, compared in C: higher priorities
+        # first, and requests of the same priority in the order they were queued.
+        self.queue: List[Tuple[int, int, ImageLoadRequest]] = []
+        self.queue_sequence = itertools.count()
+        self.queue_ready = threading.Condition(self.active_requests_lock)  # Notified when a request is queued
         
         # Create worker threads based on recommendations
         self.worker_threads = []
         self.worker_count = max(2, min(4, resources["thread_count"] // 2))
-        self.running = True
+        self.stop_event = threading.Event()  # Set to stop the worker threads
         
         # Start worker threads
         for _ in range(self.worker_count):
@@ -221,17 +355,14 @@ class ImageLoader(QObject):
         
         # Register for resource updates
         self.resource_manager.register_monitoring_callback(self._on_resource_update)
-        
-        # Track active requests to avoid duplicates
-        self.active_requests = set()
-        self.active_requests_lock = threading.Lock()
     
     def load_image(self, 
                   image_path: str, 
                   target_size: QSize,
                   callback: Callable[[str, QPixmap, bool], None],
                   priority: int = 0,
-                  load_full_res: bool = True):
+                  load_full_res: bool = True,
+                  file_size: Optional[int] = None):
         """
         Queue an image to be loaded asynchronously.
         
@@ -241,22 +372,31 @@ class ImageLoader(QObject):
             callback: Function to call when image is loaded
             priority: Request priority (higher = more important)
             load_full_res: Whether to load full resolution after thumbnail
+            file_size: Size of the file in bytes, if the caller already knows it
+                (the file is stat'ed otherwise)
+            
+        Returns:
+            The queued request (to pass to cancel), or None if the image was
+            served from the cache or the file doesn't exist
         """
+        # A single stat tells both whether the file exists and its size
+        if file_size is None:
+            try:
+                file_size = os.stat(image_path).st_size
+            except OSError:
+                logger.warning("Image file not found: %s", image_path)
+                return None
+        
         # Detect large files for memory-efficient loading
-        is_large_file = False
-        try:
-            file_size = os.path.getsize(image_path)
-            # Files over 4MB are considered large (can be customized)
-            is_large_file = file_size > 4 * 1024 * 1024
-        except:
-            pass
+        # Files over 4MB are considered large (can be customized)
+        is_large_file = file_size > 4 * 1024 * 1024
             
         # Check if already in cache
         cached = self.cache.get(image_path, target_size, memory_efficient=is_large_file)
         if cached:
-            # Call callback immediately with cached image
-            callback(image_path, cached, False)
-            return
+            # Call callback immediately with cached image (we're on the GUI thread here)
+            callback(image_path, QPixmap.fromImage(cached), False)
+            return None
             
         # Create request
         request = ImageLoadRequest(
@@ -268,50 +408,96 @@ class ImageLoader(QObject):
             load_full_res=load_full_res
         )
         
-        # Add to queue
+        # Add to queue, or join the job already loading the image
         with self.active_requests_lock:
-            request_key = (image_path, target_size.width(), target_size.height())
-            if request_key not in self.active_requests:
-                self.active_requests.add(request_key)
-                self.queue.put(request)
+            job = self.active_requests.get(request.key)
+            if job is None:
+                self.active_requests[request.key] = ImageLoadJob(request)
+                self._queue_request(request)
+            else:
+                # A more urgent request (e.g. for a shown image joining a preload)
+                # is queued as well, so the job is picked up at its priority
+                more_urgent = request.priority > job.priority
+                job.add(request)
+                if more_urgent and not job.started:
+                    self._queue_request(request)
+        
+        return request
+    
+    def cancel(self, request: ImageLoadRequest):
+        """
+        Cancel a request returned by load_image (call on the GUI thread).
+        
+        Its callback is not called anymore. Once every request for the image
+        is cancelled, a queued image is skipped and one being loaded stops
+        before its full resolution pass.
+        
+        Args:
+            request: The request to cancel
+        """
+        request.cancelled = True
+        
+        # Once no request wants the image anymore, stop loading it and let it be
+        # requested again right away
+        job = request.job
+        with self.active_requests_lock:
+            if all(other.cancelled for other in job.requests):
+                job.cancelled = True
+                if self.active_requests.get(job.key) is job:
+                    del self.active_requests[job.key]
     
     def preload_images(self, image_paths: List[str], thumbnail_size: QSize):
         """
         Preload a set of images with low priority.
         
+        The files that actually have to be loaded are read ahead by the
+        kernel right away, so the disk reads overlap with the decoding of
+        the images queued before them.
+        
         Args:
             image_paths: List of image paths to preload
             thumbnail_size: Size for thumbnails
         """
+        queued = []
         for path in image_paths:
             # Use a dummy callback since we're just preloading
-            self.load_image(
+            request = self.load_image(
                 image_path=path,
                 target_size=thumbnail_size,
                 callback=lambda *args: None,
                 priority=-10,  # Low priority
                 load_full_res=False  # Just load thumbnails for preloading
             )
+            if request is not None:
+                queued.append(path)
+        
+        # Start readahead for the images not served from the cache
+        # (the workers are still busy with the shown images)
+        prefetch(queued)
+    
+    def _queue_request(self, request: ImageLoadRequest):
+        """Add a request to the queue and wake a worker (called with the lock held)."""
+        heapq.heappush(self.queue, (-request.priority, next(self.queue_sequence), request))
+        self.queue_ready.notify()
     
     def _worker(self):
         """Worker thread to process image loading requests."""
-        while self.running:
+        while not self.stop_event.is_set():
             try:
                 # Get next request from queue
-                request = self.queue.get(timeout=0.5)
+                with self.queue_ready:
+                    if not self.queue:
+                        # No requests, wait for one (or for the loader to shut down)
+                        self.queue_ready.wait(timeout=0.5)
+                        continue
+                    _, _, request = heapq.heappop(self.queue)
                 
                 # Process request
                 self._process_request(request)
                 
-                # Mark task as done
-                self.queue.task_done()
-                
-            except queue.Empty:
-                # No requests, just continue
-                continue
             except Exception as e:
                 # Log error and continue
-                print(f"Error in ImageLoader worker: {e}")
+                logger.exception("Error in ImageLoader worker: %s", e)
     
     def _process_request(self, request: ImageLoadRequest):
         """
@@ -320,53 +506,63 @@ class ImageLoader(QObject):
         Args:
             request: The request to process
         """
-        try:
-            path = request.image_path
-            
-            # Remove from active requests when done
-            request_key = (path, request.target_size.width(), request.target_size.height())
-            
-            # Check if file exists
-            if not os.path.exists(path):
-                print(f"Image file not found: {path}")
-                with self.active_requests_lock:
-                    if request_key in self.active_requests:
-                        self.active_requests.remove(request_key)
+        job = request.job
+        
+        # Only one request of a job loads the image; the others are skipped, as
+        # are jobs cancelled while they were queued
+        with self.active_requests_lock:
+            if job.started or job.cancelled:
                 return
+            job.started = True
+        
+        try:
+            # The file was checked when it was requested; if it disappeared since,
+            # loading it fails below like loading any other unreadable file
+            path = job.image_path
             
             # First check if it's already in cache
-            cached = self.cache.get(path, request.target_size)
+            cached = self.cache.get(path, job.target_size)
             if cached:
                 # Call callback with cached image
-                request.callback(path, cached, False)
-                with self.active_requests_lock:
-                    if request_key in self.active_requests:
-                        self.active_requests.remove(request_key)
+                self._notify(job, cached, False)
                 return
             
-            # Load thumbnail first
-            thumbnail_size = request.target_size
-            thumbnail = self._load_and_scale_memory_efficient(path, thumbnail_size) if request.memory_efficient else self._load_and_scale(path, thumbnail_size)
+            # Size of the full resolution pass
+            if job.memory_efficient:
+                # For large files, we don't load full resolution at original size
+                # Instead, load at a reasonable maximum size that's still larger than thumbnail
+                full_res_size = QSize(1200, 1200)  # Reasonable max size for display
+            else:
+                # Only the image scaled to the requested size is shown, so decode
+                # straight to that size instead of decoding the original size first
+                full_res_size = job.target_size
+            
+            # Load thumbnail first (from the on-disk thumbnail cache if it was shown before);
+            # if it has to be generated, the image is decoded once for both passes
+            thumbnail_size = job.target_size
+            thumbnail, decoded = self._load_thumbnail(
+                path, thumbnail_size, full_res_size if job.load_full_res else None)
             
             if thumbnail:
                 # Cache the thumbnail
                 self.cache.put(path, thumbnail_size, thumbnail)
                 
                 # Call callback with thumbnail
-                request.callback(path, thumbnail, True)
+                self._notify(job, thumbnail, True)
                 
-                # If full resolution is requested, load it next
-                if request.load_full_res:
+                # If full resolution is requested, load it next (unless cancelled meanwhile)
+                if job.load_full_res and not job.cancelled:
                     # Load full image in background (using memory efficient approach if needed)
-                    if request.memory_efficient:
-                        # For large files, we don't load full resolution at original size
-                        # Instead, load at a reasonable maximum size that's still larger than thumbnail
-                        max_full_res = QSize(1200, 1200)  # Reasonable max size for display
-                        full_image = self._load_and_scale_memory_efficient(path, max_full_res)
+                    if decoded is not None:
+                        # Already decoded at this size to generate the thumbnail
+                        full_image = _to_qimage(decoded)
+                    elif job.memory_efficient:
+                        full_image = self._load_and_scale_memory_efficient(path, full_res_size)
                     else:
-                        # For smaller files, we can load at original size
-                        original_size = QSize(0, 0)  # Original size
-                        full_image = self._load_and_scale(path, original_size)
+                        full_image = self._load_and_scale(path, full_res_size)
+                    
+                    # The decoded image is no longer needed
+                    del decoded
                     
                     if full_image:
                         # Cache the full image
@@ -374,37 +570,96 @@ class ImageLoader(QObject):
                         self.cache.put(path, actual_size, full_image)
                         
                         # Create properly scaled version if needed
-                        if actual_size.width() > request.target_size.width() or actual_size.height() > request.target_size.height():
+                        if actual_size.width() > job.target_size.width() or actual_size.height() > job.target_size.height():
                             scaled = full_image.scaled(
-                                request.target_size,
+                                job.target_size,
                                 Qt.KeepAspectRatio,
                                 Qt.SmoothTransformation
                             )
                             # Cache the scaled version
-                            self.cache.put(path, request.target_size, scaled)
+                            self.cache.put(path, job.target_size, scaled)
                             # Call callback with properly scaled image
-                            request.callback(path, scaled, False)
+                            self._notify(job, scaled, False)
                         else:
                             # Full image is already small enough
-                            request.callback(path, full_image, False)
-                            
-                        # Force garbage collection after loading large images
-                        if request.memory_efficient:
-                            gc.collect()
+                            self.cache.put(path, job.target_size, full_image)
+                            self._notify(job, full_image, False)
             
+        except Exception as e:
+            logger.warning("Error loading image %s: %s", job.image_path, e)
+        finally:
             # Remove from active requests
-            with self.active_requests_lock:
-                if request_key in self.active_requests:
-                    self.active_requests.remove(request_key)
-                    
+            self._finish_job(job)
+    
+    def _finish_job(self, job: ImageLoadJob):
+        """Remove a job from the active requests (unless a newer job took its place)."""
+        with self.active_requests_lock:
+            if self.active_requests.get(job.key) is job:
+                del self.active_requests[job.key]
+    
+    def _notify(self, job: ImageLoadJob, image: QImage, is_thumbnail: bool):
+        """Hand a loaded image to the GUI thread, which calls the callbacks of the job's requests."""
+        if not job.cancelled:
+            self.signals.image_loaded.emit(job, image, is_thumbnail)
+    
+    @Slot(object, QImage, bool)
+    def _deliver(self, job: ImageLoadJob, image: QImage, is_thumbnail: bool):
+        """Convert a loaded image to a pixmap and pass it to the callbacks (on the GUI thread)."""
+        pixmap = None
+        for request in list(job.requests):
+            # The request may have been cancelled while the image was on its way
+            if request.cancelled:
+                continue
+            
+            if pixmap is None:
+                pixmap = QPixmap.fromImage(image)
+            
+            try:
+                request.callback(request.image_path, pixmap, is_thumbnail)
+            except Exception as e:
+                logger.exception("Error in image loaded callback for %s: %s", request.image_path, e)
+    
+    def _load_thumbnail(self, path: str, target_size: QSize,
+                        decode_size: Optional[QSize] = None) -> Tuple[Optional[QImage], Optional[Image.Image]]:
+        """
+        Load a thumbnail through the persistent thumbnail cache.
+        Thumbnails generated in an earlier session are read back from disk
+        instead of decoding the image again.
+        
+        Args:
+            path: Path to the image
+            target_size: Size the thumbnail must fit in
+            decode_size: Size the image is loaded at next (by the full resolution
+                pass), if any; a thumbnail that has to be generated is then made
+                from the image decoded at this size, which is returned for reuse
+            
+        Returns:
+            Tuple of (thumbnail image or None if loading failed, image decoded
+            at decode_size or None if it wasn't decoded)
+        """
+        size = (target_size.width(), target_size.height())
+        decoded = None
+        
+        def make_thumbnail(file_path, thumbnail_size):
+            nonlocal decoded
+            decoded = _decode_scaled(file_path, (decode_size.width(), decode_size.height()))
+            thumbnail = decoded.copy()
+            thumbnail.thumbnail(thumbnail_size)
+            return thumbnail
+        
+        try:
+            if decode_size is None:
+                thumbnail = load_image_thumbnail(path, size)
+            else:
+                thumbnail = thumb_cache.get_or_make(path, size, make_thumbnail)
+            return _to_qimage(thumbnail), decoded
+            
         except Exception as e:
-            print(f"Error loading image {request.image_path}: {e}")
-            # Remove from active requests on error
-            with self.active_requests_lock:
-                if request_key in self.active_requests:
-                    self.active_requests.remove(request_key)
+            logger.debug("Error in _load_thumbnail for %s: %s", path, e)
+            # Fall back to loading the image with Qt
+            return self._load_and_scale(path, target_size), None
     
-    def _load_and_scale(self, path: str, target_size: QSize) -> Optional[QPixmap]:
+    def _load_and_scale(self, path: str, target_size: QSize) -> Optional[QImage]:
         """
         Load an image and scale it to the target size.
         
@@ -413,35 +668,33 @@ class ImageLoader(QObject):
             target_size: Target size for scaling (0,0 for original size)
             
         Returns:
-            Scaled pixmap or None if loading failed
+            Scaled image or None if loading failed
         """
         try:
+            reader = QImageReader(path)
+            
+            # If a target size is given, decode straight to the scaled size; JPEGs are
+            # then decoded at a reduced scale instead of at their full resolution
+            if not target_size.isEmpty():
+                original_size = reader.size()
+                if original_size.width() > target_size.width() or original_size.height() > target_size.height():
+                    reader.setScaledSize(original_size.scaled(target_size, Qt.KeepAspectRatio))
+            
             # Load image
-            pixmap = QPixmap(path)
+            image = reader.read()
             
-            if pixmap.isNull():
+            if image.isNull():
                 return None
-                
-            # If target size is not specified or is (0,0), return original
-            if target_size.isEmpty() or (target_size.width() == 0 and target_size.height() == 0):
-                return pixmap
-                
-            # Scale the image
-            scaled = pixmap.scaled(
-                target_size,
-                Qt.KeepAspectRatio,
-                Qt.SmoothTransformation
-            )
             
-            return scaled
+            return image
             
         except Exception as e:
-            print(f"Error in _load_and_scale for {path}: {e}")
+            logger.warning("Error in _load_and_scale for %s: %s", path, e)
             return None
     
-    def _load_and_scale_memory_efficient(self, path: str, target_size: QSize) -> Optional[QPixmap]:
+    def _load_and_scale_memory_efficient(self, path: str, target_size: QSize) -> Optional[QImage]:
         """
-        Load an image and scale it to the target size using memory-mapped approach.
+        Load an image and scale it to the target size, decoding straight from the file.
         Better for large images to minimize memory usage.
         
         Args:
@@ -449,11 +702,15 @@ class ImageLoader(QObject):
             target_size: Target size for scaling (0,0 for original size)
             
         Returns:
-            Scaled pixmap or None if loading failed
+            Scaled image or None if loading failed
         """
         try:
-            # Create memory-mapped image
-            with MemoryMappedImage(path) as img:
+            # JPEGs can be decoded straight at a reduced scale by libjpeg
+            if not target_size.isEmpty() and os.path.splitext(path)[1].lower() in ('.jpg', '.jpeg'):
+                return _to_qimage(_decode_scaled(path, (target_size.width(), target_size.height())))
+            
+            # Decode from the open file (no copy of the file contents)
+            with StreamedImage(path) as img:
                 # If target size is 0,0, use original size
                 if target_size.isEmpty() or (target_size.width() == 0 and target_size.height() == 0):
                     pil_img = img.get_pil_image()
@@ -461,34 +718,65 @@ class ImageLoader(QObject):
                     # Get a thumbnail of the right size
                     pil_img = img.get_thumbnail((target_size.width(), target_size.height()))
                 
-                # Convert PIL image to QPixmap
-                qimage = ImageQt.ImageQt(pil_img)
-                pixmap = QPixmap.fromImage(qimage)
-                
-                return pixmap
+                # Convert PIL image to QImage
+                return _to_qimage(pil_img)
                 
         except Exception as e:
-            print(f"Error in _load_and_scale_memory_efficient for {path}: {e}")
-            # Fall back to standard loading if memory mapping fails
+            logger.debug("Error in _load_and_scale_memory_efficient for %s: %s", path, e)
+            # Fall back to standard loading if decoding from the file fails
             return self._load_and_scale(path, target_size)
     
     def _on_resource_update(self, cpu_percent, memory_percent):
-        """Handle system resource updates."""
+        """
+        Handle system resource updates.
+        
+        The cache is only resized when the memory pressure level changes,
+        not on every update.
+        """
+        level = self._cache_pressure_level(memory_percent)
+        if level == self.cache_pressure_level:
+            return
+        self.cache_pressure_level = level
+        
         # Adjust cache size based on memory pressure
-        if memory_percent > 80:
-            # Under high memory pressure, reduce cache size
-            self.cache.max_size = 25
-        elif memory_percent > 60:
-            # Under moderate memory pressure
-            self.cache.max_size = 50
+        if level < len(CACHE_PRESSURE_LEVELS):
+            cache_size = CACHE_PRESSURE_LEVELS[level][1]
         else:
             # Normal memory pressure
             resources = self.resource_manager.get_optimal_resources("image_loading")
-            self.cache.max_size = max(50, min(200, resources["batch_size"]))
+            cache_size = max(50, min(200, resources["batch_size"]))
+        
+        # Shrinking evicts right away, so the memory is freed under pressure
+        self.cache.resize(cache_size)
+    
+    def _cache_pressure_level(self, memory_percent: float) -> int:
+        """
+        Get the memory pressure level for a memory usage.
+        
+        A level is entered above its threshold, but only left once usage
+        drops CACHE_PRESSURE_DEADBAND points below it, so usage hovering
+        around a threshold doesn't resize the cache back and forth.
+        
+        Args:
+            memory_percent: Memory usage in percent
+            
+        Returns:
+            Index into CACHE_PRESSURE_LEVELS, or its length if memory isn't under pressure
+        """
+        for level, (threshold, _) in enumerate(CACHE_PRESSURE_LEVELS):
+            if level >= self.cache_pressure_level:
+                threshold -= CACHE_PRESSURE_DEADBAND
+            if memory_percent > threshold:
+                return level
+        return len(CACHE_PRESSURE_LEVELS)
     
     def shutdown(self):
         """Shut down the worker threads."""
-        self.running = False
+        self.stop_event.set()
+        
+        # Wake the idle workers so they notice right away
+        with self.queue_ready:
+            self.queue_ready.notify_all()
         
         # Unregister from resource manager
         self.resource_manager.unregister_monitoring_callback(self._on_resource_update)
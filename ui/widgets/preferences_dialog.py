@@ -3,17 +3,24 @@ Preferences dialog for configuring auto-select pattern preferences.
 """
 import json
 import os
-from typing import Dict, List, Tuple
+import re
+import tempfile
+import threading
+from typing import Dict, List, Optional, Tuple
 
 from PySide6.QtCore import Qt, Signal
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, 
     QPushButton, QSlider, QListWidget, QListWidgetItem, 
-    QWidget, QMessageBox, QGridLayout, QFrame
+    QMessageBox, QGridLayout, QFrame
 )
 
 class PatternPreference:
     """Class representing a pattern preference for auto-select."""
+    
+    # Fixed attributes, so instances carry no per-object __dict__
+    __slots__ = ("pattern", "weight")
+    
     def __init__(self, pattern: str, weight: int = 20):
         self.pattern = pattern
         self.weight = weight  # 10-30
@@ -23,43 +30,77 @@ class PreferencesManager:
     
     CONFIG_PATH = os.path.expanduser("~/.imagecompare_prefs.json")
     
+    # Patterns used when there is no preferences file (or it can't be read): (pattern, weight)
+    DEFAULT_PATTERNS = (
+        ("_EN", 40),  # Increase weight and match exact format in filenames
+        ("EN", 35),   # Also include without underscore
+        ("HD", 25),
+        ("4K", 28),
+    )
+    
+    # Last parse of the config file, shared by all instances (a manager is created
+    # per auto-select run): ((path, mtime_ns, size), [(pattern, weight), ...])
+    _parsed_file = None
+    _parsed_file_lock = threading.Lock()
+    
     def __init__(self):
-        self.patterns = []  # List of PatternPreference objects
-        self.load_preferences()
+        # The file is read on first use, not when the manager is created
+        self.patterns: Dict[str, PatternPreference] = {}  # pattern -> preference, in the order added
+        self.loaded = False
+        self.compiled_matcher = None  # Built by get_compiled_matcher, reset when the patterns change
     
     def add_pattern(self, pattern: str, weight: int = 20) -> PatternPreference:
         """Add a new pattern preference."""
+        self._ensure_loaded()
+        
         # Don't add duplicate patterns
-        for pref in self.patterns:
-            if pref.pattern == pattern:
-                pref.weight = weight
-                return pref
+        pref = self.patterns.get(pattern)
+        if pref is not None:
+            pref.weight = weight
+            return pref
                 
         pref = PatternPreference(pattern, weight)
-        self.patterns.append(pref)
+        self.patterns[pattern] = pref
+        self.compiled_matcher = None
         return pref
     
     def remove_pattern(self, pattern: str) -> bool:
         """Remove a pattern preference."""
-        for i, pref in enumerate(self.patterns):
-            if pref.pattern == pattern:
-                self.patterns.pop(i)
-                return True
-        return False
+        self._ensure_loaded()
+        self.compiled_matcher = None
+        return self.patterns.pop(pattern, None) is not None
     
     def get_patterns(self) -> List[PatternPreference]:
         """Get all pattern preferences."""
-        return self.patterns
+        self._ensure_loaded()
+        return list(self.patterns.values())
+    
+    def get_compiled_matcher(self) -> Optional[re.Pattern]:
+        """
+        Get a regular expression matching any of the patterns.
+        
+        One search tells whether a file name contains any pattern at all, so
+        names without any can skip the per-pattern checks. Patterns can
+        overlap (like "_EN" and "EN"), so the individual matches still have to
+        be found per pattern.
+        
+        Returns:
+            Compiled expression, or None if there are no patterns
+        """
+        self._ensure_loaded()
+        if self.compiled_matcher is None and self.patterns:
+            self.compiled_matcher = re.compile("|".join(map(re.escape, self.patterns)))
+        return self.compiled_matcher
     
     def save_preferences(self):
         """Save preferences to file."""
+        self._ensure_loaded()
         data = {
-            "patterns": [{"pattern": p.pattern, "weight": p.weight} for p in self.patterns]
+            "patterns": [{"pattern": p.pattern, "weight": p.weight} for p in self.patterns.values()]
         }
         
         try:
-            with open(self.CONFIG_PATH, 'w') as f:
-                json.dump(data, f, indent=2)
+            self._write(data)
             return True
         except Exception as e:
             print(f"Error saving preferences: {str(e)}")
@@ -67,55 +108,81 @@ class PreferencesManager:
     
     def load_preferences(self):
         """Load preferences from file."""
+        self.loaded = True
+        self.compiled_matcher = None
         if not os.path.exists(self.CONFIG_PATH):
             # Create default preferences if file doesn't exist
-            self.patterns = [
-                PatternPreference("_EN", 40),  # Increase weight and match exact format in filenames
-                PatternPreference("EN", 35),   # Also include without underscore
-                PatternPreference("HD", 25),
-                PatternPreference("4K", 28)
-            ]
+            self.patterns = self._default_patterns()
             self.save_preferences()
             return
         
         try:
-            with open(self.CONFIG_PATH, 'r') as f:
-                data = json.load(f)
+            entries = self._read_entries()
                 
-            self.patterns = []
-            for p in data.get("patterns", []):
-                self.add_pattern(p.get("pattern", ""), p.get("weight", 20))
+            self.patterns = {}
+            for pattern, weight in entries:
+                self.add_pattern(pattern, weight)
         except Exception as e:
             print(f"Error loading preferences: {str(e)}")
             # Use defaults if loading fails
-            self.patterns = [
-                PatternPreference("_EN", 40),  # Increase weight and match exact format in filenames
-                PatternPreference("EN", 35),   # Also include without underscore
-                PatternPreference("HD", 25),
-                PatternPreference("4K", 28)
-            ]
-
-class PatternItemWidget(QWidget):
-    """Custom widget for displaying a pattern preference in the list."""
+            self.patterns = self._default_patterns()
     
-    def __init__(self, pattern: str, weight: int, parent=None):
-        super().__init__(parent)
-        
-        # Layout
-        layout = QHBoxLayout(self)
-        layout.setContentsMargins(5, 5, 5, 5)
-        
-        # Pattern label
-        self.pattern_label = QLabel(pattern)
-        layout.addWidget(self.pattern_label)
-        
-        layout.addStretch()
+    def _default_patterns(self) -> Dict[str, PatternPreference]:
+        """Build fresh preferences for the default patterns."""
+        return {pattern: PatternPreference(pattern, weight) for pattern, weight in self.DEFAULT_PATTERNS}
+    
+    def _ensure_loaded(self):
+        """Read the preferences on first use."""
+        if not self.loaded:
+            self.load_preferences()
+    
+    def _read_entries(self) -> List[Tuple[str, int]]:
+        """
+        Read the (pattern, weight) entries of the config file.
+        
+        The file is only parsed again once it has changed; otherwise the
+        entries of the last parse (by any manager) are returned.
+        """
+        st = os.stat(self.CONFIG_PATH)
+        signature = (self.CONFIG_PATH, st.st_mtime_ns, st.st_size)
+        
+        with PreferencesManager._parsed_file_lock:
+            parsed = PreferencesManager._parsed_file
+        if parsed is not None and parsed[0] == signature:
+            return parsed[1]
+        
+        with open(self.CONFIG_PATH, 'r') as f:
+            data = json.load(f)
+        entries = [(p.get("pattern", ""), p.get("weight", 20)) for p in data.get("patterns", [])]
+        
+        with PreferencesManager._parsed_file_lock:
+            PreferencesManager._parsed_file = (signature, entries)
+        return entries
+    
+    def _write(self, data: dict):
+        """
+        Write the preferences to disk atomically.
         
-        # Weight label
-        self.weight_label = QLabel(f"Weight: {weight}")
-        layout.addWidget(self.weight_label)
+        The whole file is serialized up front and written in one go to a
+        temporary file that then replaces the config file, so a failed or
+        concurrent save never leaves a truncated file behind.
+        """
+        payload = json.dumps(data, indent=2).encode()
         
-        self.setLayout(layout)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.CONFIG_PATH), suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, self.CONFIG_PATH)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+        
+        # The saved entries are what the next manager would parse from the file
+        st = os.stat(self.CONFIG_PATH)
+        entries = [(p["pattern"], p["weight"]) for p in data["patterns"]]
+        with PreferencesManager._parsed_file_lock:
+            PreferencesManager._parsed_file = ((self.CONFIG_PATH, st.st_mtime_ns, st.st_size), entries)
 
 class PreferencesDialog(QDialog):
     """Dialog for configuring pattern preferences for auto-select."""
@@ -126,6 +193,7 @@ class PreferencesDialog(QDialog):
         super().__init__(parent)
         
         self.pref_manager = PreferencesManager()
+        self.pattern_items = {}  # pattern -> its QListWidgetItem
         self.init_ui()
         self.load_patterns()
     
@@ -176,9 +244,9 @@ class PreferencesDialog(QDialog):
         self.weight_slider.setTickInterval(5)
         
         self.weight_label = QLabel("20")
-        self.weight_slider.valueChanged.connect(
-            lambda value: self.weight_label.setText(str(value))
-        )
+        # QLabel.setNum is a C++ slot taking the int directly, so slider ticks
+        # don't go through a Python callback
+        self.weight_slider.valueChanged.connect(self.weight_label.setNum, Qt.UniqueConnection)
         
         weight_layout.addWidget(self.weight_slider)
         weight_layout.addWidget(self.weight_label)
@@ -187,29 +255,30 @@ class PreferencesDialog(QDialog):
         
         main_layout.addLayout(add_layout)
         
-        # Button layout
+        # Button layout (buttons are connected with Qt.UniqueConnection, so
+        # connecting a slot again never makes it run twice per click)
         button_layout = QHBoxLayout()
         
         # Add button
         self.add_button = QPushButton("Add Pattern")
-        self.add_button.clicked.connect(self.add_pattern)
+        self.add_button.clicked.connect(self.add_pattern, Qt.UniqueConnection)
         button_layout.addWidget(self.add_button)
         
         # Remove button
         self.remove_button = QPushButton("Remove Selected")
-        self.remove_button.clicked.connect(self.remove_pattern)
+        self.remove_button.clicked.connect(self.remove_pattern, Qt.UniqueConnection)
         button_layout.addWidget(self.remove_button)
         
         button_layout.addStretch()
         
         # Save button
         self.save_button = QPushButton("Save")
-        self.save_button.clicked.connect(self.save_preferences)
+        self.save_button.clicked.connect(self.save_preferences, Qt.UniqueConnection)
         button_layout.addWidget(self.save_button)
         
         # Cancel button
         self.cancel_button = QPushButton("Cancel")
-        self.cancel_button.clicked.connect(self.reject)
+        self.cancel_button.clicked.connect(self.reject, Qt.UniqueConnection)
         button_layout.addWidget(self.cancel_button)
         
         main_layout.addLayout(button_layout)
@@ -219,18 +288,39 @@ class PreferencesDialog(QDialog):
     
     def load_patterns(self):
         """Load patterns from the manager into the list widget."""
-        self.patterns_list.clear()
-        
-        for pref in self.pref_manager.get_patterns():
-            item = QListWidgetItem()
-            widget = PatternItemWidget(pref.pattern, pref.weight)
-            
-            # Set size for the item
-            item.setSizeHint(widget.sizeHint())
+        # Repaint once after all rows are added, not per row
+        self.patterns_list.setUpdatesEnabled(False)
+        try:
+            self.patterns_list.clear()
+            self.pattern_items = {}
             
-            # Add to list
-            self.patterns_list.addItem(item)
-            self.patterns_list.setItemWidget(item, widget)
+            for pref in self.pref_manager.get_patterns():
+                self._append_item(pref)
+        finally:
+            self.patterns_list.setUpdatesEnabled(True)
+    
+    def _append_item(self, pref: PatternPreference):
+        """Add the row for a pattern to the end of the list widget."""
+        # A plain text item per pattern (an item widget per row would cost a
+        # widget, a layout and two labels each); the pattern itself is kept
+        # in the item's data
+        item = QListWidgetItem(self._item_text(pref))
+        item.setData(Qt.UserRole, pref.pattern)
+        
+        # Add to list
+        self.patterns_list.addItem(item)
+        self.pattern_items[pref.pattern] = item
+    
+    def _remove_item(self, pattern: str):
+        """Remove the row for a pattern from the list widget."""
+        item = self.pattern_items.pop(pattern, None)
+        if item is not None:
+            self.patterns_list.takeItem(self.patterns_list.row(item))
+    
+    @staticmethod
+    def _item_text(pref: PatternPreference) -> str:
+        """Get the text shown in the row for a pattern."""
+        return f"{pref.pattern}  \u2014  Weight: {pref.weight}"
     
     def add_pattern(self):
         """Add a new pattern preference."""
@@ -243,13 +333,17 @@ class PreferencesDialog(QDialog):
         weight = self.weight_slider.value()
         
         # Add to manager
-        self.pref_manager.add_pattern(pattern, weight)
+        pref = self.pref_manager.add_pattern(pattern, weight)
         
         # Clear input
         self.pattern_input.setText("")
         
-        # Reload the list
-        self.load_patterns()
+        # Update the pattern's row in place (an existing pattern only gets a new weight)
+        item = self.pattern_items.get(pref.pattern)
+        if item is not None:
+            item.setText(self._item_text(pref))
+        else:
+            self._append_item(pref)
     
     def remove_pattern(self):
         """Remove the selected pattern preference."""
@@ -259,14 +353,13 @@ class PreferencesDialog(QDialog):
             QMessageBox.warning(self, "Selection Error", "Please select a pattern to remove.")
             return
         
-        widget = self.patterns_list.itemWidget(current_item)
-        pattern = widget.pattern_label.text()
+        pattern = current_item.data(Qt.UserRole)
         
         # Remove from manager
         self.pref_manager.remove_pattern(pattern)
         
-        # Reload the list
-        self.load_patterns()
+        # Remove just the pattern's row
+        self._remove_item(pattern)
     
     def save_preferences(self):
         """Save preferences and close dialog."""
@@ -1,7 +1,7 @@
 """
 Progress display widget for showing task progress and allowing cancellation.
 """
-from PySide6.QtCore import Slot, Signal
+from PySide6.QtCore import Qt, Slot, Signal
 from PySide6.QtWidgets import (
     QWidget, QProgressBar, QLabel, QVBoxLayout,
     QPushButton, QHBoxLayout
@@ -18,6 +18,12 @@ class ProgressDisplay(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         
+        # What the widgets currently show, so repeated updates with the same
+        # values (sent for every processed item) don't touch the widgets at all
+        self.shown_progress = (0, 100)  # (value, maximum)
+        self.shown_status = "Ready"
+        self.shown_detail = ""
+        
         # Initialize UI components
         self.init_ui()
         
@@ -44,7 +50,8 @@ class ProgressDisplay(QWidget):
         # Cancel button
         self.cancel_button = QPushButton("Cancel")
         self.cancel_button.setEnabled(False)  # Disabled by default
-        self.cancel_button.clicked.connect(self.on_cancel_clicked)
+        # Unique, so a repeated connect can't emit cancelled twice per click
+        self.cancel_button.clicked.connect(self.on_cancel_clicked, Qt.UniqueConnection)
         control_layout.addWidget(self.cancel_button, 1)
         
         # Add control layout to main layout
@@ -57,7 +64,6 @@ class ProgressDisplay(QWidget):
         # Set layout
         self.setLayout(main_layout)
     
-    @Slot(int, int)    
     @Slot(int)
     def update_progress(self, value, maximum=None):
         """
@@ -67,10 +73,16 @@ class ProgressDisplay(QWidget):
             value: Current progress value
             maximum: Optional new maximum value
         """
-        if maximum is not None:
+        if maximum is None:
+            maximum = self.shown_progress[1]
+        if (value, maximum) == self.shown_progress:
+            return
+        
+        if maximum != self.shown_progress[1]:
             self.progress_bar.setMaximum(maximum)
         
         self.progress_bar.setValue(value)
+        self.shown_progress = (value, maximum)
     
     @Slot(str)
     def update_status(self, text):
@@ -80,7 +92,11 @@ class ProgressDisplay(QWidget):
         Args:
             text: New status text
         """
+        if text == self.shown_status:
+            return
+        
         self.status_label.setText(text)
+        self.shown_status = text
     
     @Slot(str)
     def update_detail(self, text):
@@ -90,14 +106,18 @@ class ProgressDisplay(QWidget):
         Args:
             text: New detail text
         """
+        if text == self.shown_detail:
+            return
+        
         self.detail_label.setText(text)
+        self.shown_detail = text
     
     @Slot()
     def reset(self):
         """Reset the progress display to initial state."""
-        self.progress_bar.setValue(0)
-        self.status_label.setText("Ready")
-        self.detail_label.setText("")
+        self.update_progress(0)
+        self.update_status("Ready")
+        self.update_detail("")
         self.cancel_button.setEnabled(False)
         
     def set_operation_in_progress(self, in_progress):